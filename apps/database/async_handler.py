@@ -0,0 +1,305 @@
+"""
+Module: async_handler.py
+
+Asyncio counterpart of MongoDbHandler, built on the motor driver.
+
+Clients are bound to the event loop of AsyncLoopRunner and shared per URI,
+so the async handler has the same connection reuse as the sync one. The
+method names and arguments mirror MongoDbHandler; every method is a
+coroutine (iter_find and iter_aggregate are async generators).
+"""
+
+import threading
+from typing import AsyncIterator, Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection
+from pymongo import ReturnDocument
+
+from apps.database.client_registry import MongoClientRegistry
+from apps.database.handler import MongoDbHandler
+from apps.utils.async_utils import AsyncLoopRunner
+from config import Config
+
+
+class AsyncMongoClientRegistry:
+    """
+    Holds one motor client per URI for the event loop of this process.
+    """
+
+    _lock = threading.Lock()
+    _loop = None
+    _clients = {}
+
+    @classmethod
+    def get_client(cls, mongo_uri=None) -> AsyncIOMotorClient:
+        """
+        Returns the shared motor client for the given URI, creating it on first use.
+
+        Args:
+            mongo_uri (str, optional): MongoDB connection URI. Defaults to Config.MONGO_URI.
+
+        Returns:
+            AsyncIOMotorClient: The pooled client bound to AsyncLoopRunner's loop.
+        """
+        mongo_uri = mongo_uri or Config.MONGO_URI
+        loop = AsyncLoopRunner.get_loop()
+        with cls._lock:
+            if cls._loop is not loop:
+                # new process (fork) or new loop, clients of the old loop are unusable
+                cls._loop = loop
+                cls._clients = {}
+            client = cls._clients.get(mongo_uri)
+            if client is None:
+                client = AsyncIOMotorClient(
+                    mongo_uri, io_loop=loop, **MongoClientRegistry.client_options()
+                )
+                cls._clients[mongo_uri] = client
+            return client
+
+
+class AsyncMongoDbHandler:
+    """
+    Async handler class for MongoDB operations.
+
+    Attributes:
+        db_connection (AsyncIOMotorCollection): The connection to the MongoDB collection.
+    """
+
+    dict_instance_checker = MongoDbHandler.dict_instance_checker
+    list_instance_checker = MongoDbHandler.list_instance_checker
+
+    def __init__(
+        self,
+        collection_name: str,
+    ) -> None:
+        """
+        Initialize AsyncMongoDbHandler.
+
+        Args:
+            collection_name (str): The name of the MongoDB collection to connect to.
+
+        Raises:
+            TypeError: If collection_name is not a string.
+        """
+        if not isinstance(collection_name, str):
+            raise TypeError("collection_name should be instance of str")
+        self.client = AsyncMongoClientRegistry.get_client(Config.MONGO_URI)
+
+        if Config.MONGO_URI:
+            db_name = Config.MONGO_URI.rsplit("/", 1)[-1].split("?")[0]
+            self.db_connection: AsyncIOMotorCollection = self.client[db_name][
+                collection_name
+            ]
+        else:
+            self.db_connection: AsyncIOMotorCollection = (
+                self.client.get_default_database()[collection_name]
+            )
+
+    def _build_cursor(
+        self,
+        data: dict,
+        filter: dict,
+        sort_filter: Optional[dict] = None,
+        limit: int = 0,
+        skip: int = 0,
+        hint=None,
+        collation: Optional[dict] = None,
+        max_time_ms: Optional[int] = None,
+        batch_size: Optional[int] = None,
+    ):
+        self.dict_instance_checker(data)
+        cursor = self.db_connection.find(data, filter)
+        if sort_filter:
+            sort_key = sort_filter.get("sort_key")
+            sort_value = sort_filter.get("sort_value")
+            if sort_key and sort_value:
+                cursor = cursor.sort(sort_key, sort_value)
+        if skip:
+            cursor = cursor.skip(skip)
+        if limit:
+            cursor = cursor.limit(limit)
+        if hint:
+            cursor = cursor.hint(hint)
+        if collation:
+            cursor = cursor.collation(collation)
+        if max_time_ms:
+            cursor = cursor.max_time_ms(max_time_ms)
+        if batch_size:
+            cursor = cursor.batch_size(batch_size)
+        return cursor
+
+    async def find(
+        self,
+        data: dict,
+        filter: dict = {"_id": 0},
+        sort_filter: Optional[dict] = None,
+        limit: int = 0,
+        skip: int = 0,
+        hint=None,
+        collation: Optional[dict] = None,
+        max_time_ms: Optional[int] = None,
+    ):
+        """
+        Find documents in the collection, see MongoDbHandler.find.
+        """
+        cursor = self._build_cursor(
+            data, filter, sort_filter, limit, skip, hint, collation, max_time_ms
+        )
+        return await cursor.to_list(length=None)
+
+    async def iter_find(
+        self,
+        data: dict,
+        filter: dict = {"_id": 0},
+        sort_filter: Optional[dict] = None,
+        limit: int = 0,
+        skip: int = 0,
+        hint=None,
+        collation: Optional[dict] = None,
+        max_time_ms: Optional[int] = None,
+        batch_size: Optional[int] = None,
+    ) -> AsyncIterator[dict]:
+        """
+        Stream documents from the collection, see MongoDbHandler.iter_find.
+        """
+        cursor = self._build_cursor(
+            data,
+            filter,
+            sort_filter,
+            limit,
+            skip,
+            hint,
+            collation,
+            max_time_ms,
+            batch_size,
+        )
+        try:
+            async for document in cursor:
+                yield document
+        finally:
+            await cursor.close()
+
+    async def find_one(self, data: dict, filter: dict = {"_id": 0}):
+        self.dict_instance_checker(data)
+        return await self.db_connection.find_one(data, filter)
+
+    async def exists(self, data: dict, hint=None, max_time_ms: Optional[int] = None):
+        """
+        Check whether at least one document matches the filter, see MongoDbHandler.exists.
+        """
+        cursor = self._build_cursor(
+            data, {"_id": 1}, limit=1, hint=hint, max_time_ms=max_time_ms
+        )
+        return bool(await cursor.to_list(length=1))
+
+    async def count(
+        self,
+        data: dict,
+        limit: int = 0,
+        skip: int = 0,
+        hint=None,
+        max_time_ms: Optional[int] = None,
+    ):
+        self.dict_instance_checker(data)
+        options = {}
+        if limit:
+            options["limit"] = limit
+        if skip:
+            options["skip"] = skip
+        if hint:
+            options["hint"] = hint
+        if max_time_ms:
+            options["maxTimeMS"] = max_time_ms
+        return await self.db_connection.count_documents(data, **options)
+
+    async def insert_one(self, data: dict):
+        self.dict_instance_checker(data)
+        return await self.db_connection.insert_one(data)
+
+    async def insert_many(self, data: list):
+        self.list_instance_checker(data)
+        return await self.db_connection.insert_many(data)
+
+    async def update_one(self, data: dict, filter: dict, upsert: bool = False):
+        self.dict_instance_checker(data)
+        self.dict_instance_checker(filter, _is_filter=True)
+        return await self.db_connection.update_one(
+            filter, {"$set": data}, upsert=upsert
+        )
+
+    async def update_many(self, data: dict, filter: dict):
+        self.dict_instance_checker(data)
+        self.dict_instance_checker(filter, _is_filter=True)
+        return await self.db_connection.update_many(filter, {"$set": data})
+
+    async def delete_one(self, data: dict):
+        self.dict_instance_checker(data)
+        return await self.db_connection.delete_one(data)
+
+    async def delete_many(self, data: dict):
+        self.dict_instance_checker(data)
+        return await self.db_connection.delete_many(data)
+
+    async def find_one_and_update(
+        self,
+        filter: dict,
+        data: dict,
+        inc: Optional[dict] = None,
+        projection: Optional[dict] = None,
+        return_document: bool = False,
+    ):
+        """
+        Atomically update a single document, see MongoDbHandler.find_one_and_update.
+        """
+        self.dict_instance_checker(data)
+        self.dict_instance_checker(filter, _is_filter=True)
+        update = {"$set": data}
+        if inc:
+            update["$inc"] = inc
+        return await self.db_connection.find_one_and_update(
+            filter,
+            update,
+            projection=projection,
+            return_document=ReturnDocument.AFTER
+            if return_document
+            else ReturnDocument.BEFORE,
+        )
+
+    async def find_one_and_delete(self, data: dict):
+        self.dict_instance_checker(data)
+        return await self.db_connection.find_one_and_delete(data)
+
+    async def aggregate(self, data: list):
+        """
+        Perform aggregation on the collection, see MongoDbHandler.aggregate.
+        """
+        self.list_instance_checker(data)
+        return await self.db_connection.aggregate(data).to_list(length=None)
+
+    async def iter_aggregate(
+        self,
+        data: list,
+        batch_size: Optional[int] = None,
+        max_time_ms: Optional[int] = None,
+        hint=None,
+        collation: Optional[dict] = None,
+    ) -> AsyncIterator[dict]:
+        """
+        Stream the result of an aggregation, see MongoDbHandler.iter_aggregate.
+        """
+        self.list_instance_checker(data)
+        options = {}
+        if batch_size:
+            options["batchSize"] = batch_size
+        if max_time_ms:
+            options["maxTimeMS"] = max_time_ms
+        if hint:
+            options["hint"] = hint
+        if collation:
+            options["collation"] = collation
+        cursor = self.db_connection.aggregate(data, **options)
+        try:
+            async for document in cursor:
+                yield document
+        finally:
+            await cursor.close()
@@ -0,0 +1,48 @@
+"""
+Async counterparts of the collection classes in apps.database.models.
+
+The helpers import this module inside their *_async functions only, so motor
+is loaded when ASYNC_DB_MODE is on and never on the default sync path.
+
+Example Usage:
+    user = await AsyncUsersDb().find_one({"user_id": user_id})
+"""
+
+from apps.database.async_handler import AsyncMongoDbHandler
+from apps.database.constants import DbNameConstants
+
+
+class AsyncBaseCollection(AsyncMongoDbHandler):
+    def __init__(
+        self,
+        collection_name: str,
+    ):
+        super().__init__(collection_name)
+
+class AsyncUserAccountOtpDb(AsyncBaseCollection):
+    def __init__(self):
+        super().__init__(DbNameConstants.user_account_otp_db)
+
+class AsyncUserInfoDb(AsyncBaseCollection):
+    def __init__(self):
+        super().__init__(DbNameConstants.user_info_db)
+
+class AsyncUsersDb(AsyncBaseCollection):
+    def __init__(self):
+        super().__init__(DbNameConstants.users_db)
+
+class AsyncUsersTokenDb(AsyncBaseCollection):
+    def __init__(self):
+        super().__init__(DbNameConstants.users_token_db)
+
+class AsyncUserTypeDb(AsyncBaseCollection):
+    def __init__(self):
+        super().__init__(DbNameConstants.user_type_db)
+
+class AsyncFsDb(AsyncMongoDbHandler):
+    def __init__(self) -> None:
+        super().__init__(DbNameConstants.fs_files)
+
+class AsyncTokenBlockListDb(AsyncMongoDbHandler):
+    def __init__(self) -> None:
+        super().__init__(DbNameConstants.token_blocklist)
@@ -0,0 +1,206 @@
+"""
+Module: client_registry.py
+
+Process-wide registry of pooled MongoClient instances.
+
+Every collection handler used to build its own MongoClient, which meant a
+fresh server discovery and socket handshake each time a model class was
+instantiated. The registry lazily creates one client per URI per process and
+hands the same instance back to every caller. Clients are dropped in a forked
+child (gunicorn workers) so that no pool is ever shared across processes.
+
+Classes:
+    PoolStatsListener: Collects connection pool events for a client.
+    MongoClientRegistry: Lazily creates and caches one MongoClient per URI.
+"""
+
+import logging
+import os
+import threading
+from collections import defaultdict
+
+from pymongo import MongoClient, monitoring
+
+from config import Config
+
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """
+    Connection pool listener which keeps simple counters per server address.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = defaultdict(
+            lambda: {
+                "created": 0,
+                "closed": 0,
+                "checked_out": 0,
+                "checked_in": 0,
+                "checkout_failed": 0,
+                "cleared": 0,
+            }
+        )
+
+    def _incr(self, address, key):
+        with self._lock:
+            self._stats[f"{address[0]}:{address[1]}"][key] += 1
+
+    def snapshot(self):
+        """
+        Returns a copy of the counters with the derived in-use and open counts.
+        """
+        with self._lock:
+            result = {}
+            for address, counters in self._stats.items():
+                stats = dict(counters)
+                stats["in_use"] = stats["checked_out"] - stats["checked_in"]
+                stats["open"] = stats["created"] - stats["closed"]
+                result[address] = stats
+            return result
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._incr(event.address, "cleared")
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._incr(event.address, "created")
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._incr(event.address, "closed")
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self._incr(event.address, "checkout_failed")
+
+    def connection_checked_out(self, event):
+        self._incr(event.address, "checked_out")
+
+    def connection_checked_in(self, event):
+        self._incr(event.address, "checked_in")
+
+
+class MongoClientRegistry:
+    """
+    Holds one pooled MongoClient per URI for the current process.
+
+    The registry is fork safe: clients created in a parent process are never
+    handed out in a child, a new client is built lazily on first use instead.
+    """
+
+    _lock = threading.Lock()
+    _pid = os.getpid()
+    _clients = {}
+    _listeners = {}
+
+    @staticmethod
+    def client_options():
+        """
+        Builds the MongoClient pool and timeout options from Config.
+
+        Returns:
+            dict: Keyword arguments for MongoClient.
+        """
+        return {
+            "maxPoolSize": Config.MONGO_MAX_POOL_SIZE,
+            "minPoolSize": Config.MONGO_MIN_POOL_SIZE,
+            "maxIdleTimeMS": Config.MONGO_MAX_IDLE_TIME_MS,
+            "waitQueueTimeoutMS": Config.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+            "connectTimeoutMS": Config.MONGO_CONNECT_TIMEOUT_MS,
+            "socketTimeoutMS": Config.MONGO_SOCKET_TIMEOUT_MS,
+            "serverSelectionTimeoutMS": Config.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        }
+
+    @classmethod
+    def _reset_after_fork(cls):
+        # Sockets inherited from the parent must not be reused, so only the
+        # references are dropped here; the parent keeps owning its clients.
+        cls._lock = threading.Lock()
+        cls._pid = os.getpid()
+        cls._clients = {}
+        cls._listeners = {}
+
+    @classmethod
+    def get_client(cls, mongo_uri=None) -> MongoClient:
+        """
+        Returns the shared MongoClient for the given URI, creating it on first use.
+
+        Args:
+            mongo_uri (str, optional): MongoDB connection URI. Defaults to Config.MONGO_URI.
+
+        Returns:
+            MongoClient: The pooled client for this process.
+        """
+        mongo_uri = mongo_uri or Config.MONGO_URI
+        if cls._pid != os.getpid():
+            cls._reset_after_fork()
+
+        client = cls._clients.get(mongo_uri)
+        if client is not None:
+            return client
+
+        with cls._lock:
+            client = cls._clients.get(mongo_uri)
+            if client is None:
+                listener = PoolStatsListener()
+                client = MongoClient(
+                    mongo_uri,
+                    event_listeners=[listener],
+                    **cls.client_options(),
+                )
+                cls._clients[mongo_uri] = client
+                cls._listeners[mongo_uri] = listener
+                logging.debug(f"MongoClient created for process {cls._pid}")
+            return client
+
+    @classmethod
+    def pool_stats(cls):
+        """
+        Returns connection pool statistics for every client of this process.
+
+        The URI is not used as key so that credentials never end up in logs or
+        metrics endpoints; clients are numbered in creation order instead.
+
+        Returns:
+            dict: {"pid": int, "clients": [{"options": dict, "servers": dict}]}
+        """
+        if cls._pid != os.getpid():
+            cls._reset_after_fork()
+        with cls._lock:
+            listeners = list(cls._listeners.values())
+        return {
+            "pid": cls._pid,
+            "clients": [
+                {"options": cls.client_options(), "servers": listener.snapshot()}
+                for listener in listeners
+            ],
+        }
+
+    @classmethod
+    def close_all(cls):
+        """
+        Closes every client owned by this process.
+        """
+        with cls._lock:
+            if cls._pid == os.getpid():
+                for client in cls._clients.values():
+                    client.close()
+            cls._clients = {}
+            cls._listeners = {}
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=MongoClientRegistry._reset_after_fork)
@@ -10,6 +10,7 @@ class DbNameConstants:
     user_type_db = "UserType"
     fs_files = "fs.files"
     token_blocklist = "token_blocklist"
+    app_settings = "AppSettings"
 
 
 class MongoDbAggregrationConstants:
@@ -40,6 +41,8 @@ class MongoDbAggregrationConstants:
     EXPR = "$expr"
     EXISTS = "$exists"
     EQUAL = "$eq"
+    LIMIT = "$limit"
+    IF_NULL = "$ifNull"
 
     # MongoDB field name constants used in aggregation
     USER_ID = "$user_id"  # Field name for user ID
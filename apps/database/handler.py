@@ -1,7 +1,8 @@
-from pymongo import MongoClient
+from pymongo import ReturnDocument
 from pymongo.collection import Collection
-from typing import Optional
+from typing import Iterator, Optional
 
+from apps.database.client_registry import MongoClientRegistry
 from config import Config
 
 
@@ -10,7 +11,8 @@ class MongoDbHandler:
     Handler class for MongoDB operations with dynamic URI support.
 
     This class provides methods for performing CRUD (Create, Read, Update, Delete) operations
-    on a MongoDB collection. You can connect either via a Mongo URI or reuse a MongoClient instance.
+    on a MongoDB collection. The underlying MongoClient is shared per process through
+    MongoClientRegistry, so creating a handler does not open new connections.
 
     Attributes:
         db_connection (pymongo.collection.Collection): The connection to the MongoDB collection.
@@ -25,16 +27,14 @@ class MongoDbHandler:
 
         Args:
             collection_name (str): The name of the MongoDB collection to connect to.
-            mongo_uri (str, optional): MongoDB connection URI (e.g., mongodb://localhost:27017/mydb).
-            client (MongoClient, optional): An existing pymongo MongoClient instance.
 
         Raises:
             TypeError: If collection_name is not a string.
-            ValueError: If neither mongo_uri nor client is provided.
         """
         if not isinstance(collection_name, str):
             raise TypeError("collection_name should be instance of str")
-        self.client = MongoClient(Config.MONGO_URI)
+        # Reuse the process-wide pooled client instead of opening a new one
+        self.client = MongoClientRegistry.get_client(Config.MONGO_URI)
 
         if Config.MONGO_URI:
             db_name = Config.MONGO_URI.rsplit("/", 1)[-1].split("?")[0]
@@ -58,11 +58,52 @@ class MongoDbHandler:
                 message = "where condition should be list"
             raise TypeError(message)
 
+    def _build_cursor(
+        self,
+        data: dict,
+        filter: dict,
+        sort_filter: Optional[dict] = None,
+        limit: int = 0,
+        skip: int = 0,
+        hint=None,
+        collation: Optional[dict] = None,
+        max_time_ms: Optional[int] = None,
+        batch_size: Optional[int] = None,
+    ):
+        """
+        Build a pymongo cursor with the optional cursor modifiers applied.
+        """
+        self.dict_instance_checker(data)
+        cursor = self.db_connection.find(data, filter)
+        if sort_filter:
+            sort_key = sort_filter.get("sort_key")
+            sort_value = sort_filter.get("sort_value")
+            if sort_key and sort_value:
+                cursor = cursor.sort(sort_key, sort_value)
+        if skip:
+            cursor = cursor.skip(skip)
+        if limit:
+            cursor = cursor.limit(limit)
+        if hint:
+            cursor = cursor.hint(hint)
+        if collation:
+            cursor = cursor.collation(collation)
+        if max_time_ms:
+            cursor = cursor.max_time_ms(max_time_ms)
+        if batch_size:
+            cursor = cursor.batch_size(batch_size)
+        return cursor
+
     def find(
         self,
         data: dict,
         filter: dict = {"_id": 0},
         sort_filter: Optional[dict] = None,
+        limit: int = 0,
+        skip: int = 0,
+        hint=None,
+        collation: Optional[dict] = None,
+        max_time_ms: Optional[int] = None,
     ):
         """
         Find documents in the collection.
@@ -71,18 +112,113 @@ class MongoDbHandler:
             data (dict): The query filter.
             filter (dict): Projection fields to include/exclude.
             sort_filter (dict, optional): e.g., {"sort_key": "timestamp", "sort_value": -1}
+            limit (int): Maximum number of documents, 0 means no limit.
+            skip (int): Number of documents to skip.
+            hint (str | list, optional): Index name or key pattern to use.
+            collation (dict, optional): Collation of the query.
+            max_time_ms (int, optional): Server side time limit of the query.
 
         Returns:
             list: List of matching documents.
         """
+        return list(
+            self._build_cursor(
+                data, filter, sort_filter, limit, skip, hint, collation, max_time_ms
+            )
+        )
+
+    def iter_find(
+        self,
+        data: dict,
+        filter: dict = {"_id": 0},
+        sort_filter: Optional[dict] = None,
+        limit: int = 0,
+        skip: int = 0,
+        hint=None,
+        collation: Optional[dict] = None,
+        max_time_ms: Optional[int] = None,
+        batch_size: Optional[int] = None,
+    ) -> Iterator[dict]:
+        """
+        Stream documents from the collection without materialising the result.
+
+        Takes the same arguments as find, plus batch_size which controls how many
+        documents are fetched from the server per round trip.
+
+        Yields:
+            dict: Matching documents, one at a time.
+        """
+        cursor = self._build_cursor(
+            data,
+            filter,
+            sort_filter,
+            limit,
+            skip,
+            hint,
+            collation,
+            max_time_ms,
+            batch_size,
+        )
+        try:
+            yield from cursor
+        finally:
+            cursor.close()
+
+    def exists(self, data: dict, hint=None, max_time_ms: Optional[int] = None):
+        """
+        Check whether at least one document matches the filter.
+
+        Only the _id of a single document is fetched, so this can be served
+        from an index without reading the documents themselves.
+
+        Args:
+            data (dict): The query filter.
+            hint (str | list, optional): Index name or key pattern to use.
+            max_time_ms (int, optional): Server side time limit of the query.
+
+        Returns:
+            bool: True if a matching document exists.
+        """
+        cursor = self._build_cursor(
+            data, {"_id": 1}, limit=1, hint=hint, max_time_ms=max_time_ms
+        )
+        try:
+            return next(cursor, None) is not None
+        finally:
+            cursor.close()
+
+    def count(
+        self,
+        data: dict,
+        limit: int = 0,
+        skip: int = 0,
+        hint=None,
+        max_time_ms: Optional[int] = None,
+    ):
+        """
+        Count the documents matching the filter.
+
+        Args:
+            data (dict): The query filter.
+            limit (int): Stop counting after this many documents, 0 means no limit.
+            skip (int): Number of documents to skip before counting.
+            hint (str | list, optional): Index name or key pattern to use.
+            max_time_ms (int, optional): Server side time limit of the query.
+
+        Returns:
+            int: Number of matching documents.
+        """
         self.dict_instance_checker(data)
-        cursor = self.db_connection.find(data, filter)
-        if sort_filter:
-            sort_key = sort_filter.get("sort_key")
-            sort_value = sort_filter.get("sort_value")
-            if sort_key and sort_value:
-                cursor = cursor.sort(sort_key, sort_value)
-        return list(cursor)
+        options = {}
+        if limit:
+            options["limit"] = limit
+        if skip:
+            options["skip"] = skip
+        if hint:
+            options["hint"] = hint
+        if max_time_ms:
+            options["maxTimeMS"] = max_time_ms
+        return self.db_connection.count_documents(data, **options)
 
     def find_one(self, data: dict, filter: dict = {"_id": 0}):
         """
@@ -106,10 +242,10 @@ class MongoDbHandler:
         self.list_instance_checker(data)
         return self.db_connection.insert_many(data)
 
-    def update_one(self, data: dict, filter: dict):
+    def update_one(self, data: dict, filter: dict, upsert: bool = False):
         self.dict_instance_checker(data)
         self.dict_instance_checker(filter, _is_filter=True)
-        return self.db_connection.update_one(filter, {"$set": data})
+        return self.db_connection.update_one(filter, {"$set": data}, upsert=upsert)
 
     def update_many(self, data: dict, filter: dict):
         self.dict_instance_checker(data)
@@ -124,10 +260,75 @@ class MongoDbHandler:
         self.dict_instance_checker(data)
         return self.db_connection.delete_many(data)
 
-    def find_one_and_update(self, filter: dict,data: dict):
+    def find_one_and_update(
+        self,
+        filter: dict,
+        data: dict,
+        inc: Optional[dict] = None,
+        projection: Optional[dict] = None,
+        return_document: bool = False,
+    ):
+        """
+        Atomically update a single document and return it.
+
+        Args:
+            filter (dict): The query filter.
+            data (dict): Fields to $set.
+            inc (dict, optional): Fields to $inc in the same update.
+            projection (dict, optional): Fields of the returned document.
+            return_document (bool): Return the document after the update instead of before.
+
+        Returns:
+            dict or None: The matched document.
+        """
         self.dict_instance_checker(data)
         self.dict_instance_checker(filter, _is_filter=True)
-        return self.db_connection.find_one_and_update(filter, {"$set": data})
+        update = {"$set": data}
+        if inc:
+            update["$inc"] = inc
+        return self.db_connection.find_one_and_update(
+            filter,
+            update,
+            projection=projection,
+            return_document=ReturnDocument.AFTER
+            if return_document
+            else ReturnDocument.BEFORE,
+        )
+
+    def find_one_and_modify(
+        self,
+        filter: dict,
+        update,
+        upsert: bool = False,
+        projection: Optional[dict] = None,
+    ):
+        """
+        Atomically apply an update document or update pipeline and return the
+        document after the update.
+
+        Unlike find_one_and_update the update is passed through as-is, so it can
+        combine operators ($set, $inc, $setOnInsert, ...) or be an aggregation
+        pipeline computing new values from the current ones.
+
+        Args:
+            filter (dict): The query filter.
+            update (dict | list): Update operators or update pipeline.
+            upsert (bool): Insert the document when nothing matches.
+            projection (dict, optional): Fields of the returned document.
+
+        Returns:
+            dict or None: The document after the update.
+        """
+        self.dict_instance_checker(filter, _is_filter=True)
+        if not isinstance(update, (dict, list)):
+            raise TypeError("update should be instance of dict or list")
+        return self.db_connection.find_one_and_update(
+            filter,
+            update,
+            upsert=upsert,
+            projection=projection,
+            return_document=ReturnDocument.AFTER,
+        )
 
     def find_one_and_delete(self, data: dict):
         self.dict_instance_checker(data)
@@ -145,3 +346,80 @@ class MongoDbHandler:
         """
         self.list_instance_checker(data)
         return list(self.db_connection.aggregate(data))
+
+    def iter_aggregate(
+        self,
+        data: list,
+        batch_size: Optional[int] = None,
+        max_time_ms: Optional[int] = None,
+        hint=None,
+        collation: Optional[dict] = None,
+    ) -> Iterator[dict]:
+        """
+        Stream the result of an aggregation without materialising it.
+
+        Args:
+            data (list): Aggregation pipeline.
+            batch_size (int, optional): Documents fetched per round trip.
+            max_time_ms (int, optional): Server side time limit of the pipeline.
+            hint (str | list, optional): Index name or key pattern to use.
+            collation (dict, optional): Collation of the pipeline.
+
+        Yields:
+            dict: Aggregated documents, one at a time.
+        """
+        self.list_instance_checker(data)
+        options = {}
+        if batch_size:
+            options["batchSize"] = batch_size
+        if max_time_ms:
+            options["maxTimeMS"] = max_time_ms
+        if hint:
+            options["hint"] = hint
+        if collation:
+            options["collation"] = collation
+        cursor = self.db_connection.aggregate(data, **options)
+        try:
+            yield from cursor
+        finally:
+            cursor.close()
+
+    def index_information(self):
+        """
+        Return the live indexes of the collection keyed by index name.
+
+        Returns:
+            dict: Output of pymongo's Collection.index_information().
+        """
+        return self.db_connection.index_information()
+
+    def create_index(self, keys: list, **kwargs):
+        """
+        Create an index on the collection.
+
+        Args:
+            keys (list): List of (field, direction) pairs.
+            **kwargs: Index options such as name, unique or partialFilterExpression.
+
+        Returns:
+            str: The name of the created index.
+        """
+        self.list_instance_checker(keys)
+        return self.db_connection.create_index(keys, **kwargs)
+
+    def drop_index(self, name: str):
+        return self.db_connection.drop_index(name)
+
+    def bulk_write(self, requests: list, ordered: bool = False):
+        """
+        Execute a batch of pymongo write operations (UpdateOne, InsertOne, ...).
+
+        Args:
+            requests (list): The write operations.
+            ordered (bool): Stop at the first error when True.
+
+        Returns:
+            BulkWriteResult: The pymongo bulk write result.
+        """
+        self.list_instance_checker(requests)
+        return self.db_connection.bulk_write(requests, ordered=ordered)
@@ -0,0 +1,238 @@
+"""
+Module: indexes.py
+
+Declarative index manifest for the application's MongoDB collections and the
+reconciler which applies it.
+
+Every index the hot query paths rely on is declared in INDEX_MANIFEST, keyed
+by collection name. IndexReconciler compares the manifest with the live
+indexes, builds whatever is missing and reports indexes which exist on the
+server but are no longer declared (or whose definition drifted).
+
+Indexes are built with "flask sync-indexes" as a deploy step. Building them
+from every worker at boot (MONGO_ENSURE_INDEXES) is opt-in; a unique index
+which cannot be built, typically because of existing duplicates, aborts the
+boot then instead of leaving the uniqueness unenforced.
+
+Example Usage:
+    report = IndexReconciler.reconcile()
+    report = IndexReconciler.reconcile(dry_run=True)
+"""
+
+import logging
+
+from apps.database.constants import DbNameConstants
+from apps.database.handler import MongoDbHandler
+
+ASCENDING = 1
+
+# Options which are compared between the manifest and the live index
+COMPARED_OPTIONS = ("unique", "sparse", "partialFilterExpression", "expireAfterSeconds")
+
+
+INDEX_MANIFEST = {
+    DbNameConstants.users_db: [
+        # signin, signup and register look users up by (lowercased) username
+        {"name": "username_1", "keys": [("username", ASCENDING)], "unique": True},
+        # /user/me, user_active_check and profile image upload
+        {"name": "user_id_1", "keys": [("user_id", ASCENDING)], "unique": True},
+        # /user/list name search over the n-gram tokens of active users
+        {
+            "name": "search_grams_1",
+            "keys": [("search_grams", ASCENDING)],
+            "partialFilterExpression": {"Status": "Active"},
+        },
+        # /user/image/<files_id> metadata check, only users with a picture
+        {
+            "name": "files_id_1",
+            "keys": [("files_id", ASCENDING)],
+            "partialFilterExpression": {"files_id": {"$exists": True}},
+        },
+    ],
+    DbNameConstants.user_type_db: [
+        # $lookup from Users on user_id
+        {"name": "user_id_1", "keys": [("user_id", ASCENDING)], "unique": True},
+    ],
+    DbNameConstants.users_token_db: [
+        # signup rate limiting and token issuance
+        {
+            "name": "email_1_type_1",
+            "keys": [("email", ASCENDING), ("type", ASCENDING)],
+            "unique": True,
+        },
+        # register token verification and cleanup
+        {"name": "token_1", "keys": [("token", ASCENDING)]},
+        # TTL index, documents are removed once expire_at has passed
+        {
+            "name": "expire_at_1",
+            "keys": [("expire_at", ASCENDING)],
+            "expireAfterSeconds": 0,
+        },
+    ],
+    DbNameConstants.user_account_otp_db: [
+        {"name": "slug_id_1", "keys": [("slug_id", ASCENDING)], "unique": True},
+        # TTL index, documents are removed once expire_at has passed
+        {
+            "name": "expire_at_1",
+            "keys": [("expire_at", ASCENDING)],
+            "expireAfterSeconds": 0,
+        },
+    ],
+    DbNameConstants.token_blocklist: [
+        # auth_required checks every authenticated request against this
+        {"name": "jti_1", "keys": [("jti", ASCENDING)]},
+        # TTL index, documents are removed once expire_at has passed
+        {
+            "name": "expire_at_1",
+            "keys": [("expire_at", ASCENDING)],
+            "expireAfterSeconds": 0,
+        },
+    ],
+    DbNameConstants.fs_files: [
+        # variant files of a replaced profile picture, deleted by store_variants
+        {
+            "name": "variant_of_1",
+            "keys": [("variant_of", ASCENDING)],
+            "partialFilterExpression": {"variant_of": {"$exists": True}},
+        },
+    ],
+}
+
+
+class IndexBuildError(RuntimeError):
+    """
+    Raised when a unique index of the manifest could not be built.
+    """
+
+
+class IndexReconciler:
+    """
+    Diffs INDEX_MANIFEST against the live indexes and builds the missing ones.
+    """
+
+    @staticmethod
+    def _index_options(spec: dict) -> dict:
+        return {key: spec[key] for key in COMPARED_OPTIONS if key in spec}
+
+    @staticmethod
+    def _is_same_index(spec: dict, live: dict) -> bool:
+        """
+        Checks whether a live index (from index_information) matches a manifest entry.
+        """
+        if [tuple(key) for key in live.get("key", [])] != [
+            tuple(key) for key in spec["keys"]
+        ]:
+            return False
+        return IndexReconciler._index_options(
+            spec
+        ) == IndexReconciler._index_options(live)
+
+    @staticmethod
+    def reconcile_collection(collection_name: str, specs: list, dry_run=False):
+        """
+        Reconciles the indexes of a single collection.
+
+        Args:
+            collection_name (str): The collection to reconcile.
+            specs (list): Manifest entries for the collection.
+            dry_run (bool): Only report, do not build anything.
+
+        Returns:
+            dict: {"created": [...], "missing": [...], "stale": [...], "ok": [...], "failed": [...]}
+        """
+        report = {"created": [], "missing": [], "stale": [], "ok": [], "failed": []}
+        handler = MongoDbHandler(collection_name)
+        live_indexes = handler.index_information()
+        declared = set()
+
+        for spec in specs:
+            name = spec["name"]
+            declared.add(name)
+            live = live_indexes.get(name)
+            if live is not None:
+                if IndexReconciler._is_same_index(spec, live):
+                    report["ok"].append(name)
+                else:
+                    # Same name but different definition, needs a manual rebuild
+                    report["stale"].append(name)
+                continue
+            if dry_run:
+                report["missing"].append(name)
+                continue
+            try:
+                handler.create_index(
+                    spec["keys"], name=name, **IndexReconciler._index_options(spec)
+                )
+                report["created"].append(name)
+            except Exception as exc:
+                if spec.get("unique"):
+                    # the queries rely on this uniqueness, usually duplicates exist
+                    logging.critical(
+                        f"Unique index {collection_name}.{name} could not be built, "
+                        f"remove the duplicate documents and run flask sync-indexes:{exc}"
+                    )
+                else:
+                    logging.error(
+                        f"Error occured while creating index {collection_name}.{name}:{exc}"
+                    )
+                report["failed"].append(name)
+
+        for name in live_indexes:
+            if name != "_id_" and name not in declared:
+                report["stale"].append(name)
+        return report
+
+    @staticmethod
+    def failed_unique(result, manifest=None):
+        """
+        Returns the "collection.name" of every unique index which failed in result.
+        """
+        manifest = manifest or INDEX_MANIFEST
+        return [
+            f"{collection_name}.{spec['name']}"
+            for collection_name, specs in manifest.items()
+            for spec in specs
+            if spec.get("unique")
+            and spec["name"] in result.get(collection_name, {}).get("failed", [])
+        ]
+
+    @staticmethod
+    def reconcile(dry_run=False, manifest=None, strict=False):
+        """
+        Reconciles every collection of the manifest.
+
+        Args:
+            dry_run (bool): Only report, do not build anything.
+            manifest (dict, optional): Defaults to INDEX_MANIFEST.
+            strict (bool): Raise instead of returning when a unique index failed.
+
+        Returns:
+            dict: Per collection report, see reconcile_collection.
+
+        Raises:
+            IndexBuildError: If strict and a unique index could not be built.
+        """
+        manifest = manifest or INDEX_MANIFEST
+        result = {}
+        for collection_name, specs in manifest.items():
+            try:
+                result[collection_name] = IndexReconciler.reconcile_collection(
+                    collection_name, specs, dry_run
+                )
+            except Exception as exc:
+                logging.error(
+                    f"Error occured in function reconcile for {collection_name}:{exc}"
+                )
+                result[collection_name] = {"error": str(exc)}
+                continue
+            report = result[collection_name]
+            if report["created"]:
+                logging.info(f"Indexes created on {collection_name}: {report['created']}")
+            if report["missing"]:
+                logging.warning(f"Indexes missing on {collection_name}: {report['missing']}")
+            if report["stale"]:
+                logging.warning(f"Stale indexes on {collection_name}: {report['stale']}")
+        failed = IndexReconciler.failed_unique(result, manifest)
+        if strict and failed:
+            raise IndexBuildError(f"unique indexes could not be built: {failed}")
+        return result
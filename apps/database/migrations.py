@@ -0,0 +1,260 @@
+"""
+Module: migrations.py
+
+One-off data migrations which can be run against a live database.
+
+Classes:
+    ExpiryBackfillMigration: Adds the expire_at TTL field to token documents
+        written before the TTL indexes existed.
+    UserTypeBackfillMigration: Copies UserType.user_type onto the Users documents.
+
+Example Usage:
+    ExpiryBackfillMigration.run()
+    UserTypeBackfillMigration.run()
+"""
+
+import datetime
+import logging
+import time
+
+from pymongo import UpdateOne
+
+from apps.database.models import (
+    TokenBlockListDb,
+    UserAccountOtpDb,
+    UserTypeDb,
+    UsersDb,
+    UsersTokenDb,
+)
+from apps.utils.search_index import SearchGrams
+from constants.token_expiry_constants import TokenExpireConstant
+
+ASSIGNED_TIME_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+
+class ExpiryBackfillMigration:
+    """
+    Backfills expire_at on token_blocklist, UsersToken and UserAccountOtp rows.
+
+    Old rows store their time either as a naive local datetime (token_blocklist
+    created_at), as a str(datetime.now()) string (UsersToken assigned_time) or
+    not at all (UserAccountOtp, where the ObjectId timestamp is used).
+    """
+
+    @staticmethod
+    def _to_utc(value):
+        if isinstance(value, str):
+            value = datetime.datetime.strptime(value, ASSIGNED_TIME_FORMAT)
+        if value.tzinfo is None:
+            # naive values were written with datetime.now() in server local time
+            value = value.astimezone(datetime.timezone.utc)
+        return value
+
+    @staticmethod
+    def _backfill(handler, projection, compute_expiry, batch_size):
+        """
+        Writes expire_at for every document of the collection missing it.
+
+        Returns:
+            int: Number of documents updated.
+        """
+        updated = 0
+        documents = handler.iter_find(
+            {"expire_at": {"$exists": False}}, projection, batch_size=batch_size
+        )
+        batch = []
+        for document in documents:
+            try:
+                expire_at = compute_expiry(document)
+            except Exception as exc:
+                logging.error(f"Unable to compute expiry for {document['_id']}:{exc}")
+                expire_at = None
+            if expire_at is None:
+                # unknown age, keep it for the longest token lifetime from now
+                expire_at = (
+                    datetime.datetime.now(datetime.timezone.utc)
+                    + TokenExpireConstant.MAX_TOKEN_LIFETIME
+                )
+            batch.append(
+                UpdateOne(
+                    {"_id": document["_id"], "expire_at": {"$exists": False}},
+                    {"$set": {"expire_at": expire_at}},
+                )
+            )
+            if len(batch) >= batch_size:
+                updated += handler.bulk_write(batch).modified_count
+                batch = []
+        if batch:
+            updated += handler.bulk_write(batch).modified_count
+        return updated
+
+    @staticmethod
+    def run(batch_size=500):
+        """
+        Runs the backfill on all three collections.
+
+        Args:
+            batch_size (int): Number of updates sent per bulk write.
+
+        Returns:
+            dict: Number of updated documents per collection.
+        """
+        to_utc = ExpiryBackfillMigration._to_utc
+        result = {}
+
+        result["token_blocklist"] = ExpiryBackfillMigration._backfill(
+            TokenBlockListDb(),
+            {"_id": 1, "created_at": 1},
+            lambda doc: to_utc(doc["created_at"])
+            + TokenExpireConstant.MAX_TOKEN_LIFETIME
+            if doc.get("created_at")
+            else None,
+            batch_size,
+        )
+        result["UsersToken"] = ExpiryBackfillMigration._backfill(
+            UsersTokenDb(),
+            {"_id": 1, "assigned_time": 1},
+            lambda doc: to_utc(doc["assigned_time"])
+            + max(
+                TokenExpireConstant.SIGNUP_TOKEN_EXPIRES,
+                TokenExpireConstant.EMAIL_RATE_LIMIT_WINDOW,
+            )
+            if doc.get("assigned_time")
+            else None,
+            batch_size,
+        )
+        result["UserAccountOtp"] = ExpiryBackfillMigration._backfill(
+            UserAccountOtpDb(),
+            {"_id": 1},
+            lambda doc: doc["_id"].generation_time
+            + TokenExpireConstant.SIGNUP_TOKEN_EXPIRES,
+            batch_size,
+        )
+        logging.info(f"Expiry backfill finished: {result}")
+        return result
+
+
+class UserTypeBackfillMigration:
+    """
+    Online, resumable backfill of Users.user_type from the UserType collection.
+
+    Users are processed in _id order in small batches. Only documents which
+    still have no user_type are touched, so the job can be stopped and rerun
+    at any time and never overwrites a value written by register.
+    """
+
+    @staticmethod
+    def run(batch_size=500, pause_ms=0, start_after=None):
+        """
+        Runs the backfill.
+
+        Args:
+            batch_size (int): Users read and updated per round.
+            pause_ms (int): Sleep between batches to limit load on a live cluster.
+            start_after (ObjectId, optional): Resume after this Users _id.
+
+        Returns:
+            dict: {"updated": int, "last_id": ObjectId | None}
+        """
+        users_db = UsersDb()
+        user_type_db = UserTypeDb()
+        updated = 0
+        last_id = start_after
+        while True:
+            query = {"user_type": {"$exists": False}}
+            if last_id is not None:
+                query["_id"] = {"$gt": last_id}
+            users = users_db.find(
+                query,
+                {"_id": 1, "user_id": 1},
+                sort_filter={"sort_key": "_id", "sort_value": 1},
+                limit=batch_size,
+            )
+            if not users:
+                break
+            user_ids = [user.get("user_id") for user in users if user.get("user_id")]
+            user_types = {
+                group["user_id"]: group.get("user_type")
+                for group in user_type_db.iter_find(
+                    {"user_id": {"$in": user_ids}},
+                    {"_id": 0, "user_id": 1, "user_type": 1},
+                )
+            }
+            result = users_db.bulk_write(
+                [
+                    UpdateOne(
+                        {"_id": user["_id"], "user_type": {"$exists": False}},
+                        {
+                            "$set": {
+                                "user_type": user_types.get(user.get("user_id"))
+                                or "customer"
+                            }
+                        },
+                    )
+                    for user in users
+                ]
+            )
+            updated += result.modified_count
+            last_id = users[-1]["_id"]
+            logging.info(f"User type backfill: {updated} users updated, last _id {last_id}")
+            if pause_ms:
+                time.sleep(pause_ms / 1000)
+        return {"updated": updated, "last_id": last_id}
+
+
+class SearchGramsBackfillMigration:
+    """
+    Online, resumable backfill of Users.search_grams for accounts created
+    before the n-gram search index. Until it has run, /user/list matches those
+    users with the unindexed regex.
+    """
+
+    @staticmethod
+    def run(batch_size=500, pause_ms=0, start_after=None):
+        """
+        Runs the backfill.
+
+        Args:
+            batch_size (int): Users read and updated per round.
+            pause_ms (int): Sleep between batches to limit load on a live cluster.
+            start_after (ObjectId, optional): Resume after this Users _id.
+
+        Returns:
+            dict: {"updated": int, "last_id": ObjectId | None}
+        """
+        users_db = UsersDb()
+        updated = 0
+        last_id = start_after
+        while True:
+            query = {"search_grams": {"$exists": False}}
+            if last_id is not None:
+                query["_id"] = {"$gt": last_id}
+            users = users_db.find(
+                query,
+                {"_id": 1, "firstname": 1, "lastname": 1},
+                sort_filter={"sort_key": "_id", "sort_value": 1},
+                limit=batch_size,
+            )
+            if not users:
+                break
+            result = users_db.bulk_write(
+                [
+                    UpdateOne(
+                        {"_id": user["_id"], "search_grams": {"$exists": False}},
+                        {
+                            "$set": {
+                                "search_grams": SearchGrams.build(
+                                    user.get("firstname"), user.get("lastname")
+                                )
+                            }
+                        },
+                    )
+                    for user in users
+                ]
+            )
+            updated += result.modified_count
+            last_id = users[-1]["_id"]
+            logging.info(f"Search grams backfill: {updated} users updated, last _id {last_id}")
+            if pause_ms:
+                time.sleep(pause_ms / 1000)
+        return {"updated": updated, "last_id": last_id}
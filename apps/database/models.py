@@ -49,4 +49,8 @@ class FsDb(MongoDbHandler):
 
 class TokenBlockListDb(MongoDbHandler):
     def __init__(self) -> None:
-        super().__init__(DbNameConstants.token_blocklist)
\ No newline at end of file
+        super().__init__(DbNameConstants.token_blocklist)
+
+class AppSettingsDb(MongoDbHandler):
+    def __init__(self) -> None:
+        super().__init__(DbNameConstants.app_settings)
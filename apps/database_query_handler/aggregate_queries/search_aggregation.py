@@ -2,169 +2,121 @@ import logging
 from flask import jsonify
 from apps.database.constants import MongoDbAggregrationConstants
 from apps.database.models import UsersDb
+from apps.database_query_handler.pipeline_builder import (
+    Pipeline,
+    active_users,
+    customers,
+    user_type_or_default,
+)
+from apps.utils.pagination import InvalidCursor, KeysetPagination
+from apps.utils.search_index import SearchGrams
+from config import Config
 from constants.response_constants import ResponseConstants
 
+USER_LIST_PROJECTION = {
+    "_id": 0,
+    "firstname": 1,
+    "lastname": 1,
+    "user_id": 1,
+    "files_id": 1,
+    "username": 1,
+    "timezone": 1,
+    "user_type": user_type_or_default(),
+}
+
 
 class UserList:
 
     @staticmethod
-    def user_list_request_data(request_data):
+    def paginate(match, page_size=None, cursor=None, include_total=False):
+        """
+        FUNCTION TO RETURN ONE KEYSET PAGE OF ACTIVE USERS MATCHING match
+
+        PROCESS INVOLVED
+            - match AND THE CURSOR FILTER ARE APPLIED, THEN SORT ON (username, user_id)
+            - page_size + 1 RECORDS ARE READ TO KNOW WHETHER A NEXT PAGE EXISTS
+            - THEN PROJECT THE RESULT, user_type IS STORED ON Users AND DEFAULTS TO CUSTOMER
+            - total IS A SEPARATE COUNT, CAPPED AT USER_LIST_MAX_TOTAL, ONLY WHEN ASKED FOR
+
+        Raises:
+            InvalidCursor: If cursor is not a token returned by a previous page.
+        """
+        size = KeysetPagination.page_size(page_size)
+        pipeline = (
+            Pipeline()
+            .match(match)
+            .match(KeysetPagination.after(cursor))
+            .sort(KeysetPagination.sort())
+            .limit(size + 1)
+            .project(USER_LIST_PROJECTION)
+        )
+        users = UsersDb().aggregate(pipeline.build())
+        next_cursor = None
+        if len(users) > size:
+            users = users[:size]
+            next_cursor = KeysetPagination.encode(users[-1])
+        page = {"users": users, "next_cursor": next_cursor}
+        if include_total:
+            page["total"] = UsersDb().count(
+                match,
+                limit=Config.USER_LIST_MAX_TOTAL,
+                max_time_ms=Config.USER_LIST_COUNT_MAX_TIME_MS,
+            )
+        return page
+
+    @staticmethod
+    def user_list_request_data(
+        request_data, page_size=None, cursor=None, include_total=False
+    ):
         """
         FUNCTION TO PERFORM AGGREGRATION BASED ON request_data
 
         PROCESS INVOLVED
             - Users IS TAKEN AS THE PRIMARY COLLECTION WITH request_data FILTER
-            - UserType IS THEN LOOKED UP FOR COMMON user_id
-            - THEN PROJECT THE RESULT AND ADDED CUSTOMER FOR THOSE RECORD DOESN'T HAVE user_type
+            - ONLY CUSTOMERS ARE LISTED, A MISSING user_type COUNTS AS CUSTOMER
+            - THE RESULT IS RETURNED ONE PAGE AT A TIME, SEE paginate
         """
         # Users IS TAKEN AS THE PRIMARY COLLECTION WITH request_data FILTER
         try:
-            pipeline = [
-                {MongoDbAggregrationConstants.MATCH: {"Status": "Active"}},
-                {MongoDbAggregrationConstants.MATCH: request_data},
-                # UserType IS THEN LOOKED UP FOR COMMON user_id
-                {
-                    MongoDbAggregrationConstants.LOOKUP: {
-                        "from": "UserType",
-                        "localField": "user_id",
-                        "foreignField": "user_id",
-                        "as": "user_type_info",
-                    }
-                },
-                # THEN PROJECT THE RESULT AND ADDED CUSTOMER FOR THOSE RECORD DOESN'T HAVE user_type
-                {
-                    MongoDbAggregrationConstants.PROJECT: {
-                        "_id": 0,
-                        "firstname": 1,
-                        "lastname": 1,
-                        "user_id": 1,
-                        "files_id": 1,
-                        "username": 1,
-                        "timezone": 1,
-                        "user_type": {
-                            MongoDbAggregrationConstants.COND: {
-                                "if": {
-                                    "$eq": [
-                                        {
-                                            MongoDbAggregrationConstants.SIZE: MongoDbAggregrationConstants.USER_TYPE_INFO
-                                        },
-                                        0,
-                                    ]
-                                },
-                                "then": "customer",
-                                "else": {
-                                    MongoDbAggregrationConstants.ARRAY_ELEMENT: [
-                                        MongoDbAggregrationConstants.USER_TYPE_INFO,
-                                        0,
-                                    ]
-                                },
-                            }
-                        },
-                    }
-                },
-                {MongoDbAggregrationConstants.MATCH: {"user_type": "customer"}},
-            ]
-            # if request_data is not none it will return the aggregated data against the match condition
-            if request_data:
-                user_list = UsersDb().aggregate(pipeline)
-            # else return whole record with upto the limit 100 record
-            else:
-                pipeline.append({"$limit": 100})
-                user_list = UsersDb().aggregate(pipeline)
-
-            return user_list
+            match = active_users(**request_data, **customers())
+            return UserList.paginate(match, page_size, cursor, include_total)
 
+        except InvalidCursor:
+            raise
         except Exception as exc:  # pragma: no cover
             logging.error(f"Error occurred at user_list_request_data:{exc}")
             return jsonify(message=ResponseConstants.INTERNAL_ERROR_MESSAGE), 500
 
     @staticmethod
-    def user_name_list(firstname, lastname):
+    def user_name_list(
+        firstname, lastname, page_size=None, cursor=None, include_total=False
+    ):
         """
         FUNCTION TO PERFORM AGGREGRATION BASED ON FIRSTNAME AND LASTNAME
 
+        firstname AND lastname ARE PLAIN SEARCH TERMS, A USER MATCHES WHEN ITS
+        firstname CONTAINS firstname OR ITS lastname CONTAINS lastname (CASE INSENSITIVE)
+
         PROCESS INVOLVED
-            - Users IS TAKEN AS THE PRIMARY COLLECTION WITH FIRSTNAME AND LASTNAME FILTER WITH REGEX COMBINATION
-            - UserType IS THEN LOOKED UP FOR COMMON user_id
-            - THEN PROJECT THE RESULT AND ADDED CUSTOMER FOR THOSE RECORD DOESN'T HAVE user_type
+            - Users IS TAKEN AS THE PRIMARY COLLECTION, CANDIDATES COME FROM THE search_grams
+              N-GRAM INDEX AND ARE CONFIRMED WITH THE SUBSTRING REGEX
+            - THE RESULT IS RETURNED ONE PAGE AT A TIME, SEE paginate
 
         """
-        # Users IS TAKEN AS THE PRIMARY COLLECTION WITH FIRSTNAME AND LASTNAME FILTER WITH REGEX COMBINATION
+        # Users IS TAKEN AS THE PRIMARY COLLECTION WITH FIRSTNAME AND LASTNAME N-GRAM FILTER
         try:
-            user_list = UsersDb().aggregate(
-                [
-                    {
-                        MongoDbAggregrationConstants.MATCH: {
-                            "Status": "Active"
-                        }
-                    },
-                    {
-                        MongoDbAggregrationConstants.MATCH: {
-                            "$and": [
-                                {
-                                    "$or": [
-                                        {
-                                            "firstname": {
-                                                "$regex": firstname,
-                                                "$options": "i",
-                                            }
-                                        },
-                                        {
-                                            "lastname": {
-                                                "$regex": lastname,
-                                                "$options": "i",
-                                            }
-                                        },
-                                    ]
-                                }
-                            ]
-                        }
-                    },
-                    # UserType IS THEN LOOKED UP FOR COMMON user_id
-                    {
-                        MongoDbAggregrationConstants.LOOKUP: {
-                            "from": "UserType",
-                            "localField": "user_id",
-                            "foreignField": "user_id",
-                            "as": "user_type_info",
-                        }
-                    },
-                    # THEN PROJECT THE RESULT AND ADDED CUSTOMER FOR THOSE RECORD DOESN'T HAVE user_type
-                    {
-                        MongoDbAggregrationConstants.PROJECT: {
-                            "_id": 0,
-                            "firstname": 1,
-                            "lastname": 1,
-                            "user_id": 1,
-                            "files_id": 1,
-                            "username": 1,
-                            "timezone": 1,
-                            "user_type": {
-                                MongoDbAggregrationConstants.COND: {
-                                    "if": {
-                                        "$eq": [
-                                            {
-                                                MongoDbAggregrationConstants.SIZE: MongoDbAggregrationConstants.USER_TYPE_INFO
-                                            },
-                                            0,
-                                        ]
-                                    },
-                                    "then": "customer",
-                                    "else": {
-                                        MongoDbAggregrationConstants.ARRAY_ELEMENT: [
-                                            MongoDbAggregrationConstants.USER_TYPE_INFO,
-                                            0,
-                                        ]
-                                    },
-                                }
-                            },
-                        }
-                    },
-                ]
+            match = active_users(
+                **{
+                    MongoDbAggregrationConstants.OR: [
+                        SearchGrams.field_condition("firstname", firstname),
+                        SearchGrams.field_condition("lastname", lastname),
+                    ]
+                }
             )
+            return UserList.paginate(match, page_size, cursor, include_total)
 
-            return user_list
-
+        except InvalidCursor:
+            raise
         except Exception as exc:  # pragma: no cover
             logging.error(f"Error occurred at user_name_list:{exc}")
             return (
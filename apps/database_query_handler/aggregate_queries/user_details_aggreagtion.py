@@ -1,7 +1,35 @@
 
 import logging
 
-from apps.database.constants import MongoDbAggregrationConstants
+from apps.database_query_handler.pipeline_builder import Pipeline, user_type_or_default
+
+
+# fields /user/me can return, a request may narrow them with ?fields=
+USER_PROFILE_PROJECTION = {
+    "username": 1,
+    "user_id": 1,
+    "firstname": 1,
+    "lastname": 1,
+    "timezone": 1,
+    "Status": 1,
+    "communication_email": 1,
+    "files_id": 1,
+    # state of a profile picture upload still being processed or failed
+    "image_upload": 1,
+    "language_preference": 1,
+    "street_address1": "$address.street_address1",
+    "street_address2": "$address.street_address2",
+    "state": "$address.state",
+    "city": "$address.city",
+    "zip_code": "$address.zip_code",
+    "phone_number": 1,
+    "country_code": 1,
+    "installer_uploaded_file_id": 1,
+    # user_type is kept on the Users document, users
+    # without one (no UserType entry) are customers
+    "user_type": user_type_or_default(),
+}
+USER_PROFILE_FIELDS = frozenset(USER_PROFILE_PROJECTION)
 
 
 class UserDetailsAggregation:
@@ -10,66 +38,25 @@ class UserDetailsAggregation:
     """
 
     @staticmethod
-    def get_complete_user_details(user_id):
-        """ """
-        try:
+    def get_complete_user_details(user_id, fields=None):
+        """
+        Returns the /user/me pipeline, projecting only fields when given.
 
-            pipeline = [
-                {
-                    MongoDbAggregrationConstants.MATCH: {
-                        "user_id": user_id
-                    }
-                },
-                {
-                    MongoDbAggregrationConstants.LOOKUP: {
-                        "from": "UserType",
-                        "localField": "user_id",
-                        "foreignField": "user_id",
-                        "as": "join_result",
-                    }
-                },
-                {
-                    MongoDbAggregrationConstants.PROJECT: {
-                        "_id": 0,
-                        "username": 1,
-                        "user_id": 1,
-                        "firstname": 1,
-                        "lastname": 1,
-                        "timezone": 1,
-                        "Status": 1,
-                        "communication_email": 1,
-                        "files_id": 1,
-                        "language_preference": 1,
-                        "street_address1": "$address.street_address1",
-                        "street_address2": "$address.street_address2",
-                        "state": "$address.state",
-                        "city": "$address.city",
-                        "zip_code": "$address.zip_code",
-                        "phone_number": 1,
-                        "country_code": 1,
-                        "installer_uploaded_file_id": 1,
-                        "user_type": {
-                            MongoDbAggregrationConstants.COND: {
-                                "if": {
-                                    "$eq": [
-                                        {
-                                            "$size": MongoDbAggregrationConstants.JOINED_RESULT
-                                        },
-                                        0,
-                                    ]
-                                },
-                                "then": "customer",
-                                "else": {
-                                    MongoDbAggregrationConstants.ARRAY_ELEMENT: [
-                                        MongoDbAggregrationConstants.JOINED_RESULT,
-                                        0,
-                                    ]
-                                },
-                            }
-                        },
-                    }
-                },
-            ]
+        Args:
+            user_id (str): The user whose profile is read.
+            fields (list, optional): Names from USER_PROFILE_FIELDS, all when empty.
+        """
+        try:
+            projection = {
+                field: USER_PROFILE_PROJECTION[field]
+                for field in (fields or USER_PROFILE_PROJECTION)
+            }
+            pipeline = (
+                Pipeline()
+                .match({"user_id": user_id})
+                .project({"_id": 0, **projection})
+                .build()
+            )
             return pipeline
         except Exception as exc:
             logging.error(
@@ -79,40 +66,24 @@ class UserDetailsAggregation:
         
     @staticmethod
     def get_user_details(username):
-        """ """
+        """
+        Returns the (filter, projection) pair for the signin user lookup.
+
+        user_type is denormalized onto Users, so this is a single indexed
+        find_one on username instead of a $lookup into UserType.
+        """
         try:
-            pipeline = [
-                {
-                    MongoDbAggregrationConstants.MATCH: {
-                        "username": username.lower()
-                    }
-                },
-                {
-                    "$lookup": {
-                        "from": "UserType",
-                        "localField": "user_id",
-                        "foreignField": "user_id",
-                        "as": "join_result",
-                    }
-                },
-                {
-                    "$unwind": {
-                        "path": "$join_result",
-                        "preserveNullAndEmptyArrays": True,
-                    }
-                },
-                {
-                    MongoDbAggregrationConstants.PROJECT: {
-                        "_id": 0,
-                        "user_id": "$user_id",
-                        "user_type": "$join_result.user_type",
-                        "username": 1,
-                        "Status": 1,
-                        "password": 1,
-                    }
-                },
-            ]
-            return pipeline
+            query = {"username": username.lower()}
+            projection = {
+                "_id": 0,
+                "user_id": 1,
+                "user_type": 1,
+                "username": 1,
+                "Status": 1,
+                "status_version": 1,
+                "password": 1,
+            }
+            return query, projection
         except Exception as exc:
             logging.error(f"Error in get_user_details: {exc}")
-            return []
\ No newline at end of file
+            return None, None
@@ -0,0 +1,271 @@
+"""
+Module: pipeline_builder.py
+
+Builder for aggregation pipelines on top of MongoDbAggregrationConstants.
+
+Queries describe their stages with Pipeline and the shared fragments below
+instead of hand written dict literals. Pipeline.build() returns a plain list
+of stages after a few rewrites which never change the documents returned:
+
+    - consecutive $match stages are merged into one
+    - $limit moves ahead of stages which keep the document count and order
+      ($project, $addFields, $lookup), so those stages run on fewer documents
+    - a $project directly after a $lookup moves ahead of the join when it keeps
+      the joined field as is and every field the join reads, so the joined
+      collection is matched against slimmer documents
+    - a $lookup whose result the following $project drops is removed
+
+Classes:
+    Pipeline: Fluent pipeline builder applying the rewrites above.
+"""
+
+import json
+from typing import Any, Dict, List, Optional
+
+from apps.database.constants import MongoDbAggregrationConstants as Agg
+
+Stage = Dict[str, Any]
+
+# stages which output exactly one document per input document, in input order
+ONE_TO_ONE_STAGES = (Agg.PROJECT, Agg.ADDFIELD, Agg.LOOKUP)
+
+
+def user_type_or_default(default: str = "customer") -> Dict[str, Any]:
+    """
+    Expression reading Users.user_type, users without one are customers.
+    """
+    return {Agg.IF_NULL: ["$user_type", default]}
+
+
+def active_users(**conditions) -> Dict[str, Any]:
+    """
+    $match condition selecting active users, extended with conditions.
+    """
+    return {"Status": "Active", **conditions}
+
+
+def customers() -> Dict[str, Any]:
+    """
+    $match condition equivalent to user_type_or_default() == "customer".
+    """
+    return {"user_type": {"$in": ["customer", None]}}
+
+
+def _merge_match(first: Dict[str, Any], second: Dict[str, Any]) -> Dict[str, Any]:
+    if not first:
+        return dict(second)
+    if not second:
+        return dict(first)
+    if first.keys().isdisjoint(second.keys()):
+        return {**first, **second}
+    return {Agg.AND: [first, second]}
+
+
+def _references(value: Any, field: str) -> bool:
+    """
+    True if value mentions field as a path ("field", "$field", "field.x", ...)
+    or reads the whole document ($$ROOT, $$CURRENT), which includes field.
+    """
+    text = json.dumps(value, default=str)
+    return any(
+        token in text
+        for token in (
+            f'"${field}"',
+            f'"${field}.',
+            f'"{field}"',
+            f'"{field}.',
+            '"$$ROOT',
+            '"$$CURRENT',
+        )
+    )
+
+
+def _lookup_reads(lookup: Dict[str, Any]) -> Optional[List[str]]:
+    """
+    Returns the top level input fields a $lookup reads, None if unknown.
+    """
+    fields = []
+    if Agg.LOCAL_FIELD in lookup:
+        fields.append(lookup[Agg.LOCAL_FIELD].split(".")[0])
+    for expression in (lookup.get("let") or {}).values():
+        if not (isinstance(expression, str) and expression.startswith("$")):
+            return None
+        fields.append(expression[1:].split(".")[0])
+    return fields
+
+
+def _is_inclusion(value: Any) -> bool:
+    return value is True or (type(value) is int and value == 1)
+
+
+class Pipeline:
+    """
+    Fluent aggregation pipeline builder.
+
+    Example:
+        Pipeline().match(active_users()).sort({"username": 1}).limit(20).build()
+    """
+
+    def __init__(self, stages: Optional[List[Stage]] = None):
+        self._stages: List[Stage] = list(stages or [])
+
+    def stage(self, stage: Stage) -> "Pipeline":
+        """
+        Appends a raw stage.
+        """
+        self._stages.append(stage)
+        return self
+
+    def match(self, condition: Dict[str, Any]) -> "Pipeline":
+        if condition:
+            self._stages.append({Agg.MATCH: condition})
+        return self
+
+    def project(self, spec: Dict[str, Any]) -> "Pipeline":
+        self._stages.append({Agg.PROJECT: spec})
+        return self
+
+    def add_fields(self, spec: Dict[str, Any]) -> "Pipeline":
+        self._stages.append({Agg.ADDFIELD: spec})
+        return self
+
+    def sort(self, spec: Dict[str, int]) -> "Pipeline":
+        self._stages.append({Agg.SORT: spec})
+        return self
+
+    def limit(self, count: int) -> "Pipeline":
+        self._stages.append({Agg.LIMIT: count})
+        return self
+
+    def unwind(self, path: str) -> "Pipeline":
+        self._stages.append({Agg.UNWIND: path})
+        return self
+
+    def lookup(
+        self,
+        from_: str,
+        as_: str,
+        local_field: Optional[str] = None,
+        foreign_field: Optional[str] = None,
+        pipeline: Optional[List[Stage]] = None,
+        project: Optional[Dict[str, Any]] = None,
+    ) -> "Pipeline":
+        """
+        Appends a $lookup.
+
+        With project, the join is written as a correlated sub-pipeline which
+        matches on local_field == foreign_field and only returns the projected
+        fields of the joined documents.
+        """
+        if project is None:
+            spec: Dict[str, Any] = {"from": from_, "as": as_}
+            if local_field is not None:
+                spec[Agg.LOCAL_FIELD] = local_field
+                spec[Agg.FOREIGN_FIELD] = foreign_field
+            if pipeline is not None:
+                spec[Agg.PIPELINE] = pipeline
+        else:
+            sub_pipeline = []
+            let = None
+            if local_field is not None:
+                let = {"local_value": f"${local_field}"}
+                sub_pipeline.append(
+                    {
+                        Agg.MATCH: {
+                            Agg.EXPR: {
+                                Agg.EQUAL: [f"${foreign_field}", "$$local_value"]
+                            }
+                        }
+                    }
+                )
+            sub_pipeline += list(pipeline or [])
+            sub_pipeline.append({Agg.PROJECT: project})
+            spec = {"from": from_, Agg.PIPELINE: sub_pipeline, "as": as_}
+            if let:
+                spec["let"] = let
+        self._stages.append({Agg.LOOKUP: spec})
+        return self
+
+    def build(self) -> List[Stage]:
+        """
+        Returns the optimised list of stages.
+        """
+        stages = [dict(stage) for stage in self._stages]
+        changed = True
+        while changed:
+            changed = False
+            for rewrite in (
+                self._merge_matches,
+                self._drop_dead_lookups,
+                self._push_projects,
+                self._push_limits,
+            ):
+                stages, did = rewrite(stages)
+                changed = changed or did
+        return stages
+
+    @staticmethod
+    def _merge_matches(stages: List[Stage]):
+        result: List[Stage] = []
+        changed = False
+        for stage in stages:
+            if result and Agg.MATCH in stage and Agg.MATCH in result[-1]:
+                result[-1] = {
+                    Agg.MATCH: _merge_match(result[-1][Agg.MATCH], stage[Agg.MATCH])
+                }
+                changed = True
+            else:
+                result.append(stage)
+        return result, changed
+
+    @staticmethod
+    def _push_limits(stages: List[Stage]):
+        for index in range(1, len(stages)):
+            stage, previous = stages[index], stages[index - 1]
+            if Agg.LIMIT in stage and next(iter(previous)) in ONE_TO_ONE_STAGES:
+                stages[index - 1], stages[index] = stage, previous
+                return stages, True
+        return stages, False
+
+    @staticmethod
+    def _drop_dead_lookups(stages: List[Stage]):
+        for index in range(len(stages) - 1):
+            lookup = stages[index].get(Agg.LOOKUP)
+            project = stages[index + 1].get(Agg.PROJECT)
+            if lookup is None or project is None:
+                continue
+            alias = lookup["as"]
+            # an inclusion projection which never mentions the alias drops it
+            inclusion = any(
+                key != "_id" and not (value == 0 or value is False)
+                for key, value in project.items()
+            )
+            if inclusion and not _references(project, alias):
+                return stages[:index] + stages[index + 1 :], True
+        return stages, False
+
+    @staticmethod
+    def _push_projects(stages: List[Stage]):
+        for index in range(len(stages) - 1):
+            lookup = stages[index].get(Agg.LOOKUP)
+            project = stages[index + 1].get(Agg.PROJECT)
+            if lookup is None or project is None:
+                continue
+            alias = lookup["as"]
+            reads = _lookup_reads(lookup)
+            if reads is None or not _is_inclusion(project.get(alias)):
+                continue
+            rest = {key: value for key, value in project.items() if key != alias}
+            # without another field the remainder would be empty (invalid) or
+            # only _id, and {"_id": 0} alone is an exclusion returning everything
+            if all(key == "_id" for key in rest) or _references(rest, alias):
+                continue
+            if any(not _is_inclusion(project.get(field)) for field in reads):
+                continue
+            stages = (
+                stages[:index]
+                + [{Agg.PROJECT: rest}, {Agg.LOOKUP: lookup}]
+                + stages[index + 2 :]
+            )
+            return stages, True
+        return stages, False
@@ -0,0 +1,108 @@
+from functools import wraps
+import logging
+
+from flask import jsonify
+from flask_jwt_extended import get_jwt, get_jwt_identity, verify_jwt_in_request
+
+from apps.database.constants import DbNameConstants, MongoDbAggregrationConstants
+from apps.database.models import TokenBlockListDb, UsersDb
+from apps.database_query_handler.pipeline_builder import Pipeline
+from apps.utils.revoked_token_index import RevokedTokenIndex
+from apps.utils.user_status_cache import UserStatusCache
+from constants.response_constants import ResponseConstants
+
+
+def resolve_revocation_and_status(jti, user_id=None, status_version=None):
+    """
+    RESOLVES WHETHER THE TOKEN IS REVOKED AND, IF user_id IS GIVEN, THE USER STATUS
+
+    PROCESS INVOLVED
+        - REVOCATION IS ANSWERED FROM THE IN-PROCESS REVOKED TOKEN INDEX WHEN POSSIBLE
+        - STATUS IS ANSWERED FROM THE USER STATUS CACHE WHEN POSSIBLE
+        - IF BOTH ARE NEEDED FROM MONGO, ONE Users AGGREGATION WITH AN UNCORRELATED
+          token_blocklist $lookup RETURNS BOTH IN A SINGLE ROUND TRIP
+
+    Returns:
+        tuple: (revoked: bool, status: str | None)
+    """
+    revoked = RevokedTokenIndex.peek(jti)
+    status_entry = (
+        UserStatusCache.peek(user_id, status_version) if user_id is not None else None
+    )
+    if user_id is None or status_entry is not None:
+        if revoked is None:
+            revoked = TokenBlockListDb().exists({"jti": jti})
+            RevokedTokenIndex.remember(jti, revoked)
+        return revoked, status_entry["status"] if status_entry else None
+
+    if revoked is not None:
+        return revoked, UserStatusCache.get_status(user_id, status_version)
+
+    result = UsersDb().aggregate(
+        Pipeline()
+        .match({"user_id": user_id})
+        .limit(1)
+        .project({"_id": 0, "Status": 1, "status_version": 1})
+        .lookup(
+            DbNameConstants.token_blocklist,
+            "revoked",
+            pipeline=[
+                {MongoDbAggregrationConstants.MATCH: {"jti": jti}},
+                {MongoDbAggregrationConstants.LIMIT: 1},
+            ],
+            project={"_id": 1},
+        )
+        .build()
+    )
+    if not result:
+        # unknown user, the blocklist still has to be consulted on its own
+        revoked = TokenBlockListDb().exists({"jti": jti})
+        RevokedTokenIndex.remember(jti, revoked)
+        UserStatusCache.store(user_id, None)
+        return revoked, None
+    revoked = bool(result[0].get("revoked"))
+    RevokedTokenIndex.remember(jti, revoked)
+    UserStatusCache.store(
+        user_id, result[0].get("Status"), result[0].get("status_version")
+    )
+    return revoked, result[0].get("Status")
+
+
+def auth_required(refresh=False, check_active=False):
+    """
+    SINGLE PASS AUTHENTICATION FOR PROTECTED ROUTES
+
+    Replaces the stacked token_required, jwt_required() and user_active_check()
+    decorators. The JWT is verified and decoded once by flask_jwt_extended, which
+    keeps the claims on the request context so get_jwt() and get_jwt_identity()
+    behave as before. Revocation and, with check_active, the user status are then
+    resolved together.
+
+    Args:
+        refresh (bool): Require a refresh token instead of an access token.
+        check_active (bool): Reject users whose Status is not Active.
+    """
+
+    def decorator(f):
+        @wraps(f)
+        def wrapped(*args, **kwargs):
+            verify_jwt_in_request(refresh=refresh)
+            try:
+                claims = get_jwt()
+                revoked, user_status = resolve_revocation_and_status(
+                    claims["jti"],
+                    get_jwt_identity() if check_active else None,
+                    claims.get("status_version"),
+                )
+            except Exception as exc:
+                logging.error(f"Error occured in function auth_required:{exc}")
+                return jsonify(message=ResponseConstants.INTERNAL_ERROR_MESSAGE), 500
+            if revoked:
+                return jsonify(message="Token revoked"), 401
+            if check_active and user_status is not None and user_status != "Active":
+                return jsonify(message="INACTIVE USER"), 422
+            return f(*args, **kwargs)
+
+        return wrapped
+
+    return decorator
@@ -1,21 +1,28 @@
-import ast
 from functools import wraps
 import logging
-from flask import json, jsonify, request
-from cryptography.fernet import Fernet
-from config import Config
+from flask import jsonify, request
+from pydantic import ValidationError
+from apps.utils import json_provider
+from apps.utils.envelope import Envelope
+from apps.utils.payload_codec import CODEC_HEADER, PayloadDecodeError, get_codec
+from apps.utils.payload_compression import ACCEPT_HEADER, decompress, maybe_compress
 from constants.response_constants import ResponseConstants
 
-fernet = Fernet(Config.FERNET_KEY)
+# response envelope scheme wanted by the client, fernet or aes-gcm
+ENVELOPE_HEADER = "X-Envelope"
 
 
-def encrypt_or_decrypt(action, fernet, data):
+def encrypt_or_decrypt(action, data, scheme=None, encoding=None):
+    """
+    Seals data (bytes) into an envelope string, or opens an envelope of either
+    scheme and decompresses it from encoding into its plaintext string;
+    returns None on failure.
+    """
     try:
-        if fernet:
-            if action == "encrypt":
-                return fernet.encrypt(data)
-            elif action == "decrypt":
-                return fernet.decrypt(data).decode()
+        if action == "encrypt":
+            return Envelope.seal(data, scheme)
+        elif action == "decrypt":
+            return decompress(Envelope.open(data), encoding).decode()
         return None
     except Exception as exc:
         logging.error(f"Error occured in function encrypt_or_decrypt:{exc}")
@@ -25,6 +32,11 @@ def encrypt_or_decrypt(action, fernet, data):
 def encryptor(func):
     """
     FOR ENCRYPTING DATA
+
+    The response is sealed with the scheme named in the X-Envelope request
+    header, ENVELOPE_DEFAULT_SCHEME when it is missing. Clients listing an
+    encoding in X-Accept-Payload-Encoding get large plaintexts compressed
+    before encryption, with the encoding returned next to the data.
     """
 
     @wraps(func)
@@ -34,13 +46,19 @@ def encryptor(func):
                 *args, **kwargs
             )  # Calling function to get response data
             if isinstance(response_data, dict) or isinstance(response_data, list):
-                json_data = json.dumps(response_data)
+                json_data = json_provider.dumps(response_data)
+                plaintext, encoding = maybe_compress(
+                    json_data.encode(), request.headers.get(ACCEPT_HEADER)
+                )
                 encrypted_data = encrypt_or_decrypt(
-                    "encrypt", fernet, json_data.encode()
+                    "encrypt", plaintext, request.headers.get(ENVELOPE_HEADER)
                 )
                 if encrypted_data is None:
                     return jsonify(message=ResponseConstants.UNPROCESSABLE_ENTITY), 422
-                response_data = {"data": encrypted_data.decode("utf-8")}, 200
+                body = {"data": encrypted_data}
+                if encoding:
+                    body["encoding"] = encoding
+                response_data = body, 200
         except Exception as exc:  # pragma: no cover
             # Handle encryption errors here
             logging.error(f"Encryption error:{exc}")
@@ -50,35 +68,62 @@ def encryptor(func):
     return wrapped
 
 
-def decryptor(func):
+def decryptor(func=None, *, model=None):
     """
     FOR DECRYPTING DATA
+
+    The plaintext is decoded with the codec named in the X-Payload-Codec header
+    (see apps.utils.payload_codec) into request.decrypted_data. With model, a
+    valid payload is also validated straight into request.decrypted_model; an
+    invalid one leaves it None so the handler reports the error as before.
+
+    Usable as @decryptor or @decryptor(model=SomeModel).
     """
+    if func is None:
+        return lambda view: decryptor(view, model=model)
 
     @wraps(func)
     def wrapped(*args, **kwargs):
         try:
             encrypted_data = None
+            request.decrypted_model = None
             # getting encrypted data from request parameter
             if request.json:
                 encrypted_data = request.json
             # check if data is not null
             if encrypted_data:
                 data = encrypted_data.get("data")
-                decrypted_data = encrypt_or_decrypt("decrypt", fernet, data)
+                decrypted_data = encrypt_or_decrypt(
+                    "decrypt", data, encoding=encrypted_data.get("encoding")
+                )
                 if decrypted_data is None:
                     return jsonify(message=ResponseConstants.UNPROCESSABLE_ENTITY), 422
 
                 # append decoded data as request object
                 if decrypted_data:
-
-                    request.decrypted_data = ast.literal_eval(decrypted_data)
+                    codec = get_codec(request.headers.get(CODEC_HEADER))
+                    if model is not None:
+                        try:
+                            request.decrypted_model = codec.decode_model(
+                                decrypted_data, model
+                            )
+                        except ValidationError:
+                            request.decrypted_model = None
+                    if request.decrypted_model is not None:
+                        request.decrypted_data = request.decrypted_model.model_dump(
+                            exclude_unset=True
+                        )
+                    else:
+                        request.decrypted_data = codec.decode(decrypted_data)
 
                 else:  # pragma: no cover
                     return (
                         jsonify(message=ResponseConstants.INTERNAL_ERROR_MESSAGE),
                         500,
                     )
+        except PayloadDecodeError as exc:
+            logging.error(f"Payload decode error: {exc}")
+            return jsonify(message=ResponseConstants.BAD_REQUEST), 400
         except Exception as exc:
             # Handle decryption errors here
             logging.error(f"Decryption error: {exc}")
@@ -2,8 +2,8 @@ from functools import wraps
 import logging
 
 from flask import jsonify, request
-from flask_jwt_extended import get_jwt_identity
-from apps.database.models import UsersDb
+from flask_jwt_extended import get_jwt, get_jwt_identity
+from apps.utils.user_status_cache import UserStatusCache
 from constants.common_constants import CommonConstant
 from constants.response_constants import ResponseConstants
 
@@ -84,13 +84,11 @@ def user_active_check():
         @wraps(f)
         def wrapped(*args, **kwargs):
             user_id = get_jwt_identity()
-            user_details = UsersDb().find_one(
-                {"user_id": user_id}, {"_id": 0, "Status": 1}
+            user_status = UserStatusCache.get_status(
+                user_id, get_jwt().get("status_version")
             )
-            if user_details:
-                user_status = user_details.get("Status")
-                if user_status != "Active":
-                    return jsonify(message="INACTIVE USER"), 422
+            if user_status is not None and user_status != "Active":
+                return jsonify(message="INACTIVE USER"), 422
 
             ret = f(*args, **kwargs)
 
@@ -1,7 +1,9 @@
 """initialization of apps"""
 
+import json
 import logging
 import sys
+import click
 from flask_jwt_extended import JWTManager
 from flask import Flask
 from flask_pymongo import PyMongo
@@ -28,6 +30,10 @@ def create_app(config_type="config.Config"):
 
     # Setting configuration for the project
     app.config.from_object(config_type)
+    # serialise jsonify responses with orjson
+    from apps.utils.json_provider import init_json
+
+    init_json(app)
     # Adding log level
     # Setup logging
     if Config.DEBUG:
@@ -49,6 +55,78 @@ def create_app(config_type="config.Config"):
     mail.init_app(app)
     # initialize mongo app
     mongo.init_app(app)
+    # indexes are built by "flask sync-indexes" during a deploy; building them
+    # at boot is opt-in and refuses to start without the unique indexes
+    from apps.database.indexes import IndexReconciler
+
+    if app.config.get("MONGO_ENSURE_INDEXES"):
+        IndexReconciler.reconcile(strict=True)
+
+    @app.cli.command("sync-indexes")
+    @click.option("--dry-run", is_flag=True, help="Only report missing and stale indexes")
+    def sync_indexes(dry_run):
+        """Reconcile MongoDB indexes with the index manifest"""
+        result = IndexReconciler.reconcile(dry_run=dry_run)
+        click.echo(json.dumps(result, indent=2))
+        failed = IndexReconciler.failed_unique(result)
+        if failed:
+            raise click.ClickException(f"Unique indexes could not be built: {failed}")
+
+    @app.cli.command("backfill-expiry")
+    @click.option("--batch-size", default=500, help="Updates per bulk write")
+    def backfill_expiry(batch_size):
+        """Add expire_at to token documents written before the TTL indexes"""
+        from apps.database.migrations import ExpiryBackfillMigration
+
+        click.echo(json.dumps(ExpiryBackfillMigration.run(batch_size), indent=2))
+
+    @app.cli.command("backfill-user-type")
+    @click.option("--batch-size", default=500, help="Users per batch")
+    @click.option("--pause-ms", default=0, help="Sleep between batches")
+    @click.option("--start-after", default=None, help="Resume after this Users _id")
+    def backfill_user_type(batch_size, pause_ms, start_after):
+        """Copy UserType.user_type onto Users documents"""
+        from bson import ObjectId
+        from apps.database.migrations import UserTypeBackfillMigration
+
+        result = UserTypeBackfillMigration.run(
+            batch_size, pause_ms, ObjectId(start_after) if start_after else None
+        )
+        click.echo(f"updated={result['updated']} last_id={result['last_id']}")
+
+    @app.cli.command("backfill-search-grams")
+    @click.option("--batch-size", default=500, help="Users per batch")
+    @click.option("--pause-ms", default=0, help="Sleep between batches")
+    @click.option("--start-after", default=None, help="Resume after this Users _id")
+    def backfill_search_grams(batch_size, pause_ms, start_after):
+        """Build the /user/list n-gram tokens for existing Users"""
+        from bson import ObjectId
+        from apps.database.migrations import SearchGramsBackfillMigration
+
+        result = SearchGramsBackfillMigration.run(
+            batch_size, pause_ms, ObjectId(start_after) if start_after else None
+        )
+        click.echo(f"updated={result['updated']} last_id={result['last_id']}")
+
+    @app.cli.command("generate-envelope-key")
+    @click.argument("kid")
+    def generate_envelope_key(kid):
+        """Print a new ENVELOPE_KEYS entry for key id KID"""
+        from apps.utils.envelope import generate_key
+
+        click.echo(f"{kid}:{generate_key()}")
+
+    @app.cli.command("calibrate-password-hash")
+    @click.option("--target-ms", type=float, default=None, help="Verify time to aim for")
+    @click.option("--store", is_flag=True, help="Make it the shared iteration count")
+    def calibrate_password_hash(target_ms, store):
+        """Print the PASSWORD_HASH_ITERATIONS value for this host"""
+        from apps.utils.password_policy import PasswordHashPolicy
+
+        iterations = PasswordHashPolicy.calibrate(target_ms)
+        if store:
+            PasswordHashPolicy.store(iterations)
+        click.echo(iterations)
 
     # Register blueprint
     from apps.blueprint_import import auth_module, user_module
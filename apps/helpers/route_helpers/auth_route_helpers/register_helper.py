@@ -1,12 +1,15 @@
 
 
+import asyncio
 import logging
 from flask import jsonify
 from pydantic import ValidationError
 from apps.database.models import UsersDb, UsersTokenDb
 from apps.models.register_models import UserRegistrationModel
 from apps.utils.generic_utils import error_message
+from apps.utils.password_hashing import HashingServiceBusy, PasswordHashingService
 from apps.validators.register_validators import RegisterUserValidator
+from apps.utils.payload_codec import as_model
 from constants.response_constants import ResponseConstants
 
 
@@ -23,7 +26,7 @@ class RegisterHelper:
         """
         try:
             # Parse and validate the request payload using Pydantic model
-            request_data = UserRegistrationModel(**request_content)
+            request_data = as_model(UserRegistrationModel, request_content)
             # Validate user_type and token consistency; revoke token if mismatch
             response, status_code = (
                 RegisterUserValidator.validate_user_type_and_revoke_token_if_mismatch(
@@ -38,7 +41,7 @@ class RegisterHelper:
                 return response, status_code
 
             # Check if user already exists by matching exact or lowercase username
-            _is_user_existing = UsersDb().find(
+            _is_user_existing = UsersDb().exists(
                 {
                     "$or": [
                         {"username": request_data.username},  # exact match
@@ -80,9 +83,82 @@ class RegisterHelper:
             first_error_msg = error_message(e)
             return jsonify(message=first_error_msg), 400
 
+        except HashingServiceBusy:
+            # Hashing queue is full, ask the client to retry instead of piling up
+            return jsonify(message=ResponseConstants.SERVICE_BUSY), 503
+
         except Exception as exc:
             logging.error(f"Error occured in function register_user_helper:{exc}")
             return (
                 jsonify(message=ResponseConstants.INTERNAL_ERROR_MESSAGE),
                 500,
             )
+
+    @staticmethod
+    async def register_user_helper_async(request_content):
+        """
+        Async variant of register_user_helper used by the async serving mode.
+
+        Token validation and the duplicate user check are independent and run
+        concurrently; password hashing is awaited from the hashing pool so it does
+        not block the shared event loop.
+        """
+        from apps.database.async_models import AsyncUsersDb, AsyncUsersTokenDb
+
+        try:
+            request_data = as_model(UserRegistrationModel, request_content)
+            (response, status_code), _is_user_existing = await asyncio.gather(
+                RegisterUserValidator.validate_user_type_and_revoke_token_if_mismatch_async(
+                    request_data.slug,
+                    request_data.user_type,
+                    request_data.token,
+                    request_data.username,
+                ),
+                AsyncUsersDb().exists(
+                    {
+                        "$or": [
+                            {"username": request_data.username},
+                            {"username": request_data.username.lower()},
+                        ]
+                    }
+                ),
+            )
+            if response:
+                return response, status_code
+
+            if _is_user_existing:
+                await AsyncUsersTokenDb().delete_many({"token": request_data.token})
+                return jsonify(message="This user already exists"), 403
+
+            response, status_code = RegisterUserValidator.is_password_valid(
+                request_data.password
+            )
+            if response:
+                return response, status_code
+
+            _hashed_password = await PasswordHashingService.hash_password_async(
+                request_data.password
+            )
+            user_data = RegisterUserValidator.prepare_user_details(
+                request_data, _hashed_password
+            )
+            if not user_data:
+                return jsonify(message=ResponseConstants.INTERNAL_ERROR_MESSAGE), 500
+
+            return await RegisterUserValidator.create_user_in_db_async(
+                user_data, request_data
+            )
+
+        except ValidationError as e:
+            first_error_msg = error_message(e)
+            return jsonify(message=first_error_msg), 400
+
+        except HashingServiceBusy:
+            return jsonify(message=ResponseConstants.SERVICE_BUSY), 503
+
+        except Exception as exc:
+            logging.error(f"Error occured in function register_user_helper_async:{exc}")
+            return (
+                jsonify(message=ResponseConstants.INTERNAL_ERROR_MESSAGE),
+                500,
+            )
@@ -6,6 +6,7 @@ from apps.models.singup_model import SignupModel
 from apps.utils.generic_utils import error_message
 from apps.utils.token_utils import create_dynamic_token
 from apps.validators.auth_validators import AuthValidator
+from apps.utils.payload_codec import as_model
 from config import Config
 from constants.response_constants import ResponseConstants
 
@@ -18,18 +19,9 @@ class SignupHelper:
         """ """
         try:
             # Validate the incoming request data using Pydantic model
-            request_data = SignupModel(**request_content)
-            # Apply rate-limiting check for signup requests
-            rate_limited = AuthValidator.rating_limiting_email(
-                request_data.email, "signup", 5
-            )
-            if rate_limited:
-                return (
-                    jsonify(message=ResponseConstants.MAXI_LIMIT_EXCEEDED),
-                    429,
-                )
+            request_data = as_model(SignupModel, request_content)
             # Check if the user already exists in the database
-            existing_user = UsersDb().find(
+            existing_user = UsersDb().exists(
                 {
                     "$or": [
                         {"username": request_data.email},  # exact match
@@ -42,10 +34,16 @@ class SignupHelper:
                     jsonify(message=AuthValidator.user_exist_check_mail()),
                     401,
                 )
-            # Generate 2FA token and slug ID
-            token, slug_id = create_dynamic_token(
-                request_data.email, request_data.user_type, "signup"
+            # Generate 2FA token and slug ID, rate limiting is applied in the same
+            # atomic token update
+            token, slug_id, rate_limited = create_dynamic_token(
+                request_data.email, request_data.user_type, "signup", rate_limit_minute=5
             )
+            if rate_limited:
+                return (
+                    jsonify(message=ResponseConstants.MAXI_LIMIT_EXCEEDED),
+                    429,
+                )
             if not token:
                 return (
                     jsonify(message=ResponseConstants.EMAIL_ID_NOT_VALID),
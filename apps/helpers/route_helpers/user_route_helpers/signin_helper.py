@@ -9,7 +9,9 @@ from apps.helpers.token_helpers.create_token_helper import CreateToken
 from apps.models.signin_models import SignIn
 from apps.utils.generic_utils import error_message
 from apps.validators.auth_validators import AuthValidator
-from werkzeug.security import check_password_hash
+from apps.utils.password_hashing import HashingServiceBusy, PasswordHashingService
+from apps.utils.password_policy import PasswordHashPolicy
+from apps.utils.payload_codec import as_model
 
 from constants.response_constants import ResponseConstants
 
@@ -37,21 +39,36 @@ class SigninHelper:
         """
         try:
             # Validate request using the SignIn Pydantic schema
-            request_data = SignIn(**request_content)
-            # Fetch user details using aggregation pipeline
-            query = UserDetailsAggregation.get_user_details(request_data.username)
-            _is_user_exists = UsersDb().aggregate(query)
+            request_data = as_model(SignIn, request_content)
+            # Fetch user details with a single indexed lookup on username
+            query, projection = UserDetailsAggregation.get_user_details(
+                request_data.username
+            )
+            user = UsersDb().find_one(query, projection)
+            _is_user_exists = [user] if user else []
             # Validate user data (check if user exists, not blocked, etc.)
             is_valid, response = AuthValidator.validate_user(_is_user_exists)
             if not is_valid:
                 return response
             # Validate password
             _hashed_password = _is_user_exists[0].get("password")
-            userauth = check_password_hash(
+            # Verification runs in the hashing process pool, not on this thread
+            userauth = PasswordHashingService.verify_password(
                 _hashed_password, request_data.password
             )
             if not userauth:
                 return jsonify(message=ResponseConstants.SIGN_IN_MESSAGE), 401
+            # Bring the stored hash in line with the current cost policy
+            SigninHelper.rehash_password_if_needed(
+                _is_user_exists[0].get("user_id"),
+                _hashed_password,
+                request_data.password,
+            )
+            # Users not yet covered by the user_type backfill
+            if "user_type" not in _is_user_exists[0]:
+                _is_user_exists[0]["user_type"] = AuthValidator.legacy_user_type(
+                    _is_user_exists[0].get("user_id")
+                )
             # Prepare JWT claims from user info
             additional_claims = AuthValidator.prepare_additional_claims(
                 _is_user_exists
@@ -81,7 +98,131 @@ class SigninHelper:
             first_error_msg = error_message(e)
             return jsonify(message=first_error_msg), 400
 
+        except HashingServiceBusy:
+            # Hashing queue is full, ask the client to retry instead of piling up
+            return jsonify(message=ResponseConstants.SERVICE_BUSY), 503
+
         except Exception as exc:
             # Handle unexpected errors with logging and generic error message
             logging.error(f"Error in signin_api_helper: {exc}")
-            return jsonify(message=ResponseConstants.INTERNAL_ERROR_MESSAGE), 500
\ No newline at end of file
+            return jsonify(message=ResponseConstants.INTERNAL_ERROR_MESSAGE), 500
+
+    @staticmethod
+    def rehash_password_if_needed(user_id, hashed_password, password):
+        """
+        Rehashes the password after a successful login when the stored hash was
+        weaker than the current hashing policy (older algorithm or a lower cost).
+
+        The update only applies if the stored hash is unchanged, and any failure
+        is logged without affecting the login.
+        """
+        try:
+            if not user_id or not PasswordHashPolicy.needs_rehash(hashed_password):
+                return False
+            new_hash = PasswordHashingService.hash_password(password)
+            UsersDb().update_one(
+                {"password": new_hash},
+                {"user_id": user_id, "password": hashed_password},
+            )
+            return True
+        except Exception as exc:
+            logging.error(f"Error in rehash_password_if_needed: {exc}")
+            return False
+
+    @staticmethod
+    async def rehash_password_if_needed_async(user_id, hashed_password, password):
+        """
+        Async variant of rehash_password_if_needed.
+        """
+        from apps.database.async_models import AsyncUsersDb
+
+        try:
+            if not user_id or not PasswordHashPolicy.needs_rehash(hashed_password):
+                return False
+            new_hash = await PasswordHashingService.hash_password_async(password)
+            await AsyncUsersDb().update_one(
+                {"password": new_hash},
+                {"user_id": user_id, "password": hashed_password},
+            )
+            return True
+        except Exception as exc:
+            logging.error(f"Error in rehash_password_if_needed_async: {exc}")
+            return False
+
+    @staticmethod
+    async def signin_api_helper_async(request_content):
+        """
+        Async variant of signin_api_helper used by the async serving mode.
+
+        The user lookup goes through the motor client and the password check is
+        awaited from the hashing pool so the shared event loop is never blocked.
+
+        Args:
+            request_content (dict): Incoming request payload from JSON body.
+
+        Returns:
+            tuple: A tuple containing a Flask response and HTTP status code.
+        """
+        from apps.database.async_models import AsyncUserTypeDb, AsyncUsersDb
+
+        try:
+            request_data = as_model(SignIn, request_content)
+            query, projection = UserDetailsAggregation.get_user_details(
+                request_data.username
+            )
+            user = await AsyncUsersDb().find_one(query, projection)
+            _is_user_exists = [user] if user else []
+            is_valid, response = AuthValidator.validate_user(_is_user_exists)
+            if not is_valid:
+                return response
+            _hashed_password = _is_user_exists[0].get("password")
+            userauth = await PasswordHashingService.verify_password_async(
+                _hashed_password, request_data.password
+            )
+            if not userauth:
+                return jsonify(message=ResponseConstants.SIGN_IN_MESSAGE), 401
+            await SigninHelper.rehash_password_if_needed_async(
+                _is_user_exists[0].get("user_id"),
+                _hashed_password,
+                request_data.password,
+            )
+            if "user_type" not in _is_user_exists[0]:
+                user_group = await AsyncUserTypeDb().find_one(
+                    {"user_id": _is_user_exists[0].get("user_id")},
+                    {"_id": 0, "user_type": 1},
+                )
+                _is_user_exists[0]["user_type"] = (user_group or {}).get(
+                    "user_type", "customer"
+                )
+            additional_claims = AuthValidator.prepare_additional_claims(
+                _is_user_exists
+            )
+            if not additional_claims:
+                return (
+                    jsonify(message=ResponseConstants.INTERNAL_ERROR_MESSAGE),
+                    500,
+                )
+            location = getattr(request_data, "location", None)
+            access_token, refresh_token = (
+                CreateToken.create_access_refresh_token(
+                    additional_claims,
+                    bool(location in ["device", "mobile_app"]),
+                )
+            )
+            return (
+                jsonify(
+                    access_token=access_token, refresh_token=refresh_token
+                ),
+                200,
+            )
+
+        except ValidationError as e:
+            first_error_msg = error_message(e)
+            return jsonify(message=first_error_msg), 400
+
+        except HashingServiceBusy:
+            return jsonify(message=ResponseConstants.SERVICE_BUSY), 503
+
+        except Exception as exc:
+            logging.error(f"Error in signin_api_helper_async: {exc}")
+            return jsonify(message=ResponseConstants.INTERNAL_ERROR_MESSAGE), 500
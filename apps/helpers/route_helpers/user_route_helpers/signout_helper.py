@@ -7,8 +7,10 @@ from pydantic import ValidationError
 from datetime import datetime
 from apps.database.models import TokenBlockListDb
 from apps.models.signout_model import SignOut
-from apps.utils.generic_utils import error_message
+from apps.utils.generic_utils import error_message, expiry_from_timestamp
+from apps.utils.revoked_token_index import RevokedTokenIndex
 from constants.response_constants import ResponseConstants
+from constants.token_expiry_constants import TokenExpireConstant
 
 
 class SignOutHelper:
@@ -17,9 +19,11 @@ class SignOutHelper:
     """
 
     @staticmethod
-    def user_signout_helper(jti,type1,request_content):
+    def user_signout_helper(jti,type1,request_content,exp=None):
         """ 
-        
+        Revokes the access token (jti, type1, exp) and the refresh token from the
+        request body. Each blocklist entry carries an expire_at equal to the
+        token's own expiry so that the TTL index removes it once it is useless.
         """
         try:
             request_data = SignOut(**request_content)
@@ -28,13 +32,26 @@ class SignOutHelper:
             ref = decode_token(request_data.refresh_token)
             rjti = ref["jti"]
             rtype = ref["type"]
+            fallback = TokenExpireConstant.MAX_TOKEN_LIFETIME
             # BOTH OF THE JTIS AND TYPES ARE STORED INTO THE TOKEN_BLOCKLIST COLLECTION
             TokenBlockListDb().insert_many(
                 [
-                    {"jti": jti, "created_at": now, "type": type1},
-                    {"jti": rjti, "created_at": now, "type": rtype},
+                    {
+                        "jti": jti,
+                        "created_at": now,
+                        "type": type1,
+                        "expire_at": expiry_from_timestamp(exp, fallback),
+                    },
+                    {
+                        "jti": rjti,
+                        "created_at": now,
+                        "type": rtype,
+                        "expire_at": expiry_from_timestamp(ref.get("exp"), fallback),
+                    },
                 ]
             )
+            # reject both tokens in this worker right away, others catch up by tailing
+            RevokedTokenIndex.add(jti, rjti)
             return jsonify(message="JWT revoked"), 200
 
         except ValidationError as e:
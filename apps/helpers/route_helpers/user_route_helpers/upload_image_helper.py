@@ -1,48 +1,220 @@
+import datetime
+import hashlib
 import logging
+import uuid
+from bson import Binary, ObjectId
 from flask import jsonify
 from gridfs import GridFS
+from gridfs.grid_file import DEFAULT_CHUNK_SIZE
 from apps.database.models import FsDb, UsersDb
+from apps.utils.image_processing import (
+    ImageProcessingBusy,
+    ImageProcessingService,
+    InvalidImage,
+)
+from apps.utils.search_cache import SearchResultCache
+from config import Config
 from constants.response_constants import ResponseConstants
 from apps.factory import mongo
 
 fs = GridFS(mongo.db)
 
+PROFILE_IMAGE = "Profile_Image"
+PROFILE_IMAGE_VARIANT = "Profile_Image_Variant"
+
 
 class UploadImageHelper:
     """ """
 
     @staticmethod
     def upload_image(profile_picture, user_id):
-        """ """
+        """
+        Queues the upload for variant generation.
+
+        The image header is checked on the request, decoding and resizing run
+        in the image worker pool and store_variants swaps the user's picture
+        once they are done.
+
+        Uploads over IMAGE_MAX_UPLOAD_BYTES are refused with 413, so at most
+        that much of an upload is held in memory per request.
+
+        A queued upload is answered with 202 and an upload_id. Until it is
+        done the current picture keeps being served and /user/me reports
+        image_upload {"upload_id", "status": "processing"}; the field is
+        removed once the new picture is in place. If processing fails the
+        current picture is kept and the status becomes "failed".
+        """
+        upload_id = None
         try:
-            updated_values = {}
-            picture_id = fs.put(
-                (profile_picture),
-                user_id=user_id,
-                File_Type="Profile_Image",
-            )
-            updated_values.update({f"files_id": f"{picture_id}"})
-            image = FsDb().find_one(
-                {
-                    "$and": [
-                        {"_id": {"$ne": picture_id}},
-                        {
-                            "user_id": user_id,
-                            "File_Type": "Profile_Image",
-                        },
-                    ]
-                },
-                {"_id": 1},
+            if profile_picture is None:
+                return jsonify(message=ResponseConstants.BAD_REQUEST), 400
+            # one byte past the limit tells an oversized (e.g. chunked) upload
+            # apart without reading all of it
+            data = profile_picture.read(Config.IMAGE_MAX_UPLOAD_BYTES + 1)
+            if len(data) > Config.IMAGE_MAX_UPLOAD_BYTES:
+                return jsonify(message=ResponseConstants.PAYLOAD_TOO_LARGE), 413
+            upload_id = str(uuid.uuid4())
+            UploadImageHelper.set_upload_status(user_id, upload_id, "processing")
+            queued = ImageProcessingService.process(
+                data,
+                lambda variants: UploadImageHelper.store_variants(
+                    user_id, variants, upload_id
+                ),
+                lambda exc: UploadImageHelper.set_upload_status(
+                    user_id, upload_id, "failed"
+                ),
             )
-            # TO AVOID ERROR RAISING FOR "nonetype' object is not subscriptable"
-            if image and "_id" in image:
-                # here id will be fetched from above query and corresponding document will be deleted
-                image_id = image["_id"]
-                # here image_id will be deleted from gridfs
-                fs.delete(image_id)
-            UsersDb().find_one_and_update({"user_id":user_id},updated_values)
+            if queued:
+                return (
+                    jsonify(
+                        message="Profile photo is being processed", upload_id=upload_id
+                    ),
+                    202,
+                )
             return jsonify(message="Profile photo uploaded for customer"), 200
 
+        except InvalidImage:
+            UploadImageHelper.clear_upload_status(user_id, upload_id)
+            return jsonify(message=ResponseConstants.UNSUPPORTED_MEDIA_TYPE), 415
+
+        except ImageProcessingBusy:
+            UploadImageHelper.clear_upload_status(user_id, upload_id)
+            return jsonify(message=ResponseConstants.SERVICE_BUSY), 503
+
         except Exception as exc:
             logging.error(f"Error occured in function upload_image:{exc}")
             return jsonify(message=ResponseConstants.INTERNAL_ERROR_MESSAGE), 500
+
+    @staticmethod
+    def set_upload_status(user_id, upload_id, status):
+        """
+        Records the state of an upload on the user; a "failed" status only
+        applies while upload_id is still the user's latest upload.
+        """
+        upload = {
+            "upload_id": upload_id,
+            "status": status,
+            "updated_at": datetime.datetime.utcnow(),
+        }
+        query = {"user_id": user_id}
+        if status != "processing":
+            query["image_upload.upload_id"] = upload_id
+        UsersDb().update_one({"image_upload": upload}, query)
+
+    @staticmethod
+    def clear_upload_status(user_id, upload_id):
+        """
+        Removes the upload state of upload_id, a newer upload's is left alone.
+        """
+        if upload_id is None:
+            return
+        UsersDb().find_one_and_modify(
+            {"user_id": user_id, "image_upload.upload_id": upload_id},
+            {"$unset": {"image_upload": ""}},
+        )
+
+    @staticmethod
+    def delete_picture(file_id):
+        """
+        Deletes a profile picture and its variant files from GridFS.
+        """
+        for variant in FsDb().iter_find({"variant_of": file_id}, {"_id": 1}):
+            fs.delete(variant["_id"])
+        fs.delete(file_id)
+
+    @staticmethod
+    def _put(data, file_id=None, inline=False, **fields):
+        """
+        Stores one encoded image in GridFS and returns its fs.files fields.
+
+        With inline the image is also kept as BinData in the fs.files document,
+        that copy is not part of the returned fields.
+        """
+        file_fields = {
+            "_id": file_id or ObjectId(),
+            "chunkSize": DEFAULT_CHUNK_SIZE,
+            # content hash served as the image ETag
+            "sha256": hashlib.sha256(data).hexdigest(),
+            **fields,
+        }
+        # fs.put takes the content as its data argument, so an inline data
+        # field has to go through new_file
+        extra = {"data": Binary(data)} if inline else {}
+        with fs.new_file(**file_fields, **extra) as grid_file:
+            grid_file.write(data)
+        return {**file_fields, "length": len(data)}
+
+    @staticmethod
+    def store_variants(user_id, variants, upload_id=None):
+        """
+        Stores the variants built by ImageProcessingService and makes them the
+        user's profile picture.
+
+        The main image is the Profile_Image file referenced by Users.files_id,
+        its variants document lists the smaller files with the fields needed to
+        stream them. Images up to IMAGE_INLINE_MAX_BYTES are also kept inline
+        as BinData (variants only inline), so serving them needs no fs.chunks
+        read. Only the picture this upload replaced is removed afterwards, so
+        concurrent uploads of one user never delete each other's files.
+        """
+        main_id = ObjectId()
+        *smaller, main = variants
+        entries = []
+        for variant in smaller:
+            fields = {
+                "size": variant["size"],
+                "width": variant["width"],
+                "height": variant["height"],
+                "contentType": variant["contentType"],
+            }
+            if len(variant["data"]) <= Config.IMAGE_INLINE_MAX_BYTES:
+                # small variants live inside the main fs.files document
+                entries.append(
+                    {
+                        "_id": ObjectId(),
+                        "length": len(variant["data"]),
+                        "sha256": hashlib.sha256(variant["data"]).hexdigest(),
+                        "data": Binary(variant["data"]),
+                        **fields,
+                    }
+                )
+                continue
+            entry = UploadImageHelper._put(
+                variant["data"],
+                user_id=user_id,
+                File_Type=PROFILE_IMAGE_VARIANT,
+                variant_of=main_id,
+                **fields,
+            )
+            for key in ("user_id", "File_Type", "variant_of"):
+                entry.pop(key)
+            entries.append(entry)
+        UploadImageHelper._put(
+            main["data"],
+            main_id,
+            inline=len(main["data"]) <= Config.IMAGE_INLINE_MAX_BYTES,
+            user_id=user_id,
+            File_Type=PROFILE_IMAGE,
+            size=main["size"],
+            width=main["width"],
+            height=main["height"],
+            contentType=main["contentType"],
+            variants=entries,
+        )
+        previous = UsersDb().find_one_and_update(
+            {"user_id": user_id},
+            {"files_id": f"{main_id}"},
+            projection={"files_id": 1},
+        )
+        if previous is None:
+            # the user is gone, nothing references the new files
+            UploadImageHelper.delete_picture(main_id)
+            return
+        UploadImageHelper.clear_upload_status(user_id, upload_id)
+        # files_id is part of the /user/list rows
+        SearchResultCache.bump()
+
+        previous_id = previous.get("files_id")
+        if previous_id and ObjectId.is_valid(previous_id):
+            # here the replaced picture and its variants are deleted from gridfs
+            UploadImageHelper.delete_picture(ObjectId(previous_id))
@@ -1,45 +1,233 @@
 
 import logging
 from bson import ObjectId
-from flask import jsonify, make_response
-from gridfs import GridFS
+from flask import Response, jsonify
+from gridfs import GridFS, GridOut
 from pydantic import ValidationError
-from apps.database.models import UsersDb
+from apps.database.models import FsDb, UsersDb
+from apps.helpers.route_helpers.user_route_helpers.upload_image_helper import (
+    PROFILE_IMAGE,
+)
+from apps.utils.cache_utils import LRUCache
+from config import Config
 from apps.models.user_image_model import UserImageModel
 from constants.response_constants import ResponseConstants
 from apps.factory import mongo
 fs = GridFS(mongo.db)
 
+# per-worker cache of small images, bounded by IMAGE_CACHE_MAX_BYTES; the TTL
+# bounds how long a replaced picture can still be served by its old URL
+image_cache = LRUCache(
+    maxsize=Config.IMAGE_CACHE_SIZE,
+    ttl=Config.IMAGE_CACHE_TTL,
+    maxbytes=Config.IMAGE_CACHE_MAX_BYTES,
+    sizeof=lambda cached: len(cached["data"]),
+)
+# (files_id, requested size) -> _id of the variant select_variant picked, so
+# every size served by one variant shares its image_cache entry
+variant_ids = LRUCache(maxsize=Config.IMAGE_CACHE_SIZE, ttl=Config.IMAGE_CACHE_TTL)
+
+
+def stream_grid_out(grid_out, start, stop):
+    """
+    Yields bytes [start, stop) of a GridFS file one stored chunk at a time,
+    so a request never holds more than one chunk in memory.
+    """
+    try:
+        grid_out.seek(start)
+        remaining = stop - start
+        while remaining > 0:
+            chunk = grid_out.readchunk()
+            if not chunk:
+                break
+            chunk = chunk[:remaining]
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        grid_out.close()
+
+
 class UserImageHelper:
     """ 
     
     """
 
     @staticmethod
-    def get_user_image(files_id):
-        """ 
-        
+    def set_cache_headers(response, etag):
+        """
+        Adds the ETag and the long lived immutable Cache-Control of image responses.
+        """
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = (
+            f"public, max-age={Config.IMAGE_CACHE_MAX_AGE}, immutable"
+        )
+
+    @staticmethod
+    def select_variant(file_document, size=None):
+        """
+        Returns the smallest stored variant at least size pixels on its longest
+        side, the largest one if none is big enough, or the main file without size.
+
+        Pictures uploaded before variants existed only have their main file.
+        """
+        if not size:
+            return file_document
+        candidates = sorted(
+            [*file_document.get("variants", []), file_document],
+            key=lambda variant: variant.get("size") or float("inf"),
+        )
+        for variant in candidates:
+            if (variant.get("size") or float("inf")) >= size:
+                return variant
+        return candidates[-1]
+
+    @staticmethod
+    def respond(body, length, content_type, etag, byte_range):
+        """
+        Builds the image response for body, a bytes object or a GridOut.
+
+        A single satisfiable Range is answered with 206, an unsatisfiable one
+        with 416; multiple ranges are not supported and get the full body with
+        200. GridOut bodies are streamed one chunk at a time.
+        """
+        start, stop, status_code = 0, length, 200
+        if byte_range is not None and len(byte_range.ranges) == 1:
+            bounds = byte_range.range_for_length(length)
+            if bounds is None:
+                if isinstance(body, GridOut):
+                    body.close()
+                response = Response(status=416)
+                response.headers["Content-Range"] = f"bytes */{length}"
+                return response, 416
+            start, stop = bounds
+            status_code = 206
+
+        if isinstance(body, GridOut):
+            body = stream_grid_out(body, start, stop)
+        else:
+            body = body[start:stop]
+        response = Response(
+            body,
+            status=status_code,
+            mimetype=content_type,
+            direct_passthrough=True,
+        )
+        response.headers["Content-Length"] = str(stop - start)
+        response.headers["Accept-Ranges"] = "bytes"
+        UserImageHelper.set_cache_headers(response, etag)
+        if status_code == 206:
+            response.headers["Content-Range"] = f"bytes {start}-{stop - 1}/{length}"
+        return response, status_code
+
+    @staticmethod
+    def not_modified(etag):
+        response = Response(status=304)
+        UserImageHelper.set_cache_headers(response, etag)
+        return response, 304
+
+    @staticmethod
+    def get_user_image(files_id, byte_range=None, if_none_match=None, size=None):
+        """
+        Serves the image stored under files_id.
+
+        A new upload always gets a new files_id, so the content behind an image
+        URL never changes: responses carry a strong ETag and an immutable
+        Cache-Control, and a matching If-None-Match is answered with 304
+        without reading the image itself.
+
+        Images up to IMAGE_CACHE_MAX_ITEM_BYTES are served from the per-worker
+        image_cache, keyed by the _id of the selected variant so all sizes
+        served by one variant share an entry. A miss first checks, on the
+        files_id index, that some user's files_id still points at the image,
+        so a replaced picture is not served even if deleting it from GridFS
+        failed. The fs.files document is then the only other read for
+        variants stored inline; other small images add one fs.chunks read and
+        large ones are streamed.
+
+        Args:
+            files_id (str): GridFS id of the image.
+            byte_range (werkzeug.datastructures.Range, optional): Parsed Range header,
+                a single satisfiable range is answered with 206 Partial Content.
+            if_none_match (werkzeug.datastructures.ETags, optional): Parsed If-None-Match.
+            size (int, optional): Wanted longest side in pixels, see select_variant.
         """
         try:
+            if not ObjectId.is_valid(files_id):
+                return jsonify(message="Image not found for the given files_id"), 404
+            cached = None
+            variant_id = variant_ids.get((files_id, size or 0))
+            if variant_id is not None:
+                cached = image_cache.get(variant_id)
+            if cached is None:
+                # only a picture a user currently has is served; a replaced one
+                # whose delete failed, or older leftovers, stay unreachable
+                if not UsersDb().exists({"files_id": files_id}):
+                    return (
+                        jsonify(message="Image not found for the given files_id"),
+                        404,
+                    )
+                file_document = FsDb().find_one(
+                    {"_id": ObjectId(files_id), "File_Type": PROFILE_IMAGE},
+                    {
+                        "_id": 1,
+                        "length": 1,
+                        "chunkSize": 1,
+                        "sha256": 1,
+                        "md5": 1,
+                        "size": 1,
+                        "contentType": 1,
+                        "data": 1,
+                        "variants": 1,
+                    },
+                )
+                if not file_document:
+                    return (
+                        jsonify(message="Image not found for the given files_id"),
+                        404,
+                    )
+                variant = UserImageHelper.select_variant(file_document, size)
+                variant_ids.set((files_id, size or 0), variant["_id"])
+                cached = image_cache.get(variant["_id"])
+            if cached is None:
+                # sha256 is stored on upload, md5 by older drivers, the id itself
+                # identifies the content of any other file as it is never rewritten
+                etag = (
+                    variant.get("sha256")
+                    or variant.get("md5")
+                    or str(variant["_id"])
+                )
+                # pictures stored before variants existed are JPEG
+                content_type = variant.get("contentType") or "image/jpeg"
+
+                if if_none_match is not None and if_none_match.contains_weak(etag):
+                    return UserImageHelper.not_modified(etag)
 
-            # Ensure that the given files_id exists in the Users collection
-            image_id_data = UsersDb().find_one(
-                {"files_id": files_id}, {"files_id": 1, "_id": 0}
+                data = variant.get("data")
+                max_item_bytes = Config.IMAGE_CACHE_MAX_ITEM_BYTES
+                if data is None and variant["length"] <= max_item_bytes:
+                    data = GridOut(mongo.db.fs, file_document=variant).read()
+                if data is None:
+                    image = GridOut(mongo.db.fs, file_document=variant)
+                    return UserImageHelper.respond(
+                        image, image.length, content_type, etag, byte_range
+                    )
+                cached = {
+                    "data": bytes(data),
+                    "content_type": content_type,
+                    "etag": etag,
+                }
+                image_cache.set(variant["_id"], cached)
+
+            etag = cached["etag"]
+            if if_none_match is not None and if_none_match.contains_weak(etag):
+                return UserImageHelper.not_modified(etag)
+            return UserImageHelper.respond(
+                cached["data"],
+                len(cached["data"]),
+                cached["content_type"],
+                etag,
+                byte_range,
             )
-            if not image_id_data:
-                # Image metadata not found
-                return (
-                    jsonify(message="Image not found for the given files_id"),
-                    404,
-                )
-            # Retrieve the actual image file from GridFS using the files_id
-            image = fs.get(ObjectId(files_id))
-            image_data = image.read()
-
-            # Return the image as a Flask HTTP response with JPEG header
-            response = make_response(image_data)
-            response.headers["Content-Type"] = "image/jpeg"
-            return response, 200
 
         except ValidationError as e:
             # Return the first validation error from the request schema
@@ -6,6 +6,7 @@ from apps.database.models import UsersDb
 from apps.database_query_handler.aggregate_queries.user_details_aggreagtion import (
     UserDetailsAggregation,
 )
+from apps.models.user_profile_model import UserProfileFieldsModel
 from apps.utils.generic_utils import error_message
 from constants.api_endpoints_constants import ApiEndpoints
 from constants.response_constants import ResponseConstants
@@ -15,7 +16,7 @@ class UserprofileHelper:
     """ """
 
     @staticmethod
-    def get_user_profile_helper(user_id):
+    def get_user_profile_helper(user_id, fields=None):
         """
         Retrieves and returns complete profile details for a given user.
 
@@ -27,6 +28,7 @@ class UserprofileHelper:
 
         Args:
             user_id (str): The unique identifier of the user whose profile is being requested.
+            fields (str, optional): Comma separated profile fields to return, all when empty.
             user_info (dict): The JWT-decoded user info (containing access scopes like `access_for`).
 
         Returns:
@@ -35,7 +37,10 @@ class UserprofileHelper:
         """
         try:
             # Create aggregation pipeline to fetch user details
-            query = UserDetailsAggregation.get_complete_user_details(user_id)
+            request_data = UserProfileFieldsModel(fields=fields)
+            query = UserDetailsAggregation.get_complete_user_details(
+                user_id, request_data.fields
+            )
             if not query:
                 return jsonify(message=ResponseConstants.BAD_REQUEST), 400
             # Execute aggregation query
@@ -43,18 +48,14 @@ class UserprofileHelper:
             if not user_details:
                 # Return empty list if no user found
                 return [], 200
-            files_id = user_details[0].get("files_id")
+            # an existing user lacking every requested field comes back as {}
+            user_details = user_details[0]
+            files_id = user_details.get("files_id")
             if files_id:
                 # Otherwise, use the regular profile image if available
                 files_id = ApiEndpoints.IMAGE_URL + "user/image/"+f"{files_id}"
                 # Update the file URL in the user detail response
-                user_details[0].update({"files_id": files_id})
-            # Decrypting the user details
-            if user_details:
-                # Decrypt sensitive user fields (e.g., email, phone, etc.)
-                user_details = user_details[0]
-            if not user_details:
-                return jsonify(ResponseConstants.INTERNAL_ERROR_MESSAGE), 500
+                user_details.update({"files_id": files_id})
 
             return user_details, 200
 
@@ -67,3 +68,43 @@ class UserprofileHelper:
             # Log and handle unexpected runtime errors
             logging.error(f"Error in user_profile_helper: {exc}")
             return jsonify(message=ResponseConstants.INTERNAL_ERROR_MESSAGE), 500
+
+    @staticmethod
+    async def get_user_profile_helper_async(user_id, fields=None):
+        """
+        Async variant of get_user_profile_helper used by the async serving mode.
+
+        Args:
+            user_id (str): The unique identifier of the user whose profile is being requested.
+            fields (str, optional): Comma separated profile fields to return, all when empty.
+
+        Returns:
+            tuple: Either a Flask JSON response with an error and status code,
+                or a dictionary of user details and a 200 status code.
+        """
+        from apps.database.async_models import AsyncUsersDb
+
+        try:
+            request_data = UserProfileFieldsModel(fields=fields)
+            query = UserDetailsAggregation.get_complete_user_details(
+                user_id, request_data.fields
+            )
+            if not query:
+                return jsonify(message=ResponseConstants.BAD_REQUEST), 400
+            user_details = await AsyncUsersDb().aggregate(query)
+            if not user_details:
+                return [], 200
+            # an existing user lacking every requested field comes back as {}
+            user_details = user_details[0]
+            files_id = user_details.get("files_id")
+            if files_id:
+                files_id = ApiEndpoints.IMAGE_URL + "user/image/"+f"{files_id}"
+                user_details.update({"files_id": files_id})
+            return user_details, 200
+
+        except ValidationError as e:
+            return jsonify(message=error_message(e)), 400
+
+        except Exception as exc:
+            logging.error(f"Error in user_profile_helper_async: {exc}")
+            return jsonify(message=ResponseConstants.INTERNAL_ERROR_MESSAGE), 500
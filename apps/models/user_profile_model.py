@@ -0,0 +1,26 @@
+from typing import List, Optional
+from pydantic import BaseModel, Field, field_validator
+
+from apps.database_query_handler.aggregate_queries.user_details_aggreagtion import (
+    USER_PROFILE_FIELDS,
+)
+from constants.common_constants import CommonConstant
+
+
+class UserProfileFieldsModel(BaseModel):
+    fields: Optional[List[str]] = Field(default=None)
+
+    @field_validator("fields", mode="before")
+    @classmethod
+    def validate_fields(cls, v):
+        if v is None:
+            return None
+        if isinstance(v, str):
+            v = v.split(",")
+        fields = [field.strip() for field in v if field.strip()]
+        unknown = sorted(set(fields) - USER_PROFILE_FIELDS)
+        if unknown:
+            raise ValueError(
+                f"{CommonConstant.UNSUPPORTED_FIELDS}: {', '.join(unknown)}"
+            )
+        return list(dict.fromkeys(fields)) or None
@@ -6,6 +6,10 @@ from apps.decorators.fernet_decorators import decryptor
 from apps.decorators.validation_decorators import content_type_check, require_fields
 from apps.helpers.route_helpers.auth_route_helpers.register_helper import RegisterHelper
 from apps.helpers.route_helpers.auth_route_helpers.singup_helper import SignupHelper
+from apps.models.register_models import UserRegistrationModel
+from apps.models.singup_model import SignupModel
+from apps.utils.async_utils import AsyncLoopRunner
+from config import Config
 from constants.response_constants import ResponseConstants
 
 
@@ -15,7 +19,7 @@ auth_module = Blueprint("auth_module", __name__, url_prefix="/auth")
 
 @auth_module.route("/signup", methods=["POST"])
 @content_type_check("json")  # Require JSON content type
-@decryptor
+@decryptor(model=SignupModel)
 @require_fields("email")
 def signup():
     """
@@ -29,7 +33,7 @@ def signup():
     """
     try:
         response, status_code = SignupHelper.user_singup_helper(
-            request.decrypted_data
+            request.decrypted_model or request.decrypted_data
         )
 
         return response, status_code
@@ -44,7 +48,7 @@ def signup():
 
 @auth_module.route("/register", methods=["POST"])
 @content_type_check("json")
-@decryptor
+@decryptor(model=UserRegistrationModel)
 @require_fields(
     "username",
     "firstname",
@@ -70,9 +74,17 @@ def add_user():
         If not existing user, new user is registered
     """
     try:
-        response, status_code = RegisterHelper.register_user_helper(
-            request.decrypted_data
-        )
+        if Config.ASYNC_DB_MODE:
+            response, status_code = AsyncLoopRunner.run(
+                RegisterHelper.register_user_helper_async(
+                    request.decrypted_model or request.decrypted_data
+                ),
+                Config.ASYNC_DB_TIMEOUT,
+            )
+        else:
+            response, status_code = RegisterHelper.register_user_helper(
+                request.decrypted_model or request.decrypted_data
+            )
 
         return response, status_code
 
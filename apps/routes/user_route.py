@@ -6,16 +6,14 @@ from flask_jwt_extended import (
     create_refresh_token,
     get_jwt,
     get_jwt_identity,
-    jwt_required,
 )
 
 from apps.database_query_handler.aggregate_queries.search_aggregation import UserList
 from apps.decorators.fernet_decorators import decryptor, encryptor
-from apps.decorators.token_validator_decorator import token_required
+from apps.decorators.auth_decorator import auth_required
 from apps.decorators.validation_decorators import (
     content_type_check,
     require_fields,
-    user_active_check,
 )
 from apps.helpers.route_helpers.user_route_helpers.signin_helper import SigninHelper
 from apps.helpers.route_helpers.user_route_helpers.signout_helper import SignOutHelper
@@ -28,6 +26,11 @@ from apps.helpers.route_helpers.user_route_helpers.user_image_helper import (
 from apps.helpers.route_helpers.user_route_helpers.user_profile_helper import (
     UserprofileHelper,
 )
+from apps.models.signin_models import SignIn
+from apps.utils.async_utils import AsyncLoopRunner
+from apps.utils.pagination import InvalidCursor
+from apps.utils.search_cache import SearchResultCache
+from config import Config
 from constants.response_constants import ResponseConstants
 
 
@@ -36,7 +39,7 @@ user_module = Blueprint("user_module", __name__, url_prefix="/user")
 
 @user_module.route("signin", methods=["POST"])
 @content_type_check("json")
-@decryptor
+@decryptor(model=SignIn)
 @require_fields("username", "password")
 def signin():
     """
@@ -49,8 +52,17 @@ def signin():
         If it is valid an access and refresh token are created with additional claims
     """
     try:
-
-        response, status_code = SigninHelper.signin_api_helper(request.decrypted_data)
+        if Config.ASYNC_DB_MODE:
+            response, status_code = AsyncLoopRunner.run(
+                SigninHelper.signin_api_helper_async(
+                    request.decrypted_model or request.decrypted_data
+                ),
+                Config.ASYNC_DB_TIMEOUT,
+            )
+        else:
+            response, status_code = SigninHelper.signin_api_helper(
+                request.decrypted_model or request.decrypted_data
+            )
 
         return response, status_code
     except Exception as exc:
@@ -61,9 +73,7 @@ def signin():
 
 
 @user_module.route("me", methods=["GET"])
-@token_required
-@jwt_required()
-@user_active_check()
+@auth_required(check_active=True)
 @encryptor
 def user_profile():
     """
@@ -74,10 +84,20 @@ def user_profile():
         From the token provided username is fetched
         User_details of that particular user is fetched
         If File ID is present then it is also included in the user_details that is being fetched
+        ?fields=firstname,lastname,files_id narrows the result to those fields
     """
     try:
         user_id = get_jwt_identity()
-        response, status_code = UserprofileHelper.get_user_profile_helper(user_id)
+        fields = request.args.get("fields")
+        if Config.ASYNC_DB_MODE:
+            response, status_code = AsyncLoopRunner.run(
+                UserprofileHelper.get_user_profile_helper_async(user_id, fields),
+                Config.ASYNC_DB_TIMEOUT,
+            )
+        else:
+            response, status_code = UserprofileHelper.get_user_profile_helper(
+                user_id, fields
+            )
         if status_code != 200:
             return response, status_code
         return response
@@ -90,33 +110,55 @@ def user_profile():
 
 
 @user_module.route("list", methods=["POST"])
-@token_required
-@jwt_required()
+@auth_required()
 @content_type_check("json")
 @decryptor
 def search_user():
-    """ """
+    """
+    API to search active customers by name or email, one page at a time
+
+    Optional fields
+        page_size: rows per page, capped at USER_LIST_MAX_PAGE_SIZE
+        cursor: next_cursor of the previous page
+        include_total: also return the (capped) number of matches
+
+    Response
+        {"users": [...], "next_cursor": str | null[, "total": int]}
+    """
     try:
         email_pattern = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
-        name = request.decrypted_data.get("search_data")
+        name = SearchResultCache.normalise(request.decrypted_data.get("search_data"))
+        if not name:
+            return jsonify(message=ResponseConstants.BAD_REQUEST), 400
+        page = {
+            "page_size": request.decrypted_data.get("page_size"),
+            "cursor": request.decrypted_data.get("cursor"),
+            "include_total": bool(request.decrypted_data.get("include_total")),
+        }
+        cache_key, user_list = SearchResultCache.lookup(name, page)
+        if user_list is not None:
+            return jsonify(user_list), 200
         if " " in name:
             first_name, last_name = name.split(maxsplit=1)
-            firstname = f".*{re.escape(first_name)}.*"
-            lastname = f".*{re.escape(last_name)}.*"
             # model function to perform aggrgration
-            user_list = UserList.user_name_list(firstname, lastname)
+            user_list = UserList.user_name_list(first_name, last_name, **page)
         # condtion to check whether received parameter is holding only email
         elif re.match(email_pattern, name):
-            user_list = UserList.user_list_request_data({"username": name})
+            # usernames are stored lowercased, like the cache key
+            user_list = UserList.user_list_request_data(
+                {"username": name.lower()}, **page
+            )
         # to check whether received parameter is holding only whether firstname or lastname
         else:
-            regex_pattern = f".*{re.escape(name)}.*"
             # model function to perform aggrgration
-            user_list = UserList.user_name_list(
-                firstname=regex_pattern, lastname=regex_pattern
-            )
+            user_list = UserList.user_name_list(firstname=name, lastname=name, **page)
+        if isinstance(user_list, dict):
+            SearchResultCache.store(cache_key, user_list)
         return jsonify(user_list), 200
 
+    except InvalidCursor:
+        return jsonify(message=ResponseConstants.BAD_REQUEST), 400
+
     except Exception as exc:
         # Step 5: Log and handle unexpected exceptions
         logging.error(f"Error occurred in function user_profle: {exc}")
@@ -128,7 +170,12 @@ def search_user():
 def render_profile_picture(image_id):
     """ """
     try:
-        response, status_code = UserImageHelper.get_user_image(image_id)
+        response, status_code = UserImageHelper.get_user_image(
+            image_id,
+            request.range,
+            request.if_none_match,
+            request.args.get("size", type=int),
+        )
 
         return response, status_code
     except Exception as exc:
@@ -139,12 +186,14 @@ def render_profile_picture(image_id):
 
 
 @user_module.route("update/profile/image", methods=["POST"])
-@token_required
-@jwt_required()
+@auth_required()
 def update_user_profile():
     """ """
     try:
         user_id = get_jwt_identity()
+        # refuse oversized uploads before the multipart body is parsed
+        if (request.content_length or 0) > Config.IMAGE_MAX_UPLOAD_BYTES:
+            return jsonify(message=ResponseConstants.PAYLOAD_TOO_LARGE), 413
         profile_picture = request.files.get("profile_picture")
         response, status_code = UploadImageHelper.upload_image(profile_picture, user_id)
         return response, status_code
@@ -156,8 +205,7 @@ def update_user_profile():
 
 
 @user_module.route("signout", methods=["DELETE"])
-@token_required
-@jwt_required()
+@auth_required()
 def singout():
     """
     API for logout and save JTI of corresponding access and refresh tokens
@@ -172,7 +220,7 @@ def singout():
         jti = get_jwt()["jti"]
         type1 = get_jwt()["type"]
         response, status_code = SignOutHelper.user_signout_helper(
-            jti, type1, request.json
+            jti, type1, request.json, get_jwt().get("exp")
         )
 
         return response, status_code
@@ -185,8 +233,7 @@ def singout():
 
 
 @user_module.route("/refresh/token", methods=["GET"])
-@jwt_required(refresh=True)
-@user_active_check()
+@auth_required(refresh=True, check_active=True)
 def refresh():
     """
     Fetching new refresh and access tokens by passing the old refresh token
@@ -202,7 +249,11 @@ def refresh():
         # FROM REFRESH_TOKEN THE ADDITIONAL CALIMS ARE ALSO FETCHED
         claims = get_jwt()["user_details"]
         user_role = get_jwt()["role"]
-        additional_claims = {"user_details": claims, "role": user_role}
+        additional_claims = {
+            "user_details": claims,
+            "role": user_role,
+            "status_version": get_jwt().get("status_version", 0),
+        }
 
         # NEW ACCESS AND REFRESH TOKENS ARE CREATED WITH ADDITIONAL CLAIMS
         access_token = create_access_token(user_id, additional_claims=additional_claims)
@@ -0,0 +1,81 @@
+"""
+Module: async_utils.py
+
+Background event loop used by the async serving mode.
+
+Flask views are synchronous, so coroutines are not awaited by the framework.
+AsyncLoopRunner owns one event loop per process, running in a daemon thread,
+and lets a request thread submit a coroutine and block until it finishes.
+All requests of a worker share the loop, so the async Mongo clients bound to
+it are created once and reused, and independent queries of one request can
+be awaited concurrently with asyncio.gather.
+
+The caller's contextvars (Flask app and request context) are copied into the
+task, so helpers can keep using jsonify and friends inside coroutines.
+"""
+
+import asyncio
+import concurrent.futures
+import contextvars
+import os
+import threading
+
+
+class AsyncLoopRunner:
+    """
+    Owns the per-process event loop thread of the async serving mode.
+    """
+
+    _lock = threading.Lock()
+    _pid = None
+    _loop = None
+    _thread = None
+
+    @classmethod
+    def get_loop(cls) -> asyncio.AbstractEventLoop:
+        """
+        Returns the event loop of this process, starting its thread on first use.
+        """
+        if cls._loop is not None and cls._pid == os.getpid():
+            return cls._loop
+        with cls._lock:
+            if cls._loop is None or cls._pid != os.getpid():
+                # a loop inherited through fork has no running thread, start a new one
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever, name="async-db-loop", daemon=True
+                )
+                thread.start()
+                cls._loop, cls._thread, cls._pid = loop, thread, os.getpid()
+            return cls._loop
+
+    @classmethod
+    def run(cls, coro, timeout=None):
+        """
+        Runs a coroutine on the background loop and waits for its result.
+
+        Args:
+            coro (coroutine): The coroutine to run.
+            timeout (float, optional): Seconds to wait before giving up.
+
+        Returns:
+            Any: The coroutine's result; its exception is re-raised.
+        """
+        loop = cls.get_loop()
+        context = contextvars.copy_context()
+        future = concurrent.futures.Future()
+
+        def _done(task):
+            if task.cancelled():
+                future.cancel()
+            elif task.exception() is not None:
+                future.set_exception(task.exception())
+            else:
+                future.set_result(task.result())
+
+        def _start():
+            task = loop.create_task(coro, context=context)
+            task.add_done_callback(_done)
+
+        loop.call_soon_threadsafe(_start)
+        return future.result(timeout)
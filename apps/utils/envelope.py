@@ -0,0 +1,140 @@
+"""
+Module: envelope.py
+
+Authenticated encryption of request and response payloads.
+
+Two schemes are understood:
+
+    fernet   the original format (AES-CBC + HMAC), one key, FERNET_KEY
+    aes-gcm  base64url (unpadded) of
+                 0x01 | len(kid) | kid | 12 byte nonce | ciphertext + tag
+             with the version byte and key id as associated data
+
+The key id travels in the envelope, so a decrypt looks its key up directly
+instead of trying every key like MultiFernet. Keys are rotated by adding a
+new "kid:key" pair to ENVELOPE_KEYS and pointing ENVELOPE_ACTIVE_KID at it;
+envelopes sealed with older ids keep opening as long as their key is listed.
+Fernet tokens always start with the 0x80 version byte, which is how open()
+tells the schemes apart.
+
+Classes:
+    EnvelopeError: Raised for envelopes which cannot be opened or sealed.
+    Envelope: Seals and opens payloads.
+"""
+
+import base64
+import os
+import threading
+
+from cryptography.exceptions import InvalidTag
+from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from config import Config
+
+FERNET = "fernet"
+AES_GCM = "aes-gcm"
+GCM_VERSION = 0x01
+FERNET_VERSION = 0x80
+NONCE_SIZE = 12
+
+
+class EnvelopeError(ValueError):
+    """
+    Raised when an envelope is malformed, uses an unknown key or fails authentication.
+    """
+
+
+def b64url_encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def b64url_decode(data) -> bytes:
+    if isinstance(data, str):
+        data = data.encode()
+    return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+
+def generate_key() -> str:
+    """
+    Returns a new base64url AES-256 key for ENVELOPE_KEYS.
+    """
+    return b64url_encode(AESGCM.generate_key(bit_length=256))
+
+
+class Envelope:
+    """
+    Process-wide key ring built from the configuration on first use.
+    """
+
+    _lock = threading.Lock()
+    _fernet = None
+    _keys = None
+
+    @classmethod
+    def _load(cls):
+        if cls._keys is not None:
+            return
+        with cls._lock:
+            if cls._keys is not None:
+                return
+            keys = {}
+            for pair in filter(None, Config.ENVELOPE_KEYS.split(",")):
+                kid, _, key = pair.strip().partition(":")
+                if not kid or len(kid.encode()) > 255:
+                    raise EnvelopeError(f"invalid key id {kid!r} in ENVELOPE_KEYS")
+                keys[kid.encode()] = AESGCM(b64url_decode(key))
+            cls._fernet = Fernet(Config.FERNET_KEY)
+            cls._keys = keys
+
+    @classmethod
+    def seal(cls, plaintext: bytes, scheme=None) -> str:
+        """
+        Encrypts plaintext with scheme, ENVELOPE_DEFAULT_SCHEME when None.
+        """
+        cls._load()
+        scheme = (scheme or Config.ENVELOPE_DEFAULT_SCHEME).lower()
+        if scheme == FERNET:
+            return cls._fernet.encrypt(plaintext).decode()
+        if scheme != AES_GCM:
+            raise EnvelopeError(f"unknown envelope scheme {scheme}")
+        kid = Config.ENVELOPE_ACTIVE_KID.encode()
+        key = cls._keys.get(kid)
+        if key is None:
+            raise EnvelopeError("ENVELOPE_ACTIVE_KID is not in ENVELOPE_KEYS")
+        header = bytes([GCM_VERSION, len(kid)]) + kid
+        nonce = os.urandom(NONCE_SIZE)
+        return b64url_encode(header + nonce + key.encrypt(nonce, plaintext, header))
+
+    @classmethod
+    def open(cls, token) -> bytes:
+        """
+        Decrypts an envelope of either scheme.
+
+        Raises:
+            EnvelopeError: If the envelope cannot be opened.
+        """
+        cls._load()
+        try:
+            raw = b64url_decode(token)
+        except (ValueError, TypeError) as exc:
+            raise EnvelopeError("envelope is not base64url") from exc
+        if not raw:
+            raise EnvelopeError("empty envelope")
+        if raw[0] == FERNET_VERSION:
+            try:
+                return cls._fernet.decrypt(token)
+            except InvalidToken as exc:
+                raise EnvelopeError("invalid fernet token") from exc
+        if raw[0] != GCM_VERSION or len(raw) < 2:
+            raise EnvelopeError("unknown envelope version")
+        header_size = 2 + raw[1]
+        header, kid = raw[:header_size], raw[2:header_size]
+        key = cls._keys.get(kid)
+        if key is None:
+            raise EnvelopeError(f"unknown key id {kid!r}")
+        nonce = raw[header_size : header_size + NONCE_SIZE]
+        try:
+            return key.decrypt(nonce, raw[header_size + NONCE_SIZE :], header)
+        except (InvalidTag, ValueError) as exc:
+            raise EnvelopeError("envelope authentication failed") from exc
@@ -1,6 +1,7 @@
 
 
 
+import datetime
 import logging
 
 from constants.common_constants import CommonConstant
@@ -23,3 +24,18 @@ def error_message(exc):
     except Exception as exc:
         logging.error(f"Error occurred in error_message: {exc}")
         return "ERRROR"
+
+
+def expiry_from_timestamp(exp, fallback=None):
+    """
+    FUNCTION TO CONVERT A JWT exp CLAIM INTO A UTC DATETIME FOR TTL INDEXES
+
+    Args:
+        exp (int | float | None): Expiry as seconds since epoch
+        fallback (timedelta, optional): Lifetime from now used when exp is missing
+    """
+    if exp is not None:
+        return datetime.datetime.fromtimestamp(exp, tz=datetime.timezone.utc)
+    if fallback is not None:
+        return datetime.datetime.now(datetime.timezone.utc) + fallback
+    return None
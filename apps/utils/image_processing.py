@@ -0,0 +1,256 @@
+"""
+Module: image_processing.py
+
+Decoding, EXIF stripping and resizing of uploaded profile pictures.
+
+Uploads are re-encoded into a fixed set of variants (IMAGE_VARIANT_SIZES,
+longest side in pixels) plus a main image capped at IMAGE_MAX_DIMENSION.
+Orientation is applied from EXIF and then all metadata is dropped. Images
+with transparency are stored as PNG, everything else as progressive JPEG.
+
+Decoding and resampling are CPU heavy, so they run in a per-worker process
+pool with a bounded queue, mirroring PasswordHashingService. The request only
+sniffs the image header; the variants are built and handed to a completion
+callback off the request path, failures to an error callback. A pool whose
+worker died is replaced and the job retried once. With IMAGE_POOL_WORKERS=0
+everything runs inline.
+
+Classes:
+    InvalidImage: Raised for uploads which are not a supported image.
+    ImageProcessingBusy: Raised when the processing queue is full.
+    ImageProcessingService: Process-wide pool building image variants.
+"""
+
+import concurrent.futures
+import io
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures.process import BrokenProcessPool
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from config import Config
+
+SUPPORTED_FORMATS = {"JPEG", "PNG", "WEBP", "GIF", "BMP"}
+
+
+class InvalidImage(ValueError):
+    """
+    Raised when an upload cannot be decoded as a supported image.
+    """
+
+
+class ImageProcessingBusy(Exception):
+    """
+    Raised when an image job cannot be queued.
+    """
+
+
+def probe(data: bytes) -> str:
+    """
+    Returns the MIME type of data after reading only the image header.
+
+    Raises:
+        InvalidImage: If data is not one of SUPPORTED_FORMATS.
+    """
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image_format = image.format
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as exc:
+        raise InvalidImage("Unsupported image") from exc
+    if image_format not in SUPPORTED_FORMATS:
+        raise InvalidImage("Unsupported image")
+    return Image.MIME[image_format]
+
+
+def build_variants(data: bytes, sizes, max_dimension: int, quality: int):
+    """
+    Decodes data and returns its re-encoded variants, smallest first.
+
+    The last entry is the main image. Sizes not smaller than the source are
+    skipped, so small uploads are never upscaled.
+
+    Returns:
+        list: dicts with size, width, height, contentType and data.
+    """
+    with Image.open(io.BytesIO(data)) as source:
+        image = ImageOps.exif_transpose(source)
+        has_alpha = image.mode in ("RGBA", "LA", "PA") or (
+            image.mode == "P" and "transparency" in image.info
+        )
+        image = image.convert("RGBA" if has_alpha else "RGB")
+    if has_alpha:
+        image_format, content_type = "PNG", "image/png"
+    else:
+        image_format, content_type = "JPEG", "image/jpeg"
+    longest = max(image.size)
+    main_size = min(longest, max_dimension)
+    targets = sorted({size for size in sizes if 0 < size < main_size} | {main_size})
+
+    variants = []
+    for target in targets:
+        resized = image.copy()
+        resized.thumbnail((target, target), Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        if image_format == "JPEG":
+            resized.save(
+                buffer, "JPEG", quality=quality, optimize=True, progressive=True
+            )
+        else:
+            resized.save(buffer, "PNG", optimize=True)
+        variants.append(
+            {
+                "size": max(resized.size),
+                "width": resized.width,
+                "height": resized.height,
+                "contentType": content_type,
+                "data": buffer.getvalue(),
+            }
+        )
+    return variants
+
+
+class ImageProcessingService:
+    """
+    Per-process pool of image workers with a bounded queue.
+    """
+
+    _lock = threading.Lock()
+    _pid = None
+    _executor = None
+    _callbacks = None
+    _slots = None
+
+    @classmethod
+    def _get_executor(cls):
+        if cls._executor is not None and cls._pid == os.getpid():
+            return cls._executor
+        with cls._lock:
+            if cls._executor is None or cls._pid != os.getpid():
+                # a replaced broken pool keeps the callback thread and queue slots
+                if cls._callbacks is None or cls._pid != os.getpid():
+                    # callbacks write to Mongo, keep them off the pool's result thread
+                    cls._callbacks = concurrent.futures.ThreadPoolExecutor(
+                        max_workers=1, thread_name_prefix="image-store"
+                    )
+                    cls._slots = threading.BoundedSemaphore(Config.IMAGE_QUEUE_DEPTH)
+                cls._executor = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=Config.IMAGE_POOL_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+                cls._pid = os.getpid()
+            return cls._executor
+
+    @classmethod
+    def _discard(cls, executor):
+        """
+        Drops a broken pool so that the next job starts a new one.
+        """
+        with cls._lock:
+            if cls._executor is executor:
+                cls._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+        logging.error("Image processing pool is broken, starting a new one")
+
+    @staticmethod
+    def _variant_args(data):
+        return (
+            data,
+            Config.IMAGE_VARIANT_SIZES,
+            Config.IMAGE_MAX_DIMENSION,
+            Config.IMAGE_JPEG_QUALITY,
+        )
+
+    @staticmethod
+    def _fail(on_error, exc):
+        logging.error(f"Image processing failed: {exc}")
+        if on_error is None:
+            return
+        try:
+            on_error(exc)
+        except Exception as error:
+            logging.error(f"Image processing error callback failed: {error}")
+
+    @classmethod
+    def _complete(cls, future, on_done, on_error):
+        try:
+            variants = future.result()
+        except Exception as exc:
+            cls._fail(on_error, exc)
+            return
+        try:
+            on_done(variants)
+        except Exception as exc:
+            cls._fail(on_error, exc)
+
+    @classmethod
+    def _retry(cls, data, on_done, on_error):
+        try:
+            cls._submit(data, on_done, on_error, retry=False)
+        except Exception as exc:
+            cls._fail(on_error, exc)
+
+    @classmethod
+    def _submit(cls, data, on_done, on_error, retry):
+        executor = cls._get_executor()
+        slots, callbacks = cls._slots, cls._callbacks
+        if not slots.acquire(blocking=False):
+            raise ImageProcessingBusy("image processing queue is full")
+        try:
+            future = executor.submit(build_variants, *cls._variant_args(data))
+        except BrokenProcessPool:
+            slots.release()
+            cls._discard(executor)
+            if not retry:
+                raise
+            return cls._submit(data, on_done, on_error, retry=False)
+        except Exception:
+            slots.release()
+            raise
+
+        def done(finished):
+            slots.release()
+            if (
+                retry
+                and not finished.cancelled()
+                and isinstance(finished.exception(), BrokenProcessPool)
+            ):
+                cls._discard(executor)
+                callbacks.submit(cls._retry, data, on_done, on_error)
+                return
+            callbacks.submit(cls._complete, finished, on_done, on_error)
+
+        future.add_done_callback(done)
+        return True
+
+    @classmethod
+    def process(cls, data: bytes, on_done, on_error=None):
+        """
+        Builds the variants of data and calls on_done(variants), or
+        on_error(exc) if that fails after the job was queued.
+
+        Returns:
+            bool: True if processing was queued, False if it already ran inline.
+
+        Raises:
+            InvalidImage: If data is not a supported image.
+            ImageProcessingBusy: If the queue is full.
+        """
+        probe(data)
+        if Config.IMAGE_POOL_WORKERS <= 0:
+            on_done(build_variants(*cls._variant_args(data)))
+            return False
+        return cls._submit(data, on_done, on_error, retry=True)
+
+    @classmethod
+    def shutdown(cls):
+        with cls._lock:
+            if cls._pid == os.getpid():
+                if cls._executor is not None:
+                    cls._executor.shutdown(wait=False, cancel_futures=True)
+                if cls._callbacks is not None:
+                    cls._callbacks.shutdown(wait=False)
+            cls._executor = None
+            cls._callbacks = None
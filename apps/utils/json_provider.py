@@ -0,0 +1,132 @@
+"""
+Module: json_provider.py
+
+Application JSON serialisation backed by orjson.
+
+jsonify and the encryptor both go through dumps() below. orjson is used when
+it is installed, the standard library otherwise (and for the rare values
+orjson refuses, such as integers beyond 64 bits). Both paths share one
+default() so the output does not depend on which one ran: dates keep Flask's
+HTTP date format, ObjectId and UUID become strings and pydantic models are
+dumped in JSON mode. Keys are sorted like Flask's default JSON_SORT_KEYS.
+
+On Flask 2.2+ the serialiser is installed as the app's JSON provider. Older
+Flask (the pinned 2.1) has no providers: its jsonify calls json.dumps with
+the app's json_encoder class, so AppJSONEncoder.encode hands the object to
+dumps(), including the indent=2 output jsonify uses in debug mode (on in
+Config) or with JSONIFY_PRETTYPRINT_REGULAR.
+
+Functions:
+    dumps, loads: Serialise and parse JSON.
+    init_json: Installs the serialiser on an app.
+"""
+
+import dataclasses
+import datetime
+import decimal
+import json
+import uuid
+
+from bson import ObjectId
+from pydantic import BaseModel
+from werkzeug.http import http_date
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    from flask.json.provider import DefaultJSONProvider
+except ImportError:  # Flask < 2.2
+    DefaultJSONProvider = None
+
+ORJSON_OPTIONS = (
+    orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    if orjson
+    else 0
+)
+
+
+def default(obj):
+    """
+    Serialises the values JSON has no type for.
+    """
+    if isinstance(obj, (datetime.date, datetime.datetime)):
+        return http_date(obj)
+    if isinstance(obj, (ObjectId, uuid.UUID, decimal.Decimal)):
+        return str(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if hasattr(obj, "__html__"):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj, indent=None) -> str:
+    if orjson is not None:
+        # orjson only indents by 2, the indent jsonify pretty prints with
+        option = ORJSON_OPTIONS | (orjson.OPT_INDENT_2 if indent else 0)
+        try:
+            return orjson.dumps(obj, default=default, option=option).decode()
+        except orjson.JSONEncodeError:
+            pass
+    return json.dumps(obj, default=default, sort_keys=True, indent=indent)
+
+
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class AppJSONEncoder(json.JSONEncoder):
+    """
+    JSON encoder for Flask < 2.2, serialising with dumps().
+    """
+
+    def encode(self, o):
+        if self.indent in (None, 2):
+            return dumps(o, self.indent)
+        return super().encode(o)
+
+    def default(self, o):
+        return default(o)
+
+
+if DefaultJSONProvider is not None:
+
+    class AppJSONProvider(DefaultJSONProvider):
+        """
+        Flask JSON provider serialising with dumps() and parsing with loads().
+        """
+
+        def dumps(self, obj, **kwargs):
+            return dumps(obj)
+
+        def loads(self, s, **kwargs):
+            return loads(s)
+
+        def response(self, *args, **kwargs):
+            obj = self._prepare_response_obj(args, kwargs)
+            return self._app.response_class(
+                f"{dumps(obj)}\n", mimetype=self.mimetype
+            )
+
+else:
+    AppJSONProvider = None
+
+
+def init_json(app):
+    """
+    Makes jsonify on app use the shared serialiser.
+    """
+    if AppJSONProvider is not None:
+        app.json_provider_class = AppJSONProvider
+        app.json = AppJSONProvider(app)
+    else:
+        app.json_encoder = AppJSONEncoder
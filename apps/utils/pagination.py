@@ -0,0 +1,99 @@
+"""
+Module: pagination.py
+
+Keyset (cursor) pagination for the /user/list search.
+
+Pages are ordered by (username, user_id) and the next page starts strictly
+after the last row of the previous one, so a page costs the same whatever
+its position and rows inserted or removed between requests never shift the
+results. The continuation token is the url-safe base64 of that last
+(username, user_id) pair; clients pass it back unchanged.
+
+Classes:
+    InvalidCursor: Raised for a continuation token that cannot be decoded.
+    KeysetPagination: Page size policy, token codec and the keyset filter.
+"""
+
+import base64
+import json
+
+from config import Config
+
+SORT_KEY = "username"
+TIE_BREAKER = "user_id"
+
+
+class InvalidCursor(ValueError):
+    """
+    Raised when a continuation token is malformed.
+    """
+
+
+class KeysetPagination:
+    """
+    Helpers to page a Users query on (username, user_id).
+    """
+
+    @staticmethod
+    def page_size(requested=None):
+        """
+        Returns the page size to use, clamped to USER_LIST_MAX_PAGE_SIZE.
+        """
+        try:
+            size = int(requested) if requested is not None else 0
+        except (TypeError, ValueError):
+            size = 0
+        if size <= 0:
+            size = Config.USER_LIST_PAGE_SIZE
+        return min(size, Config.USER_LIST_MAX_PAGE_SIZE)
+
+    @staticmethod
+    def sort():
+        """
+        Returns the $sort stage body matching the keyset order.
+        """
+        return {SORT_KEY: 1, TIE_BREAKER: 1}
+
+    @staticmethod
+    def encode(document):
+        """
+        Returns the continuation token pointing after document.
+        """
+        raw = json.dumps(
+            [document.get(SORT_KEY), document.get(TIE_BREAKER)],
+            separators=(",", ":"),
+        ).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @staticmethod
+    def decode(token):
+        """
+        Returns the (username, user_id) pair stored in token.
+
+        Raises:
+            InvalidCursor: If the token is not one produced by encode.
+        """
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            key, tie = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        except Exception as exc:
+            raise InvalidCursor("Invalid cursor") from exc
+        # only plain strings may reach the query, never operators
+        if not isinstance(key, str) or not isinstance(tie, str):
+            raise InvalidCursor("Invalid cursor")
+        return key, tie
+
+    @staticmethod
+    def after(token):
+        """
+        Returns the filter selecting the rows after token, {} for the first page.
+        """
+        if not token:
+            return {}
+        key, tie = KeysetPagination.decode(token)
+        return {
+            "$or": [
+                {SORT_KEY: {"$gt": key}},
+                {SORT_KEY: key, TIE_BREAKER: {"$gt": tie}},
+            ]
+        }
@@ -0,0 +1,162 @@
+"""
+Module: password_hashing.py
+
+Bounded process pool for password hashing and verification.
+
+Password hashes are deliberately CPU heavy. Running them on the request
+thread lets a burst of signins starve every other endpoint of the worker, so
+they are submitted to a per-worker process pool instead. The number of
+in-flight jobs is capped (HASH_QUEUE_DEPTH) and each job has a timeout
+(HASH_TIMEOUT_SECONDS); callers get HashingServiceBusy instead of queueing
+without bound. With HASH_POOL_WORKERS=0 hashing runs inline.
+
+A pool whose worker died (e.g. OOM killed) is broken for good, so it is
+discarded and the job is retried once on a fresh pool.
+
+Classes:
+    HashingServiceBusy: Raised when the queue is full or a job times out.
+    PasswordHashingService: Process-wide pool used by signin and register.
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures.process import BrokenProcessPool
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from apps.utils.password_policy import PasswordHashPolicy
+from config import Config
+
+
+class HashingServiceBusy(Exception):
+    """
+    Raised when a hashing job cannot be queued or does not finish in time.
+    """
+
+
+class PasswordHashingService:
+    """
+    Per-process pool of hashing workers with a bounded queue.
+    """
+
+    _lock = threading.Lock()
+    _pid = None
+    _executor = None
+    _slots = None
+
+    @classmethod
+    def _get_executor(cls):
+        if cls._executor is not None and cls._pid == os.getpid():
+            return cls._executor
+        with cls._lock:
+            if cls._executor is None or cls._pid != os.getpid():
+                # spawn, so the children never inherit the web worker's threads and sockets
+                cls._executor = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=Config.HASH_POOL_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+                cls._slots = threading.BoundedSemaphore(Config.HASH_QUEUE_DEPTH)
+                cls._pid = os.getpid()
+            return cls._executor
+
+    @classmethod
+    def _discard(cls, executor):
+        """
+        Drops a broken pool so that the next job starts a new one.
+        """
+        with cls._lock:
+            if cls._executor is executor:
+                cls._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+        logging.error("Password hashing pool is broken, starting a new one")
+
+    @classmethod
+    def _submit(cls, func, *args):
+        """
+        Returns (executor, future) of func(*args) queued on the pool.
+        """
+        executor = cls._get_executor()
+        slots = cls._slots
+        if not slots.acquire(blocking=False):
+            raise HashingServiceBusy("password hashing queue is full")
+        try:
+            future = executor.submit(func, *args)
+        except BrokenProcessPool:
+            slots.release()
+            cls._discard(executor)
+            raise
+        except Exception:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: slots.release())
+        return executor, future
+
+    @classmethod
+    def _run(cls, func, *args):
+        if Config.HASH_POOL_WORKERS <= 0:
+            return func(*args)
+        for retry in (True, False):
+            executor = future = None
+            try:
+                executor, future = cls._submit(func, *args)
+                return future.result(timeout=Config.HASH_TIMEOUT_SECONDS)
+            except BrokenProcessPool:
+                # a worker died; the pool was already dropped if submit failed
+                if future is not None:
+                    cls._discard(executor)
+                if not retry:
+                    raise
+            except concurrent.futures.TimeoutError:
+                future.cancel()
+                logging.error("Password hashing job timed out")
+                raise HashingServiceBusy("password hashing timed out")
+
+    @classmethod
+    async def _run_async(cls, func, *args):
+        if Config.HASH_POOL_WORKERS <= 0:
+            return await asyncio.to_thread(func, *args)
+        for retry in (True, False):
+            executor = future = None
+            try:
+                executor, future = cls._submit(func, *args)
+                return await asyncio.wait_for(
+                    asyncio.wrap_future(future), Config.HASH_TIMEOUT_SECONDS
+                )
+            except BrokenProcessPool:
+                # a worker died; the pool was already dropped if submit failed
+                if future is not None:
+                    cls._discard(executor)
+                if not retry:
+                    raise
+            except asyncio.TimeoutError:
+                logging.error("Password hashing job timed out")
+                raise HashingServiceBusy("password hashing timed out")
+
+    @classmethod
+    def hash_password(cls, password: str) -> str:
+        return cls._run(generate_password_hash, password, PasswordHashPolicy.method())
+
+    @classmethod
+    def verify_password(cls, pwhash: str, password: str) -> bool:
+        return cls._run(check_password_hash, pwhash, password)
+
+    @classmethod
+    async def hash_password_async(cls, password: str) -> str:
+        return await cls._run_async(
+            generate_password_hash, password, PasswordHashPolicy.method()
+        )
+
+    @classmethod
+    async def verify_password_async(cls, pwhash: str, password: str) -> bool:
+        return await cls._run_async(check_password_hash, pwhash, password)
+
+    @classmethod
+    def shutdown(cls):
+        with cls._lock:
+            if cls._executor is not None and cls._pid == os.getpid():
+                cls._executor.shutdown(wait=False, cancel_futures=True)
+            cls._executor = None
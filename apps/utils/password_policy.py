@@ -0,0 +1,177 @@
+"""
+Module: password_policy.py
+
+Password hashing policy: which algorithm and cost new hashes use and whether
+a stored hash is still within policy.
+
+werkzeug stores the method and its parameters in the hash itself
+("pbkdf2:sha256:260000$salt$hash"), so the cost of every stored hash is known.
+The policy iteration count is either configured (PASSWORD_HASH_ITERATIONS)
+or calibrated to hit PASSWORD_HASH_TARGET_MS per verification. A calibrated
+count is measured once, by the first process which finds none, and stored in
+AppSettings; every worker and host then uses that value, so they never rehash
+each other's output. "flask calibrate-password-hash --store" replaces it, and
+workers pick the new value up when they restart. The count never goes below
+PASSWORD_HASH_MIN_ITERATIONS.
+
+Hashes with another algorithm, or a cost lower than the policy by more than
+PASSWORD_HASH_TOLERANCE, are rehashed after the next successful login. A
+stronger hash is never weakened.
+
+Classes:
+    PasswordHashPolicy: Calibrates, formats and checks hashing parameters.
+"""
+
+import datetime
+import hashlib
+import logging
+import os
+import threading
+import time
+
+from pymongo.errors import DuplicateKeyError
+
+from apps.database.models import AppSettingsDb
+from config import Config
+
+DEFAULT_ALGORITHM = "pbkdf2"
+DEFAULT_DIGEST = "sha256"
+# AppSettings document holding the shared iteration count
+ITERATIONS_SETTING = "password_hash_iterations"
+
+
+class PasswordHashPolicy:
+    """
+    Process-wide password hashing policy.
+    """
+
+    _lock = threading.Lock()
+    _iterations = None
+
+    @staticmethod
+    def calibrate(target_ms=None, digest=DEFAULT_DIGEST, sample_iterations=20000):
+        """
+        Measures pbkdf2 speed on this host and returns the iteration count which
+        makes one verification take about target_ms.
+
+        Args:
+            target_ms (float, optional): Defaults to Config.PASSWORD_HASH_TARGET_MS.
+            digest (str): Hash function of pbkdf2.
+            sample_iterations (int): Iterations used for each measurement.
+
+        Returns:
+            int: Iteration count, rounded to thousands and never below
+                Config.PASSWORD_HASH_MIN_ITERATIONS.
+        """
+        target_ms = target_ms or Config.PASSWORD_HASH_TARGET_MS
+        salt = os.urandom(16)
+        timings = []
+        for _ in range(5):
+            started = time.perf_counter()
+            hashlib.pbkdf2_hmac(digest, b"calibration-password", salt, sample_iterations)
+            timings.append(time.perf_counter() - started)
+        # the fastest run is the least disturbed by other load on the host
+        per_iteration_ms = min(timings) * 1000 / sample_iterations
+        iterations = int(target_ms / per_iteration_ms) // 1000 * 1000
+        return max(iterations, Config.PASSWORD_HASH_MIN_ITERATIONS)
+
+    @classmethod
+    def _load_or_calibrate(cls):
+        """
+        Returns the stored iteration count, calibrating and storing it if there
+        is none yet. When processes race, the first insert wins and the others
+        read it back.
+        """
+        settings = AppSettingsDb()
+        stored = settings.find_one({"_id": ITERATIONS_SETTING}, {"_id": 0, "value": 1})
+        if stored is None:
+            calibrated = cls.calibrate()
+            try:
+                stored = settings.find_one_and_modify(
+                    {"_id": ITERATIONS_SETTING},
+                    {
+                        "$setOnInsert": {
+                            "value": calibrated,
+                            "updated_at": datetime.datetime.utcnow(),
+                        }
+                    },
+                    upsert=True,
+                    projection={"_id": 0, "value": 1},
+                )
+            except DuplicateKeyError:
+                stored = settings.find_one(
+                    {"_id": ITERATIONS_SETTING}, {"_id": 0, "value": 1}
+                )
+            logging.info(f"Password hash iterations set to {stored['value']}")
+        return int(stored["value"])
+
+    @classmethod
+    def iterations(cls):
+        """
+        Returns the policy iteration count: PASSWORD_HASH_ITERATIONS when set,
+        the shared calibrated value otherwise.
+        """
+        if Config.PASSWORD_HASH_ITERATIONS:
+            return max(
+                Config.PASSWORD_HASH_ITERATIONS, Config.PASSWORD_HASH_MIN_ITERATIONS
+            )
+        if cls._iterations is None:
+            with cls._lock:
+                if cls._iterations is None:
+                    cls._iterations = max(
+                        cls._load_or_calibrate(), Config.PASSWORD_HASH_MIN_ITERATIONS
+                    )
+        return cls._iterations
+
+    @classmethod
+    def store(cls, iterations):
+        """
+        Replaces the shared iteration count, e.g. after moving to new hardware.
+        """
+        AppSettingsDb().update_one(
+            {"value": int(iterations), "updated_at": datetime.datetime.utcnow()},
+            {"_id": ITERATIONS_SETTING},
+            upsert=True,
+        )
+        with cls._lock:
+            cls._iterations = None
+
+    @classmethod
+    def method(cls):
+        """
+        Returns the werkzeug method string for new hashes, e.g. "pbkdf2:sha256:600000".
+        """
+        return f"{DEFAULT_ALGORITHM}:{DEFAULT_DIGEST}:{cls.iterations()}"
+
+    @staticmethod
+    def parse_method(pwhash: str):
+        """
+        Extracts (algorithm, digest, iterations) from a stored werkzeug hash.
+
+        Returns:
+            tuple: (str, str | None, int | None); iterations is None when the hash
+                does not record them.
+        """
+        method = pwhash.split("$", 1)[0]
+        parts = method.split(":")
+        algorithm = parts[0]
+        digest = parts[1] if len(parts) > 1 else None
+        iterations = int(parts[2]) if len(parts) > 2 and parts[2].isdigit() else None
+        return algorithm, digest, iterations
+
+    @classmethod
+    def needs_rehash(cls, pwhash: str) -> bool:
+        """
+        Checks whether a stored hash is weaker than the current policy.
+        """
+        try:
+            algorithm, digest, iterations = cls.parse_method(pwhash)
+        except Exception as exc:
+            logging.error(f"Error occured in function needs_rehash:{exc}")
+            return False
+        if algorithm != DEFAULT_ALGORITHM or digest != DEFAULT_DIGEST:
+            return True
+        if iterations is None:
+            return True
+        # only ever rehash upwards, a slower host must not weaken stored hashes
+        return iterations < cls.iterations() * (1 - Config.PASSWORD_HASH_TOLERANCE)
@@ -0,0 +1,128 @@
+"""
+Module: payload_codec.py
+
+Codecs turning a decrypted request payload into a dict or a pydantic model.
+
+The client names the codec of the plaintext in the X-Payload-Codec header:
+
+    json            strict JSON, parsed with orjson when it is installed and
+                    validated by pydantic-core straight from the bytes when a
+                    model is wanted (model_validate_json)
+    python-literal  the Python dict repr older clients send, parsed with
+                    ast.literal_eval
+    auto            json, falling back to python-literal; used when the header
+                    is missing (PAYLOAD_DEFAULT_CODEC)
+
+Classes:
+    PayloadDecodeError: Raised when a payload cannot be decoded.
+    JsonCodec, LiteralCodec, AutoCodec: The codecs above.
+"""
+
+import ast
+import json
+
+from pydantic import BaseModel, ValidationError
+
+from config import Config
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+CODEC_HEADER = "X-Payload-Codec"
+
+
+class PayloadDecodeError(ValueError):
+    """
+    Raised when a payload is not valid for its codec.
+    """
+
+
+class JsonCodec:
+    name = "json"
+
+    @staticmethod
+    def decode(raw):
+        try:
+            data = orjson.loads(raw) if orjson else json.loads(raw)
+        except ValueError as exc:
+            raise PayloadDecodeError(str(exc)) from exc
+        if not isinstance(data, dict):
+            raise PayloadDecodeError("payload must be an object")
+        return data
+
+    @staticmethod
+    def decode_model(raw, model):
+        """
+        Validates raw into model without building an intermediate dict.
+
+        Raises:
+            pydantic.ValidationError: If raw is not valid JSON for model.
+        """
+        return model.model_validate_json(raw)
+
+
+class LiteralCodec:
+    name = "python-literal"
+
+    @staticmethod
+    def decode(raw):
+        if isinstance(raw, bytes):
+            raw = raw.decode()
+        try:
+            data = ast.literal_eval(raw)
+        except (ValueError, SyntaxError, MemoryError, RecursionError) as exc:
+            raise PayloadDecodeError(str(exc)) from exc
+        if not isinstance(data, dict):
+            raise PayloadDecodeError("payload must be a dict")
+        return data
+
+    @classmethod
+    def decode_model(cls, raw, model):
+        return model.model_validate(cls.decode(raw))
+
+
+class AutoCodec:
+    name = "auto"
+
+    @staticmethod
+    def decode(raw):
+        try:
+            return JsonCodec.decode(raw)
+        except PayloadDecodeError:
+            return LiteralCodec.decode(raw)
+
+    @staticmethod
+    def decode_model(raw, model):
+        try:
+            return JsonCodec.decode_model(raw, model)
+        except ValidationError as exc:
+            if not any(error["type"] == "json_invalid" for error in exc.errors()):
+                raise
+        return LiteralCodec.decode_model(raw, model)
+
+
+CODECS = {codec.name: codec for codec in (JsonCodec, LiteralCodec, AutoCodec)}
+
+
+def get_codec(name=None):
+    """
+    Returns the codec registered under name, PAYLOAD_DEFAULT_CODEC when empty.
+
+    Raises:
+        PayloadDecodeError: If name is not a known codec.
+    """
+    codec = CODECS.get((name or Config.PAYLOAD_DEFAULT_CODEC).strip().lower())
+    if codec is None:
+        raise PayloadDecodeError(f"unknown payload codec {name}")
+    return codec
+
+
+def as_model(model, content):
+    """
+    Returns content as a model instance, validating it if it is still a dict.
+    """
+    if isinstance(content, BaseModel):
+        return content
+    return model(**content)
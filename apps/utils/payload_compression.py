@@ -0,0 +1,95 @@
+"""
+Module: payload_compression.py
+
+Optional compression of payload plaintext before it is encrypted.
+
+Ciphertext does not compress, so this has to happen inside the envelope.
+Responses are compressed only when the client lists an encoding in the
+X-Accept-Payload-Encoding header (same syntax as Accept-Encoding) and the
+plaintext is at least PAYLOAD_COMPRESS_MIN_BYTES; the encoding used is
+returned next to the envelope as {"data": ..., "encoding": "gzip"}. Requests
+may be sent the same way, their decompressed size is capped at
+PAYLOAD_MAX_DECOMPRESSED_BYTES.
+
+Functions:
+    negotiate: Picks the response encoding from the request header.
+    maybe_compress: Compresses a response plaintext when negotiated and worth it.
+    decompress: Restores a compressed request plaintext.
+"""
+
+import zlib
+
+from config import Config
+
+ACCEPT_HEADER = "X-Accept-Payload-Encoding"
+IDENTITY = "identity"
+# zlib window bits selecting the container of each encoding
+WBITS = {"gzip": 16 + zlib.MAX_WBITS, "deflate": zlib.MAX_WBITS}
+
+
+class PayloadCompressionError(ValueError):
+    """
+    Raised for an unknown encoding or a corrupt or oversized compressed payload.
+    """
+
+
+def negotiate(accept_header):
+    """
+    Returns the preferred supported encoding of accept_header, None for identity.
+    """
+    best, best_q = None, 0.0
+    for item in (accept_header or "").split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                continue
+        if name in WBITS and q > best_q:
+            best, best_q = name, q
+    return best
+
+
+def maybe_compress(data: bytes, accept_header):
+    """
+    Returns (data, encoding), compressing data when the client accepts it and
+    it is at least PAYLOAD_COMPRESS_MIN_BYTES long. encoding is None when the
+    data is returned as is.
+    """
+    encoding = negotiate(accept_header)
+    if encoding is None or len(data) < Config.PAYLOAD_COMPRESS_MIN_BYTES:
+        return data, None
+    compressor = zlib.compressobj(
+        Config.PAYLOAD_COMPRESS_LEVEL, zlib.DEFLATED, WBITS[encoding]
+    )
+    compressed = compressor.compress(data) + compressor.flush()
+    # incompressible data is sent as is
+    if len(compressed) >= len(data):
+        return data, None
+    return compressed, encoding
+
+
+def decompress(data: bytes, encoding):
+    """
+    Returns data decompressed from encoding, unchanged for identity or None.
+
+    Raises:
+        PayloadCompressionError: If the encoding is unknown, the data is corrupt
+            or it expands beyond PAYLOAD_MAX_DECOMPRESSED_BYTES.
+    """
+    if not encoding or encoding == IDENTITY:
+        return data
+    if encoding not in WBITS:
+        raise PayloadCompressionError(f"unsupported payload encoding {encoding}")
+    limit = Config.PAYLOAD_MAX_DECOMPRESSED_BYTES
+    decompressor = zlib.decompressobj(WBITS[encoding])
+    try:
+        plaintext = decompressor.decompress(data, limit)
+    except zlib.error as exc:
+        raise PayloadCompressionError("corrupt compressed payload") from exc
+    if decompressor.unconsumed_tail or not decompressor.eof:
+        raise PayloadCompressionError("compressed payload is too large or truncated")
+    return plaintext
@@ -0,0 +1,252 @@
+"""
+Module: revoked_token_index.py
+
+Per-worker index of revoked JWT ids used by auth_required.
+
+Nearly every blocklist lookup is negative, so instead of querying
+token_blocklist on each authenticated request the worker keeps a Bloom filter
+of all revoked jtis. A negative answer from the filter is definite and never
+touches Mongo. A positive answer is confirmed through a small exact LRU and,
+on a miss, a single indexed lookup.
+
+The filter is sized from the live blocklist count and kept warm by tailing
+new token_blocklist inserts at most every REVOCATION_REFRESH_SECONDS, which
+is the upper bound on how long a token revoked by another worker stays
+usable here. Revocations made by this worker are visible immediately.
+
+Classes:
+    BloomFilter: Fixed size Bloom filter over strings.
+    RevokedTokenIndex: Process-wide revoked jti index.
+"""
+
+import datetime
+import hashlib
+import logging
+import math
+import os
+import threading
+import time
+
+from bson import ObjectId
+
+from apps.database.models import TokenBlockListDb
+from apps.utils.cache_utils import LRUCache
+from config import Config
+
+
+class BloomFilter:
+    """
+    Bloom filter with k hash positions derived from one blake2b digest.
+
+    Attributes:
+        capacity (int): Number of items the filter was sized for.
+        error_rate (float): Target false positive rate at capacity.
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.capacity = max(int(capacity), 1)
+        self.error_rate = error_rate
+        self.size = max(
+            int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)), 8
+        )
+        self.hash_count = max(int(round(self.size / self.capacity * math.log(2))), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        # double hashing: position_i = h1 + i * h2
+        return [(first + i * second) % self.size for i in range(self.hash_count)]
+
+    def add(self, item: str):
+        """
+        Sets the bits of item; count only grows when a bit was still clear, so
+        re-adding a known item (the tail overlap re-reads a few seconds of the
+        blocklist on every refresh) does not use up capacity.
+        """
+        added = False
+        for position in self._positions(item):
+            mask = 1 << (position & 7)
+            if not self.bits[position >> 3] & mask:
+                self.bits[position >> 3] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __contains__(self, item: str):
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+    @property
+    def is_saturated(self):
+        return self.count > self.capacity
+
+
+class RevokedTokenIndex:
+    """
+    Process-wide revoked jti index backed by a Bloom filter and an exact LRU.
+    """
+
+    _lock = threading.Lock()
+    _pid = None
+    _bloom = None
+    _exact = None
+    _last_tail = None
+    _last_refresh = -math.inf
+    _last_rebuild = 0.0
+    # Overlap of the tail window; ObjectIds of concurrent writers are only
+    # ordered per second, so re-reading a few seconds never misses an insert
+    TAIL_OVERLAP = datetime.timedelta(seconds=5)
+    stats = {"bloom_negative": 0, "exact_hit": 0, "db_lookup": 0, "tail_queries": 0}
+
+    @classmethod
+    def _reset(cls):
+        cls._pid = os.getpid()
+        cls._bloom = None
+        cls._exact = LRUCache(maxsize=Config.REVOCATION_LRU_SIZE)
+        cls._last_tail = None
+        cls._last_refresh = -math.inf
+        cls._last_rebuild = 0.0
+
+    @classmethod
+    def _rebuild(cls):
+        """
+        Builds a new filter sized from the live blocklist and loads every jti.
+        """
+        handler = TokenBlockListDb()
+        started = datetime.datetime.now(datetime.timezone.utc)
+        live_count = handler.count({})
+        bloom = BloomFilter(
+            max(live_count * 2, Config.REVOCATION_MIN_CAPACITY),
+            Config.REVOCATION_BLOOM_ERROR_RATE,
+        )
+        for document in handler.iter_find({}, {"_id": 0, "jti": 1}, batch_size=5000):
+            if document.get("jti"):
+                bloom.add(document["jti"])
+        cls._bloom = bloom
+        cls._last_tail = started
+        cls._last_rebuild = time.monotonic()
+        cls._exact.clear()
+
+    @classmethod
+    def _tail(cls):
+        """
+        Adds the jtis inserted since the previous refresh to the filter.
+        """
+        since = ObjectId.from_datetime(cls._last_tail - cls.TAIL_OVERLAP)
+        started = datetime.datetime.now(datetime.timezone.utc)
+        cls.stats["tail_queries"] += 1
+        for document in TokenBlockListDb().iter_find(
+            {"_id": {"$gte": since}}, {"_id": 0, "jti": 1}
+        ):
+            jti = document.get("jti")
+            if jti:
+                cls._bloom.add(jti)
+                cls._exact.set(jti, True)
+        cls._last_tail = started
+
+    @classmethod
+    def _refresh(cls):
+        if cls._pid != os.getpid():
+            cls._reset()
+        now = time.monotonic()
+        if now - cls._last_refresh < Config.REVOCATION_REFRESH_SECONDS:
+            return
+        with cls._lock:
+            if now - cls._last_refresh < Config.REVOCATION_REFRESH_SECONDS:
+                return
+            try:
+                if (
+                    cls._bloom is None
+                    or cls._bloom.is_saturated
+                    or now - cls._last_rebuild >= Config.REVOCATION_REBUILD_SECONDS
+                ):
+                    cls._rebuild()
+                else:
+                    cls._tail()
+            except Exception as exc:
+                logging.error(f"Error occured while refreshing revoked token index:{exc}")
+                # retry on the next interval; meanwhile the current filter keeps
+                # serving (a saturated one only has more false positives) or,
+                # without one, lookups go straight to the blocklist
+                cls._last_refresh = now
+                return
+            cls._last_refresh = now
+
+    @classmethod
+    def peek(cls, jti: str):
+        """
+        Answers from memory only.
+
+        Returns:
+            bool | None: True or False when known, None when the blocklist
+                has to be queried.
+        """
+        if not Config.REVOCATION_INDEX_ENABLED:
+            return None
+        cls._refresh()
+        if cls._bloom is None:
+            return None
+        if jti not in cls._bloom:
+            cls.stats["bloom_negative"] += 1
+            return False
+        revoked = cls._exact.get(jti)
+        if revoked is not None:
+            cls.stats["exact_hit"] += 1
+        return revoked
+
+    @classmethod
+    def remember(cls, jti: str, revoked: bool):
+        """
+        Stores the result of a blocklist lookup done by the caller.
+        """
+        if Config.REVOCATION_INDEX_ENABLED and cls._exact is not None:
+            cls.stats["db_lookup"] += 1
+            cls._exact.set(jti, revoked)
+
+    @classmethod
+    def is_revoked(cls, jti: str) -> bool:
+        """
+        Returns True if the jti is in token_blocklist.
+
+        Falls back to a direct blocklist lookup while the filter is unavailable.
+        """
+        revoked = cls.peek(jti)
+        if revoked is not None:
+            return revoked
+        revoked = TokenBlockListDb().exists({"jti": jti})
+        cls.remember(jti, revoked)
+        return revoked
+
+    @classmethod
+    def add(cls, *jtis):
+        """
+        Marks jtis revoked by this worker so they are rejected immediately.
+        """
+        if not Config.REVOCATION_INDEX_ENABLED:
+            return
+        if cls._pid != os.getpid():
+            cls._reset()
+        with cls._lock:
+            for jti in jtis:
+                if cls._bloom is not None:
+                    cls._bloom.add(jti)
+                cls._exact.set(jti, True)
+
+    @classmethod
+    def index_stats(cls):
+        """
+        Returns the lookup counters and the filter and LRU state.
+        """
+        bloom = cls._bloom
+        return {
+            **cls.stats,
+            "bloom_items": bloom.count if bloom else 0,
+            "bloom_capacity": bloom.capacity if bloom else 0,
+            "exact": cls._exact.stats() if cls._exact else {},
+        }
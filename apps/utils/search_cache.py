@@ -0,0 +1,82 @@
+"""
+Module: search_cache.py
+
+Per-worker cache of /user/list pages.
+
+Entries are keyed on the normalised, case-folded search term (the search is
+case-insensitive, so "Bob" and "bob" share one entry), the page parameters
+and a generation number. Every write to Users or UserType made through the app
+calls SearchResultCache.bump(), which moves the worker to a new generation
+so older pages are never served again and simply age out of the LRU. Other
+workers see such a write once their entry expires, so SEARCH_CACHE_TTL
+bounds cross-worker staleness the same way USER_STATUS_CACHE_TTL does for
+user statuses.
+
+Classes:
+    SearchResultCache: Bounded LRU/TTL cache of search pages with generation invalidation.
+"""
+
+import threading
+
+from apps.utils.cache_utils import LRUCache
+from config import Config
+
+
+class SearchResultCache:
+    """
+    Process-wide search page cache.
+    """
+
+    _cache = LRUCache(maxsize=Config.SEARCH_CACHE_SIZE, ttl=Config.SEARCH_CACHE_TTL)
+    _lock = threading.Lock()
+    _generation = 0
+
+    @staticmethod
+    def normalise(term):
+        """
+        Returns term with surrounding whitespace removed and inner runs collapsed.
+        """
+        return " ".join((term or "").split())
+
+    @classmethod
+    def lookup(cls, term, page):
+        """
+        Returns (key, cached page or None) for term and the page parameters.
+
+        The key pins the generation seen before the query runs, so a page
+        computed while a write bumps the generation is stored under the old
+        generation and never served.
+        """
+        key = (
+            cls._generation,
+            cls.normalise(term).casefold(),
+            page.get("cursor"),
+            page.get("page_size"),
+            bool(page.get("include_total")),
+        )
+        if not Config.SEARCH_CACHE_ENABLED:
+            return key, None
+        return key, cls._cache.get(key)
+
+    @classmethod
+    def store(cls, key, result):
+        """
+        Caches result under a key returned by lookup.
+        """
+        if Config.SEARCH_CACHE_ENABLED:
+            cls._cache.set(key, result)
+
+    @classmethod
+    def bump(cls):
+        """
+        Invalidates every cached page; call after any Users or UserType write.
+        """
+        with cls._lock:
+            cls._generation += 1
+
+    @classmethod
+    def stats(cls):
+        """
+        Returns the hit ratio, eviction counters and current generation.
+        """
+        return {**cls._cache.stats(), "generation": cls._generation}
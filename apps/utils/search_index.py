@@ -0,0 +1,100 @@
+"""
+Module: search_index.py
+
+N-gram index used by the /user/list name search.
+
+Unanchored case-insensitive regexes cannot use an index, so every search
+used to scan all active users. Each Users document now carries a
+search_grams array holding the 1-, 2- and 3-grams of its lowercased
+firstname and lastname, tagged with the field they come from ("f:", "l:").
+The array has a multikey index, so a substring search becomes an $all over
+the term's grams: the index bounds come from one of them and the others are
+checked on the index entries it returns. The original regex is kept in the
+same clause and only runs on those candidates, so results are exactly the
+same as before.
+
+Users written before search_grams existed are still matched by the regex
+alone until "flask backfill-search-grams" has reached them; that branch only
+reads the documents without the field, so it costs nothing once the backfill
+is done. Every write which sets firstname or lastname must also set
+search_grams from SearchGrams.build.
+
+Usernames get no grams: /user/list still matches a username only exactly,
+by the lowercased email through the unique username_1 index.
+
+Classes:
+    SearchGrams: Builds the grams of a user and the queries over them.
+"""
+
+import re
+
+GRAM_SIZE = 3
+FIELD_TAGS = {"firstname": "f", "lastname": "l"}
+
+
+class SearchGrams:
+    """
+    Builds n-gram tokens and the matching search conditions.
+    """
+
+    @staticmethod
+    def term_grams(term: str):
+        """
+        Returns the grams a field must contain for term to be a substring of it.
+
+        Terms up to GRAM_SIZE characters are a single gram, longer terms are
+        covered by their overlapping GRAM_SIZE-grams.
+        """
+        term = term.lower()
+        if len(term) <= GRAM_SIZE:
+            return [term] if term else []
+        return sorted(
+            {term[i : i + GRAM_SIZE] for i in range(len(term) - GRAM_SIZE + 1)}
+        )
+
+    @staticmethod
+    def value_grams(value: str):
+        """
+        Returns every 1..GRAM_SIZE-gram of a field value.
+        """
+        value = (value or "").lower()
+        grams = set()
+        for size in range(1, GRAM_SIZE + 1):
+            for i in range(len(value) - size + 1):
+                grams.add(value[i : i + size])
+        return grams
+
+    @staticmethod
+    def build(firstname=None, lastname=None):
+        """
+        Returns the search_grams array stored on a Users document.
+        """
+        values = {"firstname": firstname, "lastname": lastname}
+        grams = []
+        for field, value in values.items():
+            tag = FIELD_TAGS[field]
+            grams.extend(
+                f"{tag}:{gram}" for gram in sorted(SearchGrams.value_grams(value))
+            )
+        return grams
+
+    @staticmethod
+    def field_condition(field: str, term: str):
+        """
+        Returns the filter matching users whose field contains term.
+
+        The $all on search_grams is served by the index; the regex on the field
+        removes the rare candidates whose grams match but which do not contain
+        the term as a whole. Users without search_grams fall back to the regex.
+        """
+        tag = FIELD_TAGS[field]
+        grams = [f"{tag}:{gram}" for gram in SearchGrams.term_grams(term)]
+        regex = {field: {"$regex": re.escape(term), "$options": "i"}}
+        if not grams:
+            return regex
+        return {
+            "$or": [
+                {"search_grams": {"$all": grams}, **regex},
+                {"search_grams": {"$exists": False}, **regex},
+            ]
+        }
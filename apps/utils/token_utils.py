@@ -1,3 +1,4 @@
+import datetime
 import logging
 import secrets
 import uuid
@@ -7,7 +8,9 @@ from config import Config
 from constants.token_expiry_constants import TokenExpireConstant
 
 
-def create_dynamic_token(email, user_type, token_type="", user_details=None):
+def create_dynamic_token(
+    email, user_type, token_type="", user_details=None, rate_limit_minute=None
+):
     """
     Generates a token  and stores it in the database with a slug ID.
 
@@ -15,9 +18,11 @@ def create_dynamic_token(email, user_type, token_type="", user_details=None):
         email (str): User's email address.
         user_type (str): The type of user (e.g., admin, regular user).
         token_type (str): The token use-case, default is "signup".
+        rate_limit_minute (int, optional): Rate-limiting window in minutes.
 
     Returns:
-        tuple: (token, slug_id) if successful, else (False, False).
+        tuple: (token, slug_id, rate_limited); (False, False, False) on failure and
+            (None, None, True) when the email exceeded its attempts.
     """
     try:
         # Generate a secure random token key
@@ -27,24 +32,32 @@ def create_dynamic_token(email, user_type, token_type="", user_details=None):
 
         # Validate email using regex
         regex = Config.EMAIL_REGEX_CHECK
-        token = AuthValidator.email_regex_verify(
+        token, rate_limited = AuthValidator.email_regex_verify(
             regex,
             email,
             token_type,
             TokenExpireConstant.SIGNUP_TOKEN_EXPIRES,
             dynamic_jwt,
             user_details,
+            rate_limit_minute,
         )
+        if rate_limited:
+            return None, None, True
+        if not token:
+            return False, False, False
         # Save the token data in the OTP collection
         otp_insert_data = {
             "jwt_key": dynamic_jwt,
             "slug_id": slug_id,
+            # removed by the TTL index once the signup token can no longer be used
+            "expire_at": datetime.datetime.now(datetime.timezone.utc)
+            + TokenExpireConstant.SIGNUP_TOKEN_EXPIRES,
         }
         if user_type:
             otp_insert_data.update({"user_type": user_type})
         UserAccountOtpDb().insert_one(otp_insert_data)
-        return token, slug_id
+        return token, slug_id, False
 
     except Exception as exc:
         logging.error(f"Error occurred in create_2fa: {exc}")
-        return False, False
+        return False, False, False
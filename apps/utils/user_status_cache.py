@@ -0,0 +1,130 @@
+"""
+Module: user_status_cache.py
+
+Per-worker cache of user_id -> Users.Status used by the active user checks.
+
+Status changes are rare, so entries are kept for USER_STATUS_CACHE_TTL seconds
+and written through by the code paths that change a status. Other workers
+pick the change up when their entry expires, or right away for tokens minted
+after the change: every token carries the user's status_version claim and an
+entry older than the token's version is ignored.
+
+Classes:
+    UserStatusCache: Bounded TTL cache of user statuses with hit/staleness metrics.
+"""
+
+import threading
+import time
+
+from apps.database.models import UsersDb
+from apps.utils.cache_utils import LRUCache
+from apps.utils.search_cache import SearchResultCache
+from config import Config
+
+
+class UserStatusCache:
+    """
+    Process-wide user status cache.
+    """
+
+    _cache = LRUCache(
+        maxsize=Config.USER_STATUS_CACHE_SIZE, ttl=Config.USER_STATUS_CACHE_TTL
+    )
+    _lock = threading.Lock()
+    _metrics = {"version_bypass": 0, "served": 0, "age_total": 0.0, "age_max": 0.0}
+
+    @classmethod
+    def peek(cls, user_id, min_version=None):
+        """
+        Returns the cached entry, or None when missing, expired or older than min_version.
+
+        Returns:
+            dict | None: {"status": str | None, "version": int, "cached_at": float}
+        """
+        if not Config.USER_STATUS_CACHE_ENABLED:
+            return None
+        entry = cls._cache.get(user_id)
+        if entry is None:
+            return None
+        if min_version is not None and entry["version"] < min_version:
+            with cls._lock:
+                cls._metrics["version_bypass"] += 1
+            return None
+        age = time.monotonic() - entry["cached_at"]
+        with cls._lock:
+            cls._metrics["served"] += 1
+            cls._metrics["age_total"] += age
+            cls._metrics["age_max"] = max(cls._metrics["age_max"], age)
+        return entry
+
+    @classmethod
+    def store(cls, user_id, status, version=0):
+        if Config.USER_STATUS_CACHE_ENABLED:
+            cls._cache.set(
+                user_id,
+                {
+                    "status": status,
+                    "version": version or 0,
+                    "cached_at": time.monotonic(),
+                },
+            )
+
+    @classmethod
+    def get_status(cls, user_id, min_version=None):
+        """
+        Returns the user's status from the cache, reading Users on a miss.
+
+        Returns:
+            str | None: The Status, None if the user does not exist.
+        """
+        entry = cls.peek(user_id, min_version)
+        if entry is not None:
+            return entry["status"]
+        user_details = UsersDb().find_one(
+            {"user_id": user_id}, {"_id": 0, "Status": 1, "status_version": 1}
+        ) or {}
+        cls.store(user_id, user_details.get("Status"), user_details.get("status_version"))
+        return user_details.get("Status")
+
+    @classmethod
+    def set_status(cls, user_id, status):
+        """
+        Changes a user's status in Users and writes the new value through the cache.
+
+        status_version is incremented so that tokens minted from now on bypass
+        entries other workers still hold.
+        """
+        result = UsersDb().find_one_and_update(
+            {"user_id": user_id},
+            {"Status": status},
+            inc={"status_version": 1},
+            projection={"_id": 0, "status_version": 1},
+            return_document=True,
+        )
+        # the user enters or leaves /user/list results
+        SearchResultCache.bump()
+        if result is None:
+            cls.invalidate(user_id)
+            return None
+        cls.store(user_id, status, result.get("status_version"))
+        return result
+
+    @classmethod
+    def invalidate(cls, user_id):
+        cls._cache.delete(user_id)
+
+    @classmethod
+    def stats(cls):
+        """
+        Returns hit ratio, eviction and staleness metrics of the cache.
+        """
+        with cls._lock:
+            metrics = dict(cls._metrics)
+        served = metrics.pop("served")
+        age_total = metrics.pop("age_total")
+        return {
+            **cls._cache.stats(),
+            **metrics,
+            "age_avg": age_total / served if served else 0.0,
+            "ttl": cls._cache.ttl,
+        }
@@ -6,7 +6,8 @@ import uuid
 from flask import jsonify
 import jwt
 import pytz
-from apps.database.models import UsersTokenDb
+from pymongo.errors import DuplicateKeyError
+from apps.database.models import UserTypeDb, UsersTokenDb
 from constants.common_constants import CommonConstant
 from constants.response_constants import ResponseConstants
 
@@ -15,62 +16,99 @@ class AuthValidator:
     """ """
 
     @staticmethod
-    def rating_limiting_email(email, type_of_token, expire_minute=None):
+    def issue_email_token(email, token_type, token, token_expire_time, window_minute=None):
         """
-        Enforces rate-limiting on email-based token requests by checking DB logs.
+        Stores a new email token and applies rate limiting in one atomic round trip.
+
+        A single find_one_and_update with upsert runs an update pipeline on the
+        (email, type) document: inside the current window the attempt counter is
+        incremented, outside it a new window starts at attempt 1. When the
+        window already holds MAX_ATTEMPT attempts the document is left as it is
+        and flagged rate limited. Concurrent requests for the same email are
+        serialised by the document update, so no attempt is lost.
 
         Parameters
         ----------
         email : str
             User's email address.
-        type_of_token : str
+        token_type : str
             The type of token (e.g., 'signup', '2FA') being requested.
-        expire_minute : int, optional
-            Time window in minutes to enforce rate-limiting (default is 60).
+        token : str
+            The newly generated token to store.
+        token_expire_time : timedelta
+            Lifetime of the token.
+        window_minute : int, optional
+            Rate-limiting window in minutes (default is 60).
 
         Returns
         -------
-        bool
-            True if the user has exceeded the allowed number of attempts, False otherwise.
+        tuple
+            (rate_limited: bool, token_document: dict)
         """
+        window = datetime.timedelta(minutes=window_minute or 60)
+        now = datetime.datetime.now(pytz.utc)
+        # Keep the document for the token lifetime or the rate-limit window,
+        # whichever is longer; the TTL index removes it afterwards
+        expire_at = now + max(token_expire_time, window)
+        update = [
+            {
+                "$set": {
+                    # missing window_start (new document) compares lower than any date
+                    "_in_window": {"$gt": ["$window_start", now - window]},
+                }
+            },
+            {
+                "$set": {
+                    "_limited": {
+                        "$and": [
+                            "$_in_window",
+                            {
+                                "$gte": [
+                                    {"$ifNull": ["$attempt", 0]},
+                                    CommonConstant.MAX_ATTEMPT,
+                                ]
+                            },
+                        ]
+                    },
+                }
+            },
+            {
+                "$set": {
+                    "rate_limited": "$_limited",
+                    "attempt": {
+                        "$cond": [
+                            "$_limited",
+                            "$attempt",
+                            {
+                                "$cond": [
+                                    "$_in_window",
+                                    {"$add": ["$attempt", 1]},
+                                    1,
+                                ]
+                            },
+                        ]
+                    },
+                    "window_start": {"$cond": ["$_in_window", "$window_start", now]},
+                    "token": {"$cond": ["$_limited", "$token", token]},
+                    "assigned_time": {"$cond": ["$_limited", "$assigned_time", now]},
+                    "expire_at": {"$cond": ["$_limited", "$expire_at", expire_at]},
+                }
+            },
+            {"$project": {"_in_window": 0, "_limited": 0}},
+        ]
+        query = {"email": email, "type": token_type}
+        projection = {"_id": 0, "token": 1, "attempt": 1, "rate_limited": 1}
         try:
-            expire_minute = expire_minute or 60
-            return_type = False
-
-            # Retrieve previous token assignment data from DB
-            get_assigned_token = UsersTokenDb().find_one(
-                {"email": email, "type": type_of_token},
-                {"_id": 0, "assigned_time": 1, "attempt": 1},
+            document = UsersTokenDb().find_one_and_modify(
+                query, update, upsert=True, projection=projection
             )
-
-            if get_assigned_token:
-                assigned_token_time = get_assigned_token.get("assigned_time")
-                attempt = get_assigned_token.get("attempt")
-
-                if not assigned_token_time or not attempt:
-                    return return_type
-
-                # Convert string timestamps to datetime
-                current_time = datetime.datetime.now()
-                current_time = datetime.datetime.strptime(
-                    str(current_time), "%Y-%m-%d %H:%M:%S.%f"
-                )
-                assigned_time_expire = datetime.datetime.strptime(
-                    assigned_token_time, "%Y-%m-%d %H:%M:%S.%f"
-                ) + datetime.timedelta(minutes=expire_minute)
-
-                # If still within expiry window and attempts exceed limit
-                if (
-                    current_time <= assigned_time_expire
-                    and attempt >= CommonConstant.MAX_ATTEMPT
-                ):
-                    return True
-
-            return return_type
-
-        except Exception as exc:
-            logging.error(f"Error occurred in function rating_limiting_email: {exc}")
-            return False
+        except DuplicateKeyError:
+            # two first-time upserts raced on the unique (email, type) index,
+            # the document exists now so the retry takes the update path
+            document = UsersTokenDb().find_one_and_modify(
+                query, update, upsert=True, projection=projection
+            )
+        return bool(document.get("rate_limited")), document
 
     @staticmethod
     def user_exist_check_mail(user_lower=None):
@@ -105,6 +143,7 @@ class AuthValidator:
         token_expire_time,
         jwt_secret_key,
         user_details=None,
+        rate_limit_minute=None,
     ):
         """
         Validates the email against a regex pattern and manages token creation and rate-limiting.
@@ -123,11 +162,14 @@ class AuthValidator:
             Secret key used for JWT signing.
         user_details : dict, optional
             Additional payload for the JWT (used when token_type != 'signup').
+        rate_limit_minute : int, optional
+            Rate-limiting window in minutes, see issue_email_token.
 
         Returns
         -------
-        str or bool
-            The generated token if email is valid, else False.
+        tuple
+            (token, rate_limited): the token is False if the email is invalid
+            and None if the request was rate limited.
         """
         try:
             # Validate email format using regex
@@ -155,42 +197,19 @@ class AuthValidator:
                     algorithm="HS256",
                 )
 
-                # Check for existing token document
-                user_exist = UsersTokenDb().find_one(
-                    {"email": email, "type": token_type},
-                    {"_id": 0, "attempt": 1},
+                # Store the token and apply rate limiting atomically
+                rate_limited, _ = AuthValidator.issue_email_token(
+                    email, token_type, token, token_expire_time, rate_limit_minute
                 )
-                if user_exist is None:
-                    # First-time token creation
-                    UsersTokenDb().insert_one(
-                        {
-                            "token": token,
-                            "email": email,
-                            "type": token_type,
-                            "assigned_time": str(datetime.datetime.now()),
-                            "attempt": 1,
-                        }
-                    )
-                else:
-                    # Increment attempt count if less than max
-                    attempt = user_exist.get("attempt", 0)
-                    attempt = attempt + 1 if attempt < CommonConstant.MAX_ATTEMPT else 1
-                    # Update token and attempt in DB
-                    UsersTokenDb().find_one_and_update(
-                        {"email": email, "type": token_type},
-                        {
-                            "token": token,
-                            "assigned_time": str(datetime.datetime.now()),
-                            "attempt": attempt,
-                        },
-                    )
-                return token
+                if rate_limited:
+                    return None, True
+                return token, False
             else:
-                return False
+                return False, False
 
         except Exception as exc:
             logging.error(f"Error occurred in email_regex_verify: {exc}")
-            return False
+            return False, False
 
 
     @staticmethod
@@ -258,10 +277,32 @@ class AuthValidator:
             additional_claims = {
                 "user_details": {"user_id": user_id},
                 "role": user_type,
+                # lets status checks skip cache entries older than this token
+                "status_version": user.get("status_version", 0),
             }
 
             return additional_claims
 
         except Exception as exc:
             logging.error(f"Error preparing additional claims: {exc}")
-            return False
\ No newline at end of file
+            return False
+
+    @staticmethod
+    def legacy_user_type(user_id):
+        """
+        Reads user_type from UserType for users created before user_type was
+        stored on the Users document and not yet reached by the backfill.
+
+        Returns
+        -------
+        str
+            The user's type, "customer" when there is no UserType entry.
+        """
+        try:
+            user_group = UserTypeDb().find_one(
+                {"user_id": user_id}, {"_id": 0, "user_type": 1}
+            )
+            return (user_group or {}).get("user_type", "customer")
+        except Exception as exc:
+            logging.error(f"Error occurred in function legacy_user_type: {exc}")
+            return "customer"
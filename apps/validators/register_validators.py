@@ -1,13 +1,17 @@
+import asyncio
 import logging
 import re
 from flask import jsonify, render_template
 import jwt
 from apps.database.models import UserAccountOtpDb, UserTypeDb, UsersDb, UsersTokenDb
 from apps.models.register_models import UserRegistrationModel
+from apps.utils.password_hashing import HashingServiceBusy, PasswordHashingService
+from apps.utils.search_cache import SearchResultCache
+from apps.utils.search_index import SearchGrams
+from apps.utils.user_status_cache import UserStatusCache
 from config import Config
 from constants.common_constants import CommonConstant
 from constants.response_constants import ResponseConstants
-from werkzeug.security import generate_password_hash
 
 
 class RegisterUserValidator:
@@ -140,18 +144,28 @@ class RegisterUserValidator:
             return jsonify(message=ResponseConstants.INTERNAL_ERROR_MESSAGE), 500
         
     @staticmethod
-    def prepare_user_details(request_data: UserRegistrationModel) -> dict:
+    def prepare_user_details(
+        request_data: UserRegistrationModel, _hashed_password: str = None
+    ) -> dict:
         """
         Prepares the user_details dictionary for insertion or further processing.
 
         Args:
             request_data (RegisterUserModel): Parsed and validated user registration input.
+            _hashed_password (str, optional): Already computed hash; hashed through
+                the hashing service when not given.
 
         Returns:
             dict: Final user details with hashed password and additional fields.
+
+        Raises:
+            HashingServiceBusy: If the hashing service cannot take the job.
         """
         try:
-            _hashed_password = generate_password_hash(request_data.password)
+            if _hashed_password is None:
+                _hashed_password = PasswordHashingService.hash_password(
+                    request_data.password
+                )
 
             user_details = {
                 "firstname": request_data.firstname,
@@ -161,6 +175,13 @@ class RegisterUserValidator:
                 "password": _hashed_password,
                 "user_id": request_data.user_id,
                 "Status": request_data.user_status,
+                "status_version": 1,
+                # denormalized from UserType so reads need no $lookup
+                "user_type": request_data.user_type,
+                # n-gram tokens for the /user/list name search
+                "search_grams": SearchGrams.build(
+                    request_data.firstname, request_data.lastname
+                ),
                 "phone_number": request_data.phone_number,
                 "country_code": request_data.country_code,
                 "language_preference": "en",
@@ -177,6 +198,8 @@ class RegisterUserValidator:
                 "user_group": user_group,
             }
 
+        except HashingServiceBusy:
+            raise
         except Exception as exc:
             logging.error(
                 f"Error occured in function prepare_user_details:{exc}"
@@ -209,15 +232,18 @@ class RegisterUserValidator:
 
             # Insert user details into the Users collection
             UsersDb().insert_one(user_details)
-
-            # Try updating user group info; if not found, insert new
-            user_existing = UserTypeDb().find_one_and_update(
-                {"username": request_data.username},
-                {"$set": user_group},
+            # write the new status through so the first status check is a cache hit
+            UserStatusCache.store(
+                user_details.get("user_id"),
+                user_details.get("Status"),
+                user_details.get("status_version"),
             )
 
-            if not user_existing:
-                UserTypeDb().insert_one(user_group)
+            # Upsert the user group info, Users.user_type mirrors it
+            UserTypeDb().update_one(
+                user_group, {"user_id": user_group.get("user_id")}, upsert=True
+            )
+            SearchResultCache.bump()
 
             # Clear existing JWT tokens for this user (cleanup step)
             UsersTokenDb().delete_many({"token": request_data.token})
@@ -229,4 +255,112 @@ class RegisterUserValidator:
         except Exception as exc:
             # Log any errors and return internal server error response
             logging.error(f"Error occured in function create_user_db: {exc}")
-            return jsonify(message=ResponseConstants.INTERNAL_ERROR_MESSAGE), 500
\ No newline at end of file
+            return jsonify(message=ResponseConstants.INTERNAL_ERROR_MESSAGE), 500
+
+    @staticmethod
+    async def validate_user_type_and_revoke_token_if_mismatch_async(
+        slug_id: str, user_type: str, _token: str, _username: str
+    ):
+        """
+        Async variant of validate_user_type_and_revoke_token_if_mismatch.
+
+        The OTP and token lookups do not depend on each other and are issued
+        concurrently.
+        """
+        from apps.database.async_models import AsyncUserAccountOtpDb, AsyncUsersTokenDb
+
+        try:
+            dynamic_values, created_token = await asyncio.gather(
+                AsyncUserAccountOtpDb().find_one(
+                    {"slug_id": slug_id}, {"jwt_key": 1, "user_type": 1}
+                ),
+                AsyncUsersTokenDb().find_one({"token": _token}, {"token": 1, "_id": 0}),
+            )
+
+            if not dynamic_values:
+                return (
+                    jsonify(message=ResponseConstants.UNPROCESSABLE_ENTITY),
+                    422,
+                )
+
+            if dynamic_values.get("user_type") != user_type:
+                await AsyncUsersTokenDb().delete_many({"token": _token})
+                return (
+                    jsonify(message=ResponseConstants.UNPROCESSABLE_ENTITY),
+                    422,
+                )
+
+            if not created_token:
+                return (
+                    jsonify(
+                        message=ResponseConstants.RESTRICTED_ACCESS_MESSAGE
+                    ),
+                    401,
+                )
+
+            try:
+                decoded_token = jwt.decode(
+                    created_token.get("token"),
+                    dynamic_values.get("jwt_key"),
+                    algorithms=["HS256"],
+                )
+            except jwt.ExpiredSignatureError:
+                await AsyncUsersTokenDb().delete_many({"token": created_token.get("token")})
+                return jsonify(message="The provided token is expired"), 401
+
+            if _username != decoded_token.get("email"):
+                return (
+                    jsonify(
+                        message=ResponseConstants.RESTRICTED_ACCESS_MESSAGE
+                    ),
+                    403,
+                )
+
+            return None, 200
+
+        except Exception as exc:
+            logging.error(
+                f"Error occured in function validate_user_type_and_revoke_token_if_mismatch_async:{exc}"
+            )
+            return jsonify(message=ResponseConstants.UNPROCESSABLE_ENTITY), 422
+
+    @staticmethod
+    async def create_user_in_db_async(user_data, request_data):
+        """
+        Async variant of create_user_in_db.
+
+        The user document is written first; the user group upsert and the token
+        and OTP cleanups are independent of each other and run concurrently.
+        """
+        from apps.database.async_models import (
+            AsyncUserAccountOtpDb,
+            AsyncUserTypeDb,
+            AsyncUsersDb,
+            AsyncUsersTokenDb,
+        )
+
+        try:
+            user_details = user_data.get("user_details")
+            user_group = user_data.get("user_group")
+
+            await AsyncUsersDb().insert_one(user_details)
+            UserStatusCache.store(
+                user_details.get("user_id"),
+                user_details.get("Status"),
+                user_details.get("status_version"),
+            )
+
+            await asyncio.gather(
+                AsyncUserTypeDb().update_one(
+                    user_group, {"user_id": user_group.get("user_id")}, upsert=True
+                ),
+                AsyncUsersTokenDb().delete_many({"token": request_data.token}),
+                AsyncUserAccountOtpDb().delete_many({"slug_id": request_data.slug}),
+            )
+            SearchResultCache.bump()
+
+            return jsonify(message="Account created successfully"), 200
+
+        except Exception as exc:
+            logging.error(f"Error occured in function create_user_db_async: {exc}")
+            return jsonify(message=ResponseConstants.INTERNAL_ERROR_MESSAGE), 500
@@ -0,0 +1,54 @@
+"""
+Benchmark: requests/sec at a fixed p99 for the sync and async data layers.
+
+Start the service twice against the same MongoDB, once with
+ASYNC_DB_MODE=False and once with ASYNC_DB_MODE=True (same gunicorn worker
+count), and point this script at each:
+
+    python -m benchmarks.async_db_mode --url http://localhost:5000/user/me \
+        --header "Authorization: Bearer <access token>" --p99-ms 100
+
+The best requests/sec whose p99 stays within --p99-ms is printed together
+with every concurrency level that was tried.
+"""
+
+import argparse
+import json
+import threading
+
+import requests
+
+from benchmarks.load import sweep
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", required=True)
+    parser.add_argument("--method", default="GET")
+    parser.add_argument("--header", action="append", default=[])
+    parser.add_argument("--body", default=None, help="Raw request body")
+    parser.add_argument("--p99-ms", type=float, default=100.0)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    headers = dict(
+        (name.strip(), value.strip())
+        for name, _, value in (header.partition(":") for header in args.header)
+    )
+    # one keep-alive session per load thread
+    local = threading.local()
+
+    def call():
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        response = local.session.request(
+            args.method, args.url, headers=headers, data=args.body, timeout=30
+        )
+        return response.status_code < 500
+
+    best, runs = sweep(call, args.p99_ms, args.duration)
+    print(json.dumps({"url": args.url, "best": best, "runs": runs}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
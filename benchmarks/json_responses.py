@@ -0,0 +1,102 @@
+"""
+Benchmark: jsonify cost of the search and profile responses.
+
+Serialises a /user/list page and a /user/me profile with jsonify inside an
+app context configured from Config (debug, so pretty printed like the
+service), once with Flask's standard library encoder (before) and once
+with the app's orjson-backed serialiser (after), and reports microseconds
+per response:
+
+    python -m benchmarks.json_responses --rows 50 --repeat 2000
+"""
+
+import argparse
+import datetime
+import json
+import timeit
+import uuid
+
+from bson import ObjectId
+from flask import Flask, jsonify
+from flask.json import JSONEncoder
+
+from apps.utils.json_provider import init_json
+
+
+def search_page(rows):
+    users = [
+        {
+            "user_id": str(uuid.uuid4()),
+            "firstname": f"Firstname{index}",
+            "lastname": f"Lastname{index}",
+            "username": f"user{index}@example.com",
+            "files_id": f"https://images.example.com/user/image/{ObjectId()}",
+            "user_type": "customer",
+        }
+        for index in range(rows)
+    ]
+    return {"users": users, "next_cursor": str(ObjectId()), "total": rows * 20}
+
+
+def profile():
+    return {
+        "user_id": str(uuid.uuid4()),
+        "username": "jane.doe@example.com",
+        "firstname": "Jane",
+        "lastname": "Doe",
+        "timezone": "Europe/Berlin",
+        "Status": "Active",
+        "communication_email": "jane.doe@example.com",
+        "files_id": f"https://images.example.com/user/image/{ObjectId()}",
+        "language_preference": "en",
+        "street_address1": "Hauptstraße 1",
+        "street_address2": "",
+        "state": "Berlin",
+        "city": "Berlin",
+        "zip_code": "10115",
+        "phone_number": "1701234567",
+        "country_code": "+49",
+        "user_type": "customer",
+        "created_at": datetime.datetime.utcnow(),
+    }
+
+
+def per_call_us(app, payload, repeat):
+    with app.app_context():
+        jsonify(payload)
+        seconds = timeit.timeit(lambda: jsonify(payload), number=repeat)
+    return round(seconds / repeat * 1e6, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    before, after = Flask(__name__), Flask(__name__)
+    for app in (before, after):
+        app.config.from_object("config.Config")
+    before.json_encoder = JSONEncoder
+    init_json(after)
+
+    results = []
+    for name, payload in (
+        ("search", search_page(args.rows)),
+        ("profile", profile()),
+    ):
+        before_us = per_call_us(before, payload, args.repeat)
+        after_us = per_call_us(after, payload, args.repeat)
+        results.append(
+            {
+                "payload": name,
+                "before_us": before_us,
+                "after_us": after_us,
+                "speedup": round(before_us / after_us, 2),
+            }
+        )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
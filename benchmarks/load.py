@@ -0,0 +1,93 @@
+"""
+Module: load.py
+
+Closed-loop load generator shared by the benchmarks.
+
+Each of `concurrency` threads calls `call()` back to back for `duration`
+seconds. The result holds the throughput and latency percentiles, and sweep()
+raises the concurrency until the p99 latency passes a budget, which gives the
+requests/sec a deployment sustains at that p99.
+
+Functions:
+    run_load: Drives one concurrency level.
+    sweep: Finds the best throughput within a p99 budget.
+"""
+
+import statistics
+import threading
+import time
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def run_load(call, concurrency, duration, warmup=1.0):
+    """
+    Calls call() from concurrency threads for duration seconds after a warmup.
+
+    call() returns truthy on success; failures and exceptions are counted as
+    errors and left out of the latencies.
+
+    Returns:
+        dict: concurrency, requests, errors, rps, p50_ms and p99_ms.
+    """
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    started = time.perf_counter()
+    measure_from = started + warmup
+    stop_at = measure_from + duration
+
+    def worker():
+        local, failed = [], 0
+        while True:
+            begin = time.perf_counter()
+            if begin >= stop_at:
+                break
+            try:
+                ok = call()
+            except Exception:
+                ok = False
+            end = time.perf_counter()
+            if begin < measure_from:
+                continue
+            if ok:
+                local.append((end - begin) * 1000)
+            else:
+                failed += 1
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors[0],
+        "rps": round(len(latencies) / duration, 1),
+        "p50_ms": round(statistics.median(latencies), 2) if latencies else 0.0,
+        "p99_ms": round(percentile(latencies, 0.99), 2),
+    }
+
+
+def sweep(call, p99_budget_ms, duration, levels=(1, 2, 4, 8, 16, 32, 64)):
+    """
+    Runs run_load at increasing concurrency and returns (best, runs), best being
+    the run with the highest rps whose p99 stayed within p99_budget_ms.
+    """
+    runs, best = [], None
+    for concurrency in levels:
+        result = run_load(call, concurrency, duration)
+        runs.append(result)
+        if result["p99_ms"] > p99_budget_ms:
+            break
+        if best is None or result["rps"] > best["rps"]:
+            best = result
+    return best, runs
@@ -0,0 +1,55 @@
+"""
+Benchmark: signin password verification throughput by hashing pool size.
+
+Signin is bound by check_password_hash, so this drives
+PasswordHashingService.verify_password from 2 threads per pool worker and
+reports verifications/sec for each pool size up to the core count:
+
+    python -m benchmarks.password_hashing --iterations 260000 --duration 5
+
+The first row (pool_workers 0) is the inline baseline, hashing on the
+request thread as before the pool existed.
+"""
+
+import argparse
+import json
+import os
+
+from werkzeug.security import generate_password_hash
+
+from apps.utils.password_hashing import PasswordHashingService
+from benchmarks.load import run_load
+from config import Config
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=260000)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    pwhash = generate_password_hash(
+        "benchmark-password", f"pbkdf2:sha256:{args.iterations}"
+    )
+
+    def call():
+        return PasswordHashingService.verify_password(pwhash, "benchmark-password")
+
+    Config.HASH_QUEUE_DEPTH = 4 * args.max_workers
+    results = []
+    Config.HASH_POOL_WORKERS = 0
+    results.append({"pool_workers": 0, **run_load(call, 1, args.duration)})
+    workers = 1
+    while workers <= args.max_workers:
+        Config.HASH_POOL_WORKERS = workers
+        results.append(
+            {"pool_workers": workers, **run_load(call, 2 * workers, args.duration)}
+        )
+        PasswordHashingService.shutdown()
+        workers *= 2
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
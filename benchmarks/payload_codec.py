@@ -0,0 +1,98 @@
+"""
+Benchmark: decode cost of a decrypted request payload per codec.
+
+Decodes a signin-sized body and a large /user/list search body with each way
+the decryptor can parse a plaintext and reports microseconds per request:
+
+    literal_eval           ast.literal_eval, the parser before codecs existed
+    json                   the standard library json.loads
+    json_codec             JsonCodec.decode (orjson when installed)
+    literal_model          LiteralCodec.decode_model, literal_eval + model_validate
+    model_validate_json    JsonCodec.decode_model, pydantic straight from bytes
+
+    python -m benchmarks.payload_codec --repeat 20000
+
+--repeat is the call count for a 200 byte body, larger bodies get
+proportionally fewer calls.
+
+The *_model rows include validation into the route's model, the others only
+build the dict the handler validates afterwards.
+"""
+
+import argparse
+import ast
+import json
+import timeit
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from apps.models.signin_models import SignIn
+from apps.utils.payload_codec import JsonCodec, LiteralCodec
+
+
+class SearchBody(BaseModel):
+    search_data: str
+    page_size: Optional[int] = None
+    cursor: Optional[str] = None
+    include_total: bool = False
+    exclude_user_ids: List[str] = []
+
+
+def bodies(ids):
+    signin = {
+        "username": "jane.doe@example.com",
+        "password": "Correct#Horse1Battery",
+        "location": "Europe/Berlin",
+    }
+    search = {
+        "search_data": "jane doe",
+        "page_size": 50,
+        "cursor": "eyJ1c2VybmFtZSI6ICJqYW5lQGV4YW1wbGUuY29tIn0",
+        "include_total": True,
+        # stands in for any large client payload
+        "exclude_user_ids": [
+            f"5f0c3c9e-8a4b-4f53-9a2f-{number:012d}" for number in range(ids)
+        ],
+    }
+    return [("signin", signin, SignIn), ("search_large", search, SearchBody)]
+
+
+def per_call_us(call, repeat):
+    call()
+    return round(timeit.timeit(call, number=repeat) / repeat * 1e6, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=20000)
+    parser.add_argument("--ids", type=int, default=1000)
+    args = parser.parse_args()
+
+    results = []
+    for name, body, model in bodies(args.ids):
+        as_json = json.dumps(body).encode()
+        as_literal = repr(body).encode()
+        repeat = max(args.repeat * 200 // len(as_json), 100)
+        results.append(
+            {
+                "body": name,
+                "bytes": len(as_json),
+                "literal_eval": per_call_us(
+                    lambda: ast.literal_eval(as_literal.decode()), repeat
+                ),
+                "json": per_call_us(lambda: json.loads(as_json), repeat),
+                "json_codec": per_call_us(lambda: JsonCodec.decode(as_json), repeat),
+                "literal_model": per_call_us(
+                    lambda: LiteralCodec.decode_model(as_literal, model), repeat
+                ),
+                "model_validate_json": per_call_us(
+                    lambda: JsonCodec.decode_model(as_json, model), repeat
+                ),
+            }
+        )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark: bytes saved versus CPU spent by payload compression.
+
+Builds the /user/me profile and a /user/list page the way the encryptor
+serialises them (json_provider.dumps), compresses each with gzip and deflate
+at every PAYLOAD_COMPRESS_LEVEL from 1 to 9 through maybe_compress and
+reports the compressed size, the ratio, the microseconds per compression and
+per decompression, and the base64 size on the wire inside a Fernet envelope:
+
+    python -m benchmarks.payload_compression --rows 50 --repeat 500
+
+PAYLOAD_COMPRESS_MIN_BYTES is lifted so every payload is compressed; with
+the default 1024 a profile below it is sent as is.
+"""
+
+import argparse
+import json
+import timeit
+
+from apps.utils import json_provider
+from apps.utils.payload_compression import decompress, maybe_compress
+from benchmarks.json_responses import profile, search_page
+from config import Config
+
+
+def fernet_size(length):
+    # version, timestamp, IV, PKCS7 padded AES-CBC blocks and HMAC, base64
+    ciphertext = (length // 16 + 1) * 16
+    return (1 + 8 + 16 + ciphertext + 32 + 2) // 3 * 4
+
+
+def per_call_us(call, repeat):
+    call()
+    return round(timeit.timeit(call, number=repeat) / repeat * 1e6, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    Config.PAYLOAD_COMPRESS_MIN_BYTES = 0
+    results = []
+    for name, payload in (
+        ("/user/me", profile()),
+        ("/user/list", search_page(args.rows)),
+    ):
+        plaintext = json_provider.dumps(payload).encode()
+        results.append(
+            {
+                "payload": name,
+                "encoding": None,
+                "level": None,
+                "bytes": len(plaintext),
+                "ratio": 1.0,
+                "compress_us": 0.0,
+                "decompress_us": 0.0,
+                "wire_bytes": fernet_size(len(plaintext)),
+            }
+        )
+        for encoding in ("gzip", "deflate"):
+            for level in range(1, 10):
+                Config.PAYLOAD_COMPRESS_LEVEL = level
+                compressed, used = maybe_compress(plaintext, encoding)
+                results.append(
+                    {
+                        "payload": name,
+                        "encoding": used,
+                        "level": level,
+                        "bytes": len(compressed),
+                        "ratio": round(len(plaintext) / len(compressed), 2),
+                        "compress_us": per_call_us(
+                            lambda: maybe_compress(plaintext, encoding), args.repeat
+                        ),
+                        "decompress_us": per_call_us(
+                            lambda: decompress(compressed, used), args.repeat
+                        ),
+                        "wire_bytes": fernet_size(len(compressed)),
+                    }
+                )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
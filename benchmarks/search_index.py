@@ -0,0 +1,145 @@
+"""
+Benchmark: /user/list name search, unanchored regex scan vs search_grams.
+
+Seeds --users synthetic active users (1M by default) with search_grams into
+a scratch database of a real MongoDB, builds the search_grams_1 and username_1
+indexes the service uses, then runs the single-term /user/list match both ways:
+
+    before  {"$or": [{firstname: /.*term.*/i}, {lastname: /.*term.*/i}]}
+    after   the SearchGrams.field_condition $all + regex match
+
+for prefix and substring terms taken from the seeded names. For each it
+reports the median wall time of the first page (USER_LIST page sort and
+limit) and, from explain("executionStats") of the full match, the docs and
+keys examined and the number of matches:
+
+    python -m benchmarks.search_index --uri mongodb://localhost:27017 \
+        --users 1000000
+
+Seeding 1M users takes a few minutes; the data is kept and reused by later
+runs with the same --users unless --reseed is given.
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+
+from pymongo import ASCENDING, MongoClient
+
+from apps.database_query_handler.pipeline_builder import active_users
+from apps.utils.pagination import KeysetPagination
+from apps.utils.search_index import SearchGrams
+
+SYLLABLES = [
+    "an", "ar", "be", "ca", "da", "el", "fa", "ga", "ha", "in", "ja", "ka",
+    "la", "li", "ma", "mi", "na", "ni", "or", "pa", "ra", "ri", "sa", "se",
+    "ta", "ti", "ul", "va", "vi", "ya", "za", "ko", "lo", "mo", "ro", "to",
+]  # fmt: skip
+
+
+def synthetic_name(rng):
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).title()
+
+
+def seed(collection, users, rng, batch=10000):
+    collection.drop()
+    for start in range(0, users, batch):
+        documents = []
+        for number in range(start, min(start + batch, users)):
+            firstname, lastname = synthetic_name(rng), synthetic_name(rng)
+            documents.append(
+                {
+                    "user_id": f"user-{number}",
+                    "username": f"user{number}@example.com",
+                    "firstname": firstname,
+                    "lastname": lastname,
+                    "Status": "Active",
+                    "search_grams": SearchGrams.build(firstname, lastname),
+                }
+            )
+        collection.insert_many(documents, ordered=False)
+    collection.create_index(
+        [("search_grams", ASCENDING)],
+        name="search_grams_1",
+        partialFilterExpression={"Status": "Active"},
+    )
+    collection.create_index([("username", ASCENDING)], name="username_1", unique=True)
+
+
+def regex_match(term):
+    pattern = {"$regex": f".*{term}.*", "$options": "i"}
+    return active_users(**{"$or": [{"firstname": pattern}, {"lastname": pattern}]})
+
+
+def gram_match(term):
+    return active_users(
+        **{
+            "$or": [
+                SearchGrams.field_condition("firstname", term),
+                SearchGrams.field_condition("lastname", term),
+            ]
+        }
+    )
+
+
+def measure(collection, match, page_size, repeat):
+    sort = list(KeysetPagination.sort().items())
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        cursor = collection.find(match, {"_id": 0, "user_id": 1})
+        list(cursor.sort(sort).limit(page_size))
+        timings.append((time.perf_counter() - started) * 1000)
+    stats = collection.find(match, {"_id": 0, "user_id": 1}).explain()[
+        "executionStats"
+    ]
+    return {
+        "page_ms": round(statistics.median(timings), 2),
+        "full_match_ms": stats["executionTimeMillis"],
+        "docs_examined": stats["totalDocsExamined"],
+        "keys_examined": stats["totalKeysExamined"],
+        "matches": stats["nReturned"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--uri", default="mongodb://localhost:27017")
+    parser.add_argument("--database", default="search_index_benchmark")
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--reseed", action="store_true")
+    args = parser.parse_args()
+
+    collection = MongoClient(args.uri)[args.database]["Users"]
+    if args.reseed or collection.estimated_document_count() != args.users:
+        seed(collection, args.users, random.Random(13))
+
+    # fixed terms, so runs over reused data stay comparable
+    rng = random.Random(31)
+    samples = [synthetic_name(rng).lower() for _ in range(3)]
+    terms = [("prefix", name[:3]) for name in samples] + [
+        ("substring", name[1:5]) for name in samples
+    ]
+    results = []
+    for kind, term in terms:
+        results.append(
+            {
+                "kind": kind,
+                "term": term,
+                "before": measure(
+                    collection, regex_match(term), args.page_size, args.repeat
+                ),
+                "after": measure(
+                    collection, gram_match(term), args.page_size, args.repeat
+                ),
+            }
+        )
+    print(json.dumps({"users": args.users, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -26,10 +26,74 @@ class Config(object):
     JWT_SECRET_KEY = Environment.JWT_SECRET_KEY
     # Mongo URI
     MONGO_URI = Environment.MONGO_URI
+    # Mongo connection pool sizing and timeouts
+    MONGO_MAX_POOL_SIZE = Environment.MONGO_MAX_POOL_SIZE
+    MONGO_MIN_POOL_SIZE = Environment.MONGO_MIN_POOL_SIZE
+    MONGO_MAX_IDLE_TIME_MS = Environment.MONGO_MAX_IDLE_TIME_MS
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = Environment.MONGO_WAIT_QUEUE_TIMEOUT_MS
+    MONGO_CONNECT_TIMEOUT_MS = Environment.MONGO_CONNECT_TIMEOUT_MS
+    MONGO_SOCKET_TIMEOUT_MS = Environment.MONGO_SOCKET_TIMEOUT_MS
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = Environment.MONGO_SERVER_SELECTION_TIMEOUT_MS
+    MONGO_ENSURE_INDEXES = Environment.MONGO_ENSURE_INDEXES
+    # Revoked token index, REVOCATION_REFRESH_SECONDS bounds revocation latency
+    REVOCATION_INDEX_ENABLED = Environment.REVOCATION_INDEX_ENABLED
+    REVOCATION_REFRESH_SECONDS = Environment.REVOCATION_REFRESH_SECONDS
+    REVOCATION_REBUILD_SECONDS = Environment.REVOCATION_REBUILD_SECONDS
+    REVOCATION_BLOOM_ERROR_RATE = Environment.REVOCATION_BLOOM_ERROR_RATE
+    REVOCATION_MIN_CAPACITY = Environment.REVOCATION_MIN_CAPACITY
+    REVOCATION_LRU_SIZE = Environment.REVOCATION_LRU_SIZE
+    # User status cache, USER_STATUS_CACHE_TTL bounds cross-worker staleness
+    USER_STATUS_CACHE_ENABLED = Environment.USER_STATUS_CACHE_ENABLED
+    USER_STATUS_CACHE_TTL = Environment.USER_STATUS_CACHE_TTL
+    USER_STATUS_CACHE_SIZE = Environment.USER_STATUS_CACHE_SIZE
+    # Password hashing process pool
+    HASH_POOL_WORKERS = Environment.HASH_POOL_WORKERS
+    HASH_QUEUE_DEPTH = Environment.HASH_QUEUE_DEPTH
+    HASH_TIMEOUT_SECONDS = Environment.HASH_TIMEOUT_SECONDS
+    # Password hash cost policy
+    PASSWORD_HASH_ITERATIONS = Environment.PASSWORD_HASH_ITERATIONS
+    PASSWORD_HASH_TARGET_MS = Environment.PASSWORD_HASH_TARGET_MS
+    PASSWORD_HASH_MIN_ITERATIONS = Environment.PASSWORD_HASH_MIN_ITERATIONS
+    PASSWORD_HASH_TOLERANCE = Environment.PASSWORD_HASH_TOLERANCE
+    # /user/list pagination
+    USER_LIST_PAGE_SIZE = Environment.USER_LIST_PAGE_SIZE
+    USER_LIST_MAX_PAGE_SIZE = Environment.USER_LIST_MAX_PAGE_SIZE
+    USER_LIST_MAX_TOTAL = Environment.USER_LIST_MAX_TOTAL
+    USER_LIST_COUNT_MAX_TIME_MS = Environment.USER_LIST_COUNT_MAX_TIME_MS
+    # /user/list page cache, SEARCH_CACHE_TTL bounds cross-worker staleness
+    SEARCH_CACHE_ENABLED = Environment.SEARCH_CACHE_ENABLED
+    SEARCH_CACHE_TTL = Environment.SEARCH_CACHE_TTL
+    SEARCH_CACHE_SIZE = Environment.SEARCH_CACHE_SIZE
+    # Profile image HTTP caching
+    IMAGE_CACHE_MAX_AGE = Environment.IMAGE_CACHE_MAX_AGE
+    # Profile picture processing
+    IMAGE_POOL_WORKERS = Environment.IMAGE_POOL_WORKERS
+    IMAGE_QUEUE_DEPTH = Environment.IMAGE_QUEUE_DEPTH
+    IMAGE_VARIANT_SIZES = Environment.IMAGE_VARIANT_SIZES
+    IMAGE_MAX_DIMENSION = Environment.IMAGE_MAX_DIMENSION
+    IMAGE_JPEG_QUALITY = Environment.IMAGE_JPEG_QUALITY
+    IMAGE_MAX_UPLOAD_BYTES = Environment.IMAGE_MAX_UPLOAD_BYTES
+    # Inline small images and the per-worker image cache
+    IMAGE_INLINE_MAX_BYTES = Environment.IMAGE_INLINE_MAX_BYTES
+    IMAGE_CACHE_MAX_BYTES = Environment.IMAGE_CACHE_MAX_BYTES
+    IMAGE_CACHE_MAX_ITEM_BYTES = Environment.IMAGE_CACHE_MAX_ITEM_BYTES
+    IMAGE_CACHE_SIZE = Environment.IMAGE_CACHE_SIZE
+    IMAGE_CACHE_TTL = Environment.IMAGE_CACHE_TTL
+    # Request payload codec
+    PAYLOAD_DEFAULT_CODEC = Environment.PAYLOAD_DEFAULT_CODEC
+    # Async serving mode
+    ASYNC_DB_MODE = Environment.ASYNC_DB_MODE
+    ASYNC_DB_TIMEOUT = Environment.ASYNC_DB_TIMEOUT
 
     PASSWORD_REGEX = Environment.PASSWORD_REGEX
     EMAIL_REGEX_CHECK = Environment.EMAIL_REGEX_CHECK
     FERNET_KEY = Environment.FERNET_KEY
+    ENVELOPE_KEYS = Environment.ENVELOPE_KEYS
+    ENVELOPE_ACTIVE_KID = Environment.ENVELOPE_ACTIVE_KID
+    ENVELOPE_DEFAULT_SCHEME = Environment.ENVELOPE_DEFAULT_SCHEME
+    PAYLOAD_COMPRESS_MIN_BYTES = Environment.PAYLOAD_COMPRESS_MIN_BYTES
+    PAYLOAD_COMPRESS_LEVEL = Environment.PAYLOAD_COMPRESS_LEVEL
+    PAYLOAD_MAX_DECOMPRESSED_BYTES = Environment.PAYLOAD_MAX_DECOMPRESSED_BYTES
 
     # For sending mail
     MAIL_SERVER = Environment.MAIL_SERVER
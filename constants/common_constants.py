@@ -13,4 +13,5 @@ class CommonConstant:
     EMAIL_ID_NOT_VALID = "Provide a valid email id"
     NOT_ALLOWED = "Empty field are not allowed"
     VALUE_ERROR = "Value error,"
+    UNSUPPORTED_FIELDS = "Unsupported fields"
     README_CONTENT = "## Project Folder Structure\n\n"
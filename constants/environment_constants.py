@@ -34,6 +34,97 @@ class Environment:
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "JWT_SECRET_KEY")
     # Mongo URI
     MONGO_URI = os.environ.get("MONGO_URI", "MONGO_URI")
+    # Mongo connection pool sizing and timeouts
+    MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "50"))
+    MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+    MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000"))
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = int(
+        os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "5000")
+    )
+    MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000"))
+    MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "20000"))
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = int(
+        os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000")
+    )
+    # Serve signin, register and profile through the async (motor) data layer
+    ASYNC_DB_MODE = os.getenv("ASYNC_DB_MODE", "False") == "True"
+    ASYNC_DB_TIMEOUT = float(os.getenv("ASYNC_DB_TIMEOUT", "30"))
+    # Per-worker revoked token index used by auth_required
+    REVOCATION_INDEX_ENABLED = (
+        os.getenv("REVOCATION_INDEX_ENABLED", "True") == "True"
+    )
+    REVOCATION_REFRESH_SECONDS = float(os.getenv("REVOCATION_REFRESH_SECONDS", "2"))
+    REVOCATION_REBUILD_SECONDS = float(
+        os.getenv("REVOCATION_REBUILD_SECONDS", "3600")
+    )
+    REVOCATION_BLOOM_ERROR_RATE = float(
+        os.getenv("REVOCATION_BLOOM_ERROR_RATE", "0.001")
+    )
+    REVOCATION_MIN_CAPACITY = int(os.getenv("REVOCATION_MIN_CAPACITY", "10000"))
+    REVOCATION_LRU_SIZE = int(os.getenv("REVOCATION_LRU_SIZE", "1024"))
+    # Per-worker user status cache used by the active user checks
+    USER_STATUS_CACHE_ENABLED = (
+        os.getenv("USER_STATUS_CACHE_ENABLED", "True") == "True"
+    )
+    USER_STATUS_CACHE_TTL = float(os.getenv("USER_STATUS_CACHE_TTL", "30"))
+    USER_STATUS_CACHE_SIZE = int(os.getenv("USER_STATUS_CACHE_SIZE", "10000"))
+    # Process pool used for password hashing, 0 workers hashes inline. Every
+    # gunicorn worker has its own pool, so the cores are split between the
+    # WEB_CONCURRENCY workers instead of each pool taking all of them
+    WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+    HASH_POOL_WORKERS = int(
+        os.getenv(
+            "HASH_POOL_WORKERS",
+            str(max(1, (os.cpu_count() or 1) // max(1, WEB_CONCURRENCY))),
+        )
+    )
+    HASH_QUEUE_DEPTH = int(os.getenv("HASH_QUEUE_DEPTH", "64"))
+    HASH_TIMEOUT_SECONDS = float(os.getenv("HASH_TIMEOUT_SECONDS", "10"))
+    # Password hash cost policy, 0 iterations means use the value calibrated to
+    # the target time once and shared by all workers through AppSettings
+    PASSWORD_HASH_ITERATIONS = int(os.getenv("PASSWORD_HASH_ITERATIONS", "0"))
+    PASSWORD_HASH_TARGET_MS = float(os.getenv("PASSWORD_HASH_TARGET_MS", "250"))
+    PASSWORD_HASH_MIN_ITERATIONS = int(
+        os.getenv("PASSWORD_HASH_MIN_ITERATIONS", "260000")
+    )
+    PASSWORD_HASH_TOLERANCE = float(os.getenv("PASSWORD_HASH_TOLERANCE", "0.25"))
+    # /user/list page sizes and the bound on the optional total count
+    USER_LIST_PAGE_SIZE = int(os.getenv("USER_LIST_PAGE_SIZE", "20"))
+    USER_LIST_MAX_PAGE_SIZE = int(os.getenv("USER_LIST_MAX_PAGE_SIZE", "100"))
+    USER_LIST_MAX_TOTAL = int(os.getenv("USER_LIST_MAX_TOTAL", "10000"))
+    USER_LIST_COUNT_MAX_TIME_MS = int(
+        os.getenv("USER_LIST_COUNT_MAX_TIME_MS", "2000")
+    )
+    # Per-worker /user/list page cache
+    SEARCH_CACHE_ENABLED = os.getenv("SEARCH_CACHE_ENABLED", "True") == "True"
+    SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "30"))
+    SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", "2048"))
+    # Cache-Control max-age of profile images, their URLs change with the content
+    IMAGE_CACHE_MAX_AGE = int(os.getenv("IMAGE_CACHE_MAX_AGE", "31536000"))
+    # Profile picture variants, sizes are the longest side in pixels
+    IMAGE_POOL_WORKERS = int(os.getenv("IMAGE_POOL_WORKERS", "2"))
+    IMAGE_QUEUE_DEPTH = int(os.getenv("IMAGE_QUEUE_DEPTH", "16"))
+    IMAGE_VARIANT_SIZES = tuple(
+        int(size) for size in os.getenv("IMAGE_VARIANT_SIZES", "64,128,256").split(",")
+    )
+    IMAGE_MAX_DIMENSION = int(os.getenv("IMAGE_MAX_DIMENSION", "1024"))
+    IMAGE_JPEG_QUALITY = int(os.getenv("IMAGE_JPEG_QUALITY", "85"))
+    # Largest accepted profile picture upload, larger ones get 413
+    IMAGE_MAX_UPLOAD_BYTES = int(os.getenv("IMAGE_MAX_UPLOAD_BYTES", "10485760"))
+    # Images up to this size are stored inline in their fs.files document
+    IMAGE_INLINE_MAX_BYTES = int(os.getenv("IMAGE_INLINE_MAX_BYTES", "16384"))
+    # Per-worker image cache, byte budget and the largest image kept
+    IMAGE_CACHE_MAX_BYTES = int(os.getenv("IMAGE_CACHE_MAX_BYTES", "33554432"))
+    IMAGE_CACHE_MAX_ITEM_BYTES = int(
+        os.getenv("IMAGE_CACHE_MAX_ITEM_BYTES", "262144")
+    )
+    IMAGE_CACHE_SIZE = int(os.getenv("IMAGE_CACHE_SIZE", "4096"))
+    IMAGE_CACHE_TTL = float(os.getenv("IMAGE_CACHE_TTL", "300"))
+    # Codec of decrypted request payloads when X-Payload-Codec is not sent
+    PAYLOAD_DEFAULT_CODEC = os.getenv("PAYLOAD_DEFAULT_CODEC", "auto")
+    # Build missing indexes from the index manifest when the app starts, off by
+    # default: indexes are built once per deploy with "flask sync-indexes"
+    MONGO_ENSURE_INDEXES = os.getenv("MONGO_ENSURE_INDEXES", "False") == "True"
     PASSWORD_REGEX = os.getenv(
         "PASSWORD_REGEX",
         "PASSWORD_REGEX",
@@ -43,6 +134,17 @@ class Environment:
         "EMAIL_REGEX_CHECK",
     )
     FERNET_KEY = os.environ.get("FERNET_KEY", "FERNET_KEY")
+    # AES-GCM envelope keys as "kid:base64url key" pairs separated by commas
+    ENVELOPE_KEYS = os.getenv("ENVELOPE_KEYS", "")
+    ENVELOPE_ACTIVE_KID = os.getenv("ENVELOPE_ACTIVE_KID", "")
+    # Compression of payload plaintext before encryption
+    PAYLOAD_COMPRESS_MIN_BYTES = int(os.getenv("PAYLOAD_COMPRESS_MIN_BYTES", "1024"))
+    PAYLOAD_COMPRESS_LEVEL = int(os.getenv("PAYLOAD_COMPRESS_LEVEL", "6"))
+    PAYLOAD_MAX_DECOMPRESSED_BYTES = int(
+        os.getenv("PAYLOAD_MAX_DECOMPRESSED_BYTES", "1048576")
+    )
+    # Response envelope when the client sends no X-Envelope header
+    ENVELOPE_DEFAULT_SCHEME = os.getenv("ENVELOPE_DEFAULT_SCHEME", "fernet")
 
     # For sending mail
     MAIL_SERVER = os.getenv("MAIL_SERVER", "MAIL_SERVER")
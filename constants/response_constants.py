@@ -9,6 +9,7 @@ class ResponseConstants:
     INTERNAL_ERROR_MESSAGE = "Something went wrong, Please try again"
     UNSUPPORTED_MEDIA_TYPE = "Unsupported Media Type"
     UNPROCESSABLE_ENTITY = "Unprocessable Entity"
+    PAYLOAD_TOO_LARGE = "Payload Too Large"
     MAXI_LIMIT_EXCEEDED ="Maximum try exceeded,Please try after 1 hour"
     EMAIL_ID_NOT_VALID = "Provide a valid email id"
     RESTRICTED_ACCESS_MESSAGE = "Restricted Access"
@@ -16,4 +17,5 @@ class ResponseConstants:
     BAD_REQUEST = "Bad request, not valid request"
     SIGN_IN_MESSAGE = "Username/password is incorrect"
     INACTIVE_USER = "This user is in inactive state"
+    SERVICE_BUSY = "Server is busy, Please try again"
     REFRESH_TOKEN_BAD_REQUEST = "Operation cannot be performed as server requires refresh token  to clean up security credentials based on the same authorization grant"
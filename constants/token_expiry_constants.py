@@ -18,3 +18,10 @@ class TokenExpireConstant:
 
     # Setting signup token expiry
     SIGNUP_TOKEN_EXPIRES = date_time.timedelta(minutes=10)
+
+    # Rate limiting window of the email token requests
+    EMAIL_RATE_LIMIT_WINDOW = date_time.timedelta(minutes=60)
+
+    # Upper bound of a token's lifetime (flask_jwt_extended default refresh expiry),
+    # used when the real expiry of a blocklisted token is unknown
+    MAX_TOKEN_LIFETIME = date_time.timedelta(days=30)
@@ -0,0 +1,66 @@
+import os
+
+# config reads the environment on import
+os.environ.setdefault("LOG_LEVEL", "ERROR")
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017/user_management_test")
+os.environ.setdefault("PASSWORD_HASH_ITERATIONS", "1000")
+
+import flask_pymongo
+import mongomock
+import mongomock.gridfs
+import pytest
+
+from apps.database.client_registry import MongoClientRegistry
+from config import Config
+
+# one in-memory server behind both the collection handlers and Flask-PyMongo
+mongomock.gridfs.enable_gridfs_integration()
+MONGO_CLIENT = mongomock.MongoClient()
+flask_pymongo.MongoClient = lambda *args, **kwargs: MONGO_CLIENT
+DB_NAME = Config.MONGO_URI.rsplit("/", 1)[-1]
+
+
+@pytest.fixture
+def mongo_db():
+    """
+    Empty in-memory database behind every MongoDbHandler for one test.
+    """
+    MongoClientRegistry._clients[Config.MONGO_URI] = MONGO_CLIENT
+    database = MONGO_CLIENT[DB_NAME]
+    yield database
+    for name in database.list_collection_names():
+        database.drop_collection(name)
+    MongoClientRegistry._clients.pop(Config.MONGO_URI, None)
+
+
+@pytest.fixture(scope="session")
+def app():
+    from apps.factory import create_app
+
+    app = create_app()
+    app.config["TESTING"] = True
+    return app
+
+
+@pytest.fixture
+def client(app, mongo_db):
+    return app.test_client()
+
+
+@pytest.fixture
+def envelope_keys(monkeypatch):
+    """
+    Fresh Fernet and AES-GCM keys ("k1" active, "k0" rotated out) for one test.
+    """
+    from cryptography.fernet import Fernet
+
+    from apps.utils.envelope import Envelope, generate_key
+
+    monkeypatch.setattr(Config, "FERNET_KEY", Fernet.generate_key().decode())
+    monkeypatch.setattr(
+        Config, "ENVELOPE_KEYS", f"k0:{generate_key()},k1:{generate_key()}"
+    )
+    monkeypatch.setattr(Config, "ENVELOPE_ACTIVE_KID", "k1")
+    monkeypatch.setattr(Envelope, "_keys", None)
+    monkeypatch.setattr(Envelope, "_fernet", None)
+    return Envelope
@@ -0,0 +1,83 @@
+import datetime
+import threading
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from apps.database.models import UsersTokenDb
+from apps.validators.auth_validators import AuthValidator
+from constants.common_constants import CommonConstant
+
+TOKEN_LIFETIME = datetime.timedelta(minutes=5)
+
+
+@pytest.fixture
+def users_token(mongo_db):
+    mongo_db.UsersToken.create_index([("email", 1), ("type", 1)], unique=True)
+    return mongo_db.UsersToken
+
+
+def issue(token):
+    return AuthValidator.issue_email_token(
+        "race@example.com", "signup", token, TOKEN_LIFETIME
+    )
+
+
+def test_concurrent_requests_lose_no_attempt(users_token):
+    threads_count = CommonConstant.MAX_ATTEMPT + 3
+    barrier = threading.Barrier(threads_count)
+    results = []
+    lock = threading.Lock()
+
+    def worker(number):
+        barrier.wait()
+        result = issue(f"token-{number}")
+        with lock:
+            results.append(result)
+
+    threads = [
+        threading.Thread(target=worker, args=(number,))
+        for number in range(threads_count)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    allowed = [document for limited, document in results if not limited]
+    assert len(allowed) == CommonConstant.MAX_ATTEMPT
+    assert sorted(document["attempt"] for document in allowed) == list(
+        range(1, CommonConstant.MAX_ATTEMPT + 1)
+    )
+    assert users_token.count_documents({}) == 1
+    stored = users_token.find_one()
+    assert stored["attempt"] == CommonConstant.MAX_ATTEMPT
+    # the stored token is the one handed out last, never a rate limited one
+    assert stored["token"] == max(allowed, key=lambda document: document["attempt"])[
+        "token"
+    ]
+
+
+def test_lost_first_upsert_is_retried_as_update(users_token, monkeypatch):
+    original = UsersTokenDb.find_one_and_modify
+    raced = threading.Event()
+
+    def losing_upsert(self, *args, **kwargs):
+        if not raced.is_set():
+            raced.set()
+            # another request creates the document first, on its own thread,
+            # and this upsert then fails on the unique (email, type) index
+            winner = threading.Thread(target=issue, args=("winner-token",))
+            winner.start()
+            winner.join()
+            raise DuplicateKeyError("E11000 duplicate key error")
+        return original(self, *args, **kwargs)
+
+    monkeypatch.setattr(UsersTokenDb, "find_one_and_modify", losing_upsert)
+    limited, document = issue("retried-token")
+
+    assert raced.is_set()
+    assert not limited
+    assert document["attempt"] == 2
+    assert document["token"] == "retried-token"
+    assert users_token.count_documents({}) == 1
@@ -0,0 +1,69 @@
+import base64
+
+import pytest
+from cryptography.fernet import Fernet
+
+from apps.utils.envelope import (
+    AES_GCM,
+    FERNET,
+    EnvelopeError,
+    b64url_decode,
+    b64url_encode,
+)
+from config import Config
+
+PLAINTEXT = b'{"username": "jane@example.com"}'
+
+
+def test_round_trip_with_the_active_kid(envelope_keys):
+    token = envelope_keys.seal(PLAINTEXT, AES_GCM)
+    raw = b64url_decode(token)
+
+    assert "=" not in token
+    assert raw[0] == 0x01
+    assert raw[2 : 2 + raw[1]] == b"k1"
+    assert envelope_keys.open(token) == PLAINTEXT
+
+
+def test_rotated_kid_still_opens(envelope_keys, monkeypatch):
+    monkeypatch.setattr(Config, "ENVELOPE_ACTIVE_KID", "k0")
+    token = envelope_keys.seal(PLAINTEXT, AES_GCM)
+    # k1 becomes active again, k0 is only kept to open older envelopes
+    monkeypatch.setattr(Config, "ENVELOPE_ACTIVE_KID", "k1")
+
+    assert b64url_decode(token)[2:4] == b"k0"
+    assert envelope_keys.open(token) == PLAINTEXT
+    assert b64url_decode(envelope_keys.seal(PLAINTEXT, AES_GCM))[2:4] == b"k1"
+
+
+def test_unknown_kid_is_rejected(envelope_keys):
+    raw = bytearray(b64url_decode(envelope_keys.seal(PLAINTEXT, AES_GCM)))
+    raw[2:4] = b"k9"
+
+    with pytest.raises(EnvelopeError, match="unknown key id"):
+        envelope_keys.open(b64url_encode(bytes(raw)))
+
+
+def test_tampered_tag_is_rejected(envelope_keys):
+    raw = bytearray(b64url_decode(envelope_keys.seal(PLAINTEXT, AES_GCM)))
+    raw[-1] ^= 0x01
+
+    with pytest.raises(EnvelopeError, match="authentication failed"):
+        envelope_keys.open(b64url_encode(bytes(raw)))
+
+
+def test_legacy_fernet_token_is_detected(envelope_keys):
+    token = Fernet(Config.FERNET_KEY).encrypt(PLAINTEXT).decode()
+
+    assert base64.urlsafe_b64decode(token)[0] == 0x80
+    assert envelope_keys.open(token) == PLAINTEXT
+    assert envelope_keys.open(envelope_keys.seal(PLAINTEXT, FERNET)) == PLAINTEXT
+
+
+def test_tampered_fernet_token_is_rejected(envelope_keys):
+    token = Fernet(Config.FERNET_KEY).encrypt(PLAINTEXT)
+    raw = bytearray(base64.urlsafe_b64decode(token))
+    raw[-1] ^= 0x01
+
+    with pytest.raises(EnvelopeError, match="invalid fernet token"):
+        envelope_keys.open(base64.urlsafe_b64encode(bytes(raw)).decode())
@@ -0,0 +1,38 @@
+import datetime
+import json
+
+from bson import ObjectId
+from flask import jsonify
+
+from apps.utils import json_provider
+
+
+def test_jsonify_serialises_through_the_shared_dumps(app, monkeypatch):
+    calls = []
+    original = json_provider.dumps
+
+    def counting_dumps(obj, indent=None):
+        calls.append(obj)
+        return original(obj, indent)
+
+    monkeypatch.setattr(json_provider, "dumps", counting_dumps)
+    payload = {"users": [{"firstname": "Jane", "files_id": "x"}], "next_cursor": None}
+    with app.app_context():
+        response = jsonify(payload)
+
+    assert calls == [payload]
+    assert response.get_json() == payload
+    assert response.mimetype == "application/json"
+
+
+def test_jsonify_output_matches_the_standard_library(app):
+    object_id = ObjectId()
+    created_at = datetime.datetime(2024, 1, 2, 3, 4, 5)
+    with app.app_context():
+        body = jsonify(b=1, a={"id": object_id, "at": created_at}).get_data(True)
+
+    assert json.loads(body) == {
+        "a": {"at": "Tue, 02 Jan 2024 03:04:05 GMT", "id": str(object_id)},
+        "b": 1,
+    }
+    assert body.index('"a"') < body.index('"b"')
@@ -0,0 +1,60 @@
+import asyncio
+import time
+
+import pytest
+from werkzeug.security import check_password_hash
+
+from apps.utils.password_hashing import PasswordHashingService
+from config import Config
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(Config, "HASH_POOL_WORKERS", 1)
+    monkeypatch.setattr(Config, "HASH_QUEUE_DEPTH", 4)
+    yield PasswordHashingService
+    PasswordHashingService.shutdown()
+
+
+def kill_workers(executor):
+    processes = list(executor._processes.values())
+    for process in processes:
+        process.kill()
+    for process in processes:
+        process.join(5)
+    # give the executor's management thread time to notice
+    deadline = time.monotonic() + 5
+    while not executor._broken and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+
+def test_inline_without_pool(monkeypatch):
+    monkeypatch.setattr(Config, "HASH_POOL_WORKERS", 0)
+    pwhash = PasswordHashingService.hash_password("secret-password")
+    assert PasswordHashingService.verify_password(pwhash, "secret-password")
+    assert PasswordHashingService._executor is None
+
+
+def test_hash_in_pool(pool):
+    pwhash = pool.hash_password("secret-password")
+    assert check_password_hash(pwhash, "secret-password")
+    assert pool.verify_password(pwhash, "secret-password")
+    assert not pool.verify_password(pwhash, "other-password")
+
+
+def test_broken_pool_is_replaced(pool):
+    pwhash = pool.hash_password("secret-password")
+    broken = pool._executor
+    kill_workers(broken)
+
+    assert pool.verify_password(pwhash, "secret-password")
+    assert pool._executor is not broken
+
+
+def test_broken_pool_is_replaced_async(pool):
+    pwhash = pool.hash_password("secret-password")
+    broken = pool._executor
+    kill_workers(broken)
+
+    assert asyncio.run(pool.verify_password_async(pwhash, "secret-password"))
+    assert pool._executor is not broken
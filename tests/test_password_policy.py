@@ -0,0 +1,70 @@
+import threading
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from apps.utils.password_policy import ITERATIONS_SETTING, PasswordHashPolicy
+from config import Config
+
+
+@pytest.fixture
+def policy(monkeypatch, mongo_db):
+    monkeypatch.setattr(Config, "PASSWORD_HASH_ITERATIONS", 0)
+    monkeypatch.setattr(Config, "PASSWORD_HASH_MIN_ITERATIONS", 1000)
+    monkeypatch.setattr(PasswordHashPolicy, "_iterations", None)
+    yield PasswordHashPolicy
+    PasswordHashPolicy._iterations = None
+
+
+def pbkdf2_hash(iterations):
+    return generate_password_hash("secret-password", f"pbkdf2:sha256:{iterations}")
+
+
+def test_needs_rehash_only_upwards(policy, mongo_db):
+    policy.store(100000)
+    assert policy.needs_rehash(pbkdf2_hash(10000))
+    assert not policy.needs_rehash(pbkdf2_hash(90000))
+    # a stronger hash than the policy is kept
+    assert not policy.needs_rehash(pbkdf2_hash(400000))
+    assert policy.needs_rehash(
+        generate_password_hash("secret-password", "pbkdf2:sha1:400000")
+    )
+
+
+def test_configured_iterations_respect_floor(monkeypatch):
+    monkeypatch.setattr(Config, "PASSWORD_HASH_ITERATIONS", 5000)
+    monkeypatch.setattr(Config, "PASSWORD_HASH_MIN_ITERATIONS", 260000)
+    assert PasswordHashPolicy.iterations() == 260000
+
+
+def test_calibrated_once_and_shared(policy, mongo_db, monkeypatch):
+    calibrations = iter([120000, 50000, 70000])
+    monkeypatch.setattr(policy, "calibrate", staticmethod(lambda: next(calibrations)))
+
+    assert policy.iterations() == 120000
+    # another worker starts with an empty process cache and reads the stored value
+    policy._iterations = None
+    assert policy.iterations() == 120000
+    assert mongo_db.AppSettings.find_one({"_id": ITERATIONS_SETTING})["value"] == 120000
+
+
+def test_concurrent_first_calibration_settles_on_one_value(policy, mongo_db, monkeypatch):
+    counter = iter(range(100000, 200000, 1000))
+    lock = threading.Lock()
+
+    def calibrate():
+        with lock:
+            return next(counter)
+
+    monkeypatch.setattr(policy, "calibrate", staticmethod(calibrate))
+    results = []
+
+    def worker():
+        results.append(policy._load_or_calibrate())
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(results)) == 1
@@ -0,0 +1,105 @@
+import pytest
+from flask import Flask, jsonify, request
+from pydantic import ValidationError
+
+from apps.decorators.fernet_decorators import decryptor
+from apps.models.signin_models import SignIn
+from apps.utils.payload_codec import (
+    CODEC_HEADER,
+    AutoCodec,
+    JsonCodec,
+    LiteralCodec,
+    PayloadDecodeError,
+    as_model,
+    get_codec,
+)
+from config import Config
+
+SIGNIN_JSON = b'{"username": "jane@example.com", "password": "Secret#123"}'
+SIGNIN_LITERAL = b"{'username': 'jane@example.com', 'password': 'Secret#123'}"
+
+
+@pytest.fixture
+def signin_app(envelope_keys):
+    app = Flask(__name__)
+
+    @app.route("/signin", methods=["POST"])
+    @decryptor(model=SignIn)
+    def signin():
+        # the handlers validate whatever the decryptor left, like signin_helper
+        try:
+            content = request.decrypted_model or request.decrypted_data
+            model = as_model(SignIn, content)
+        except ValidationError:
+            return jsonify(message="invalid"), 400
+        return jsonify(
+            username=model.username,
+            validated=request.decrypted_model is not None,
+        )
+
+    def post(plaintext, codec=None):
+        headers = {CODEC_HEADER: codec} if codec else {}
+        return app.test_client().post(
+            "/signin",
+            json={"data": envelope_keys.seal(plaintext)},
+            headers=headers,
+        )
+
+    return post
+
+
+def test_codec_is_chosen_by_header(monkeypatch):
+    monkeypatch.setattr(Config, "PAYLOAD_DEFAULT_CODEC", "auto")
+    assert get_codec("json") is JsonCodec
+    assert get_codec(" Python-Literal ") is LiteralCodec
+    assert get_codec(None) is AutoCodec
+    assert get_codec("") is AutoCodec
+
+
+def test_unknown_codec_is_rejected():
+    with pytest.raises(PayloadDecodeError):
+        get_codec("yaml")
+
+
+def test_auto_falls_back_to_python_literals():
+    expected = {"username": "jane@example.com", "password": "Secret#123"}
+    assert AutoCodec.decode(SIGNIN_JSON) == expected
+    assert AutoCodec.decode(SIGNIN_LITERAL) == expected
+    model = AutoCodec.decode_model(SIGNIN_LITERAL, SignIn)
+    assert model.username == expected["username"]
+    with pytest.raises(PayloadDecodeError):
+        JsonCodec.decode(SIGNIN_LITERAL)
+
+
+def test_auto_does_not_hide_model_errors():
+    with pytest.raises(ValidationError):
+        AutoCodec.decode_model(b'{"username": "jane@example.com"}', SignIn)
+
+
+def test_decryptor_validates_json_into_the_model(signin_app):
+    response = signin_app(SIGNIN_JSON, "json")
+
+    assert response.status_code == 200
+    assert response.json == {"username": "jane@example.com", "validated": True}
+
+
+def test_decryptor_accepts_literals_without_header(signin_app, monkeypatch):
+    monkeypatch.setattr(Config, "PAYLOAD_DEFAULT_CODEC", "auto")
+    response = signin_app(SIGNIN_LITERAL)
+
+    assert response.status_code == 200
+    assert response.json["validated"]
+
+
+def test_model_errors_become_400(signin_app):
+    response = signin_app(b'{"username": "jane@example.com"}', "json")
+
+    assert response.status_code == 400
+
+
+def test_invalid_json_becomes_400(signin_app):
+    assert signin_app(SIGNIN_LITERAL, "json").status_code == 400
+
+
+def test_unknown_codec_becomes_400(signin_app):
+    assert signin_app(SIGNIN_JSON, "yaml").status_code == 400
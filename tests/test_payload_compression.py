@@ -0,0 +1,103 @@
+import gzip
+import json
+import os
+import zlib
+
+import pytest
+
+from apps.utils.payload_compression import (
+    PayloadCompressionError,
+    decompress,
+    maybe_compress,
+    negotiate,
+)
+from config import Config
+
+PAYLOAD = json.dumps(
+    {"users": [{"firstname": f"Jane{n}", "lastname": "Doe"} for n in range(100)]}
+).encode()
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        (None, None),
+        ("gzip", "gzip"),
+        ("deflate, gzip;q=0.5", "deflate"),
+        ("gzip;q=0.5, deflate;q=0.9", "deflate"),
+        ("gzip; q=1.0, deflate;q=0.9", "gzip"),
+        ("gzip;q=0", None),
+        ("gzip;q=0, deflate;q=0.1", "deflate"),
+        ("br, identity", None),
+        ("gzip;q=abc, deflate;q=0.2", "deflate"),
+    ],
+)
+def test_negotiation_honours_q_values(header, expected):
+    assert negotiate(header) == expected
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "deflate"])
+def test_round_trip(encoding):
+    compressed, used = maybe_compress(PAYLOAD, encoding)
+
+    assert used == encoding
+    assert len(compressed) < len(PAYLOAD)
+    assert decompress(compressed, encoding) == PAYLOAD
+
+
+def test_gzip_output_is_a_gzip_stream():
+    compressed, _ = maybe_compress(PAYLOAD, "gzip")
+    assert gzip.decompress(compressed) == PAYLOAD
+
+
+def test_small_payloads_pass_through():
+    data = PAYLOAD[: Config.PAYLOAD_COMPRESS_MIN_BYTES - 1]
+    assert maybe_compress(data, "gzip") == (data, None)
+
+
+def test_refused_encoding_passes_through():
+    assert maybe_compress(PAYLOAD, "gzip;q=0") == (PAYLOAD, None)
+
+
+def test_incompressible_payloads_pass_through():
+    data = os.urandom(4 * Config.PAYLOAD_COMPRESS_MIN_BYTES)
+    assert maybe_compress(data, "gzip") == (data, None)
+
+
+def test_identity_and_missing_encoding_are_unchanged():
+    assert decompress(PAYLOAD, None) == PAYLOAD
+    assert decompress(PAYLOAD, "identity") == PAYLOAD
+
+
+def test_unknown_encoding_is_rejected():
+    with pytest.raises(PayloadCompressionError):
+        decompress(PAYLOAD, "br")
+
+
+def test_decompression_bomb_is_rejected(monkeypatch):
+    monkeypatch.setattr(Config, "PAYLOAD_MAX_DECOMPRESSED_BYTES", 64 * 1024)
+    compressor = zlib.compressobj(9, zlib.DEFLATED, zlib.MAX_WBITS)
+    bomb = compressor.compress(b"\0" * (10 * 1024 * 1024)) + compressor.flush()
+    assert len(bomb) < 64 * 1024
+
+    with pytest.raises(PayloadCompressionError, match="too large"):
+        decompress(bomb, "deflate")
+
+
+def test_payload_at_the_cap_is_accepted(monkeypatch):
+    monkeypatch.setattr(Config, "PAYLOAD_MAX_DECOMPRESSED_BYTES", len(PAYLOAD))
+    compressed, _ = maybe_compress(PAYLOAD, "deflate")
+    assert decompress(compressed, "deflate") == PAYLOAD
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "deflate"])
+def test_truncated_stream_is_rejected(encoding):
+    compressed, _ = maybe_compress(PAYLOAD, encoding)
+
+    with pytest.raises(PayloadCompressionError):
+        decompress(compressed[: len(compressed) // 2], encoding)
+
+
+def test_corrupt_stream_is_rejected():
+    with pytest.raises(PayloadCompressionError, match="corrupt"):
+        decompress(b"not compressed at all", "gzip")
@@ -0,0 +1,192 @@
+import copy
+
+import mongomock
+import pytest
+from mongomock import aggregate
+
+from apps.database_query_handler.pipeline_builder import (
+    Pipeline,
+    active_users,
+    customers,
+    user_type_or_default,
+)
+
+
+def substitute(value, variables):
+    if isinstance(value, str) and value.startswith("$$"):
+        name = value[2:]
+        if name in variables:
+            return {"$literal": variables[name]}
+    if isinstance(value, dict):
+        return {key: substitute(item, variables) for key, item in value.items()}
+    if isinstance(value, list):
+        return [substitute(item, variables) for item in value]
+    return value
+
+
+def field_value(document, path):
+    for part in path.split("."):
+        document = document.get(part) if isinstance(document, dict) else None
+    return document
+
+
+def run(db, collection, stages):
+    """
+    Runs stages on mongomock one at a time, evaluating $lookup sub-pipelines
+    (let/pipeline), which mongomock does not implement, per document.
+    """
+    documents = list(db[collection].find())
+    for stage in stages:
+        lookup = stage.get("$lookup")
+        if lookup is not None and "pipeline" in lookup:
+            for document in documents:
+                variables = {
+                    name: field_value(document, expression[1:])
+                    for name, expression in (lookup.get("let") or {}).items()
+                }
+                document[lookup["as"]] = list(
+                    db[lookup["from"]].aggregate(
+                        substitute(lookup["pipeline"], variables)
+                    )
+                )
+            continue
+        documents = list(
+            aggregate.process_pipeline(copy.deepcopy(documents), db, [stage], None)
+        )
+    return documents
+
+
+@pytest.fixture
+def db():
+    db = mongomock.MongoClient().db
+    db.Users.insert_many(
+        [
+            {
+                "_id": index,
+                "user_id": f"u{index}",
+                "username": f"user{index:02d}@example.com",
+                "firstname": f"First{index}",
+                "Status": "Active" if index % 3 else "Inactive",
+                "user_type": [None, "customer", "admin"][index % 3],
+                "timezone": "UTC",
+            }
+            for index in range(12)
+        ]
+    )
+    db.UserType.insert_many(
+        [
+            {"user_id": f"u{index}", "user_type": "customer", "extra": index}
+            for index in range(0, 12, 2)
+        ]
+    )
+    db.token_blocklist.insert_many([{"jti": "revoked-jti"}])
+    return db
+
+
+def assert_equivalent(db, pipeline):
+    raw = [copy.deepcopy(stage) for stage in pipeline._stages]
+    built = pipeline.build()
+    assert run(db, "Users", built) == run(db, "Users", raw)
+    return built
+
+
+def test_consecutive_matches_are_merged(db):
+    pipeline = (
+        Pipeline()
+        .match(active_users())
+        .match(customers())
+        .sort({"username": 1})
+        .project({"_id": 0, "user_id": 1})
+    )
+    built = assert_equivalent(db, pipeline)
+    assert [next(iter(stage)) for stage in built] == ["$match", "$sort", "$project"]
+
+
+def test_limit_moves_ahead_of_lookup_and_project(db):
+    pipeline = (
+        Pipeline()
+        .match(active_users())
+        .sort({"username": 1})
+        .lookup("UserType", "group", "user_id", "user_id")
+        .project({"_id": 0, "user_id": 1, "group": 1})
+        .limit(3)
+    )
+    built = assert_equivalent(db, pipeline)
+    assert next(iter(built[2])) == "$limit"
+
+
+def test_project_moves_ahead_of_lookup(db):
+    pipeline = (
+        Pipeline()
+        .match(active_users())
+        .lookup("UserType", "group", "user_id", "user_id")
+        .project({"_id": 0, "user_id": 1, "username": 1, "group": 1})
+    )
+    built = assert_equivalent(db, pipeline)
+    assert [next(iter(stage)) for stage in built] == ["$match", "$project", "$lookup"]
+
+
+def test_dead_lookup_is_dropped(db):
+    pipeline = (
+        Pipeline()
+        .lookup("UserType", "group", "user_id", "user_id")
+        .project({"_id": 0, "user_id": 1, "user_type": user_type_or_default()})
+    )
+    built = assert_equivalent(db, pipeline)
+    assert all("$lookup" not in stage for stage in built)
+
+
+def test_correlated_sub_pipeline_lookup(db):
+    pipeline = (
+        Pipeline()
+        .match(active_users())
+        .lookup("UserType", "group", "user_id", "user_id", project={"_id": 0, "extra": 1})
+        .project({"_id": 0, "user_id": 1, "group": 1})
+        .limit(2)
+    )
+    assert_equivalent(db, pipeline)
+
+
+def test_uncorrelated_lookup_keeps_a_valid_project(db):
+    pipeline = (
+        Pipeline()
+        .match({"user_id": "u1"})
+        .lookup(
+            "token_blocklist",
+            "revoked",
+            pipeline=[{"$match": {"jti": "revoked-jti"}}, {"$limit": 1}],
+            project={"_id": 1},
+        )
+        .project({"revoked": 1})
+    )
+    built = assert_equivalent(db, pipeline)
+    # an empty $project is rejected by the server
+    assert all(stage.get("$project") != {} for stage in built)
+    assert next(iter(built[-1])) == "$project"
+
+
+def test_id_only_remainder_is_not_pushed(db):
+    pipeline = (
+        Pipeline()
+        .lookup(
+            "token_blocklist",
+            "revoked",
+            pipeline=[{"$match": {"jti": "revoked-jti"}}],
+            project={"_id": 1},
+        )
+        .project({"_id": 0, "revoked": 1})
+    )
+    built = assert_equivalent(db, pipeline)
+    # {"_id": 0} alone would be an exclusion returning every field
+    assert {"$project": {"_id": 0}} not in built
+
+
+def test_root_reference_keeps_lookup(db):
+    pipeline = (
+        Pipeline()
+        .lookup("UserType", "group", "user_id", "user_id")
+        .project({"doc": "$$ROOT", "user_id": 1})
+    )
+    built = assert_equivalent(db, pipeline)
+    assert any("$lookup" in stage for stage in built)
+    assert next(iter(built[0])) == "$lookup"
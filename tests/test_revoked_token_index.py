@@ -0,0 +1,53 @@
+import pytest
+from bson import ObjectId
+
+from apps.utils.revoked_token_index import BloomFilter, RevokedTokenIndex
+from config import Config
+
+
+@pytest.fixture
+def index(mongo_db, monkeypatch):
+    monkeypatch.setattr(Config, "REVOCATION_INDEX_ENABLED", True)
+    RevokedTokenIndex._reset()
+    yield RevokedTokenIndex
+    RevokedTokenIndex._reset()
+
+
+def test_readding_an_item_does_not_count():
+    bloom = BloomFilter(100)
+    assert bloom.add("jti-1")
+    assert not bloom.add("jti-1")
+    assert bloom.count == 1
+
+
+def test_tail_overlap_does_not_fill_the_filter(index, mongo_db):
+    mongo_db.token_blocklist.insert_many(
+        [{"_id": ObjectId(), "jti": f"jti-{number}"} for number in range(20)]
+    )
+    assert index.is_revoked("jti-0")
+    for _ in range(50):
+        # every tail re-reads the overlap window, i.e. all 20 rows
+        index._last_refresh = float("-inf")
+        index._refresh()
+
+    assert index.stats["tail_queries"] >= 50
+    assert index._bloom.count == 20
+    assert not index._bloom.is_saturated
+
+
+def test_failed_first_rebuild_backs_off(index, mongo_db, monkeypatch):
+    monkeypatch.setattr(Config, "REVOCATION_REFRESH_SECONDS", 60)
+    calls = []
+
+    def failing_rebuild():
+        calls.append(1)
+        raise RuntimeError("blocklist unavailable")
+
+    monkeypatch.setattr(RevokedTokenIndex, "_rebuild", failing_rebuild)
+    mongo_db.token_blocklist.insert_one({"jti": "revoked"})
+
+    for _ in range(10):
+        assert index.is_revoked("revoked")
+        assert not index.is_revoked("valid")
+
+    assert len(calls) == 1
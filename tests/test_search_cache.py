@@ -0,0 +1,31 @@
+import pytest
+
+from apps.utils.search_cache import SearchResultCache
+from config import Config
+
+PAGE = {"cursor": None, "page_size": 20, "include_total": False}
+
+
+@pytest.fixture(autouse=True)
+def enabled(monkeypatch):
+    monkeypatch.setattr(Config, "SEARCH_CACHE_ENABLED", True)
+    SearchResultCache.bump()
+
+
+def test_key_ignores_case_and_spacing():
+    key, cached = SearchResultCache.lookup("Bob  Smith ", PAGE)
+    assert cached is None
+    SearchResultCache.store(key, {"users": [], "next_cursor": None})
+
+    for term in ("bob smith", "BOB SMITH", " Bob Smith"):
+        assert SearchResultCache.lookup(term, PAGE)[1] == {
+            "users": [],
+            "next_cursor": None,
+        }
+
+
+def test_bump_invalidates():
+    key, _ = SearchResultCache.lookup("alice", PAGE)
+    SearchResultCache.store(key, {"users": [], "next_cursor": None})
+    SearchResultCache.bump()
+    assert SearchResultCache.lookup("alice", PAGE)[1] is None
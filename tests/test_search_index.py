@@ -0,0 +1,51 @@
+from apps.database_query_handler.aggregate_queries.search_aggregation import UserList
+from apps.utils.search_index import SearchGrams
+
+
+def add_user(mongo_db, user_id, firstname, lastname, with_grams=True):
+    user = {
+        "user_id": user_id,
+        "username": f"{user_id}@example.com",
+        "firstname": firstname,
+        "lastname": lastname,
+        "Status": "Active",
+        "user_type": "customer",
+    }
+    if with_grams:
+        user["search_grams"] = SearchGrams.build(firstname, lastname)
+    mongo_db.Users.insert_one(user)
+
+
+def found(term):
+    page = UserList.user_name_list(firstname=term, lastname=term)
+    return sorted(user["user_id"] for user in page["users"])
+
+
+def test_term_grams():
+    assert SearchGrams.term_grams("Bo") == ["bo"]
+    assert SearchGrams.term_grams("Robert") == ["ber", "ert", "obe", "rob"]
+    assert SearchGrams.term_grams("") == []
+
+
+def test_search_matches_substrings(mongo_db):
+    add_user(mongo_db, "u1", "Roberta", "Smith")
+    add_user(mongo_db, "u2", "Bob", "Roberts")
+    add_user(mongo_db, "u3", "Alice", "Jones")
+
+    assert found("obert") == ["u1", "u2"]
+    assert found("ali") == ["u3"]
+    assert found("b") == ["u1", "u2"]
+    # grams all present but not as one substring
+    assert found("robs") == []
+
+
+def test_users_without_grams_are_still_found(mongo_db):
+    add_user(mongo_db, "u1", "Roberta", "Smith")
+    add_user(mongo_db, "legacy", "Robert", "Brown", with_grams=False)
+
+    assert found("robert") == ["legacy", "u1"]
+    assert found("brow") == ["legacy"]
+
+
+def test_username_is_not_indexed():
+    assert all(not gram.startswith("u:") for gram in SearchGrams.build("Ann", "Lee"))
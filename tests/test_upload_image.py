@@ -0,0 +1,236 @@
+import io
+import threading
+import time
+
+import pytest
+from bson import ObjectId
+from PIL import Image
+
+from apps.database.models import UsersDb
+from apps.utils.image_processing import ImageProcessingService, build_variants
+from config import Config
+
+
+def image_bytes(width=600, height=400, image_format="JPEG"):
+    image = Image.effect_noise((width, height), 64).convert("RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, image_format)
+    return buffer.getvalue()
+
+
+def variants_of(data):
+    return build_variants(
+        data,
+        Config.IMAGE_VARIANT_SIZES,
+        Config.IMAGE_MAX_DIMENSION,
+        Config.IMAGE_JPEG_QUALITY,
+    )
+
+
+@pytest.fixture
+def helper(app):
+    # the helper binds GridFS to mongo.db on import, after create_app
+    from apps.helpers.route_helpers.user_route_helpers import upload_image_helper
+
+    return upload_image_helper
+
+
+@pytest.fixture
+def user(app, mongo_db):
+    mongo_db.Users.insert_one({"user_id": "u1", "Status": "Active"})
+    return "u1"
+
+
+def picture_ids(mongo_db, main_id):
+    return {main_id} | {
+        image["_id"] for image in mongo_db["fs.files"].find({"variant_of": main_id})
+    }
+
+
+def test_store_variants_replaces_only_the_previous_picture(helper, user, mongo_db):
+    helper.UploadImageHelper.store_variants(user, variants_of(image_bytes()))
+    old_id = ObjectId(mongo_db.Users.find_one()["files_id"])
+    old_files = picture_ids(mongo_db, old_id)
+
+    helper.UploadImageHelper.store_variants(user, variants_of(image_bytes()))
+    new_id = ObjectId(mongo_db.Users.find_one()["files_id"])
+
+    assert new_id != old_id
+    remaining = {image["_id"] for image in mongo_db["fs.files"].find()}
+    assert remaining == picture_ids(mongo_db, new_id)
+    assert remaining.isdisjoint(old_files)
+
+
+def test_concurrent_uploads_keep_the_winner_files(helper, user, mongo_db, monkeypatch):
+    first, second = variants_of(image_bytes()), variants_of(image_bytes())
+    original = UsersDb.find_one_and_update
+    interleaved = threading.Event()
+
+    def slow_swap(self, *args, **kwargs):
+        if not interleaved.is_set():
+            interleaved.set()
+            # the other upload completes while this one has stored its files
+            # but not yet pointed the user at them
+            helper.UploadImageHelper.store_variants(user, second)
+        return original(self, *args, **kwargs)
+
+    monkeypatch.setattr(UsersDb, "find_one_and_update", slow_swap)
+    helper.UploadImageHelper.store_variants(user, first)
+
+    files_id = ObjectId(mongo_db.Users.find_one()["files_id"])
+    stored = mongo_db["fs.files"].find_one({"_id": files_id})
+    assert stored["File_Type"] == helper.PROFILE_IMAGE
+    assert mongo_db["fs.chunks"].count_documents({"files_id": files_id}) > 0
+    remaining = {image["_id"] for image in mongo_db["fs.files"].find()}
+    assert remaining == picture_ids(mongo_db, files_id)
+
+
+def test_failed_processing_is_reported(helper, app, user, mongo_db, monkeypatch):
+    def failing_process(data, on_done, on_error=None):
+        on_error(RuntimeError("decoder crashed"))
+        return True
+
+    monkeypatch.setattr(ImageProcessingService, "process", failing_process)
+    with app.test_request_context():
+        response, status_code = helper.UploadImageHelper.upload_image(
+            io.BytesIO(image_bytes()), user
+        )
+
+    assert status_code == 202
+    upload = mongo_db.Users.find_one()["image_upload"]
+    assert upload["upload_id"] == response.json["upload_id"]
+    assert upload["status"] == "failed"
+    assert "files_id" not in mongo_db.Users.find_one()
+
+
+def test_oversized_upload_is_refused(helper, app, user, mongo_db, monkeypatch):
+    data = image_bytes()
+    monkeypatch.setattr(Config, "IMAGE_MAX_UPLOAD_BYTES", len(data) // 2)
+    upload = io.BytesIO(data)
+    with app.test_request_context():
+        _, status_code = helper.UploadImageHelper.upload_image(upload, user)
+
+    assert status_code == 413
+    # only one byte past the limit was read
+    assert upload.tell() == len(data) // 2 + 1
+    assert "image_upload" not in mongo_db.Users.find_one()
+
+
+def test_completed_upload_clears_its_status(helper, app, user, mongo_db, monkeypatch):
+    monkeypatch.setattr(Config, "IMAGE_POOL_WORKERS", 0)
+    with app.test_request_context():
+        _, status_code = helper.UploadImageHelper.upload_image(
+            io.BytesIO(image_bytes()), user
+        )
+
+    assert status_code == 200
+    stored = mongo_db.Users.find_one()
+    assert "image_upload" not in stored
+    assert stored["files_id"]
+
+
+def test_broken_image_pool_is_replaced(monkeypatch):
+    monkeypatch.setattr(Config, "IMAGE_POOL_WORKERS", 1)
+    data = image_bytes(200, 100)
+    results = []
+    done = threading.Event()
+
+    def on_done(variants):
+        results.append(variants)
+        done.set()
+
+    try:
+        assert ImageProcessingService.process(data, on_done)
+        assert done.wait(30)
+        broken = ImageProcessingService._executor
+        for process in list(broken._processes.values()):
+            process.kill()
+            process.join(5)
+        deadline = time.monotonic() + 5
+        while not broken._broken and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        done.clear()
+        assert ImageProcessingService.process(data, on_done)
+        assert done.wait(30)
+        assert len(results) == 2
+        assert ImageProcessingService._executor is not broken
+    finally:
+        ImageProcessingService.shutdown()
+
+
+@pytest.fixture
+def image_helper(helper):
+    from apps.helpers.route_helpers.user_route_helpers import user_image_helper
+
+    yield user_image_helper
+    user_image_helper.image_cache.clear()
+    user_image_helper.variant_ids.clear()
+
+
+def test_small_image_is_stored_inline_and_served(
+    helper, image_helper, client, user, mongo_db
+):
+    data = image_bytes(40, 30, "PNG")
+    variants = variants_of(data)
+    assert len(variants[-1]["data"]) <= Config.IMAGE_INLINE_MAX_BYTES
+
+    helper.UploadImageHelper.store_variants(user, variants)
+    files_id = mongo_db.Users.find_one()["files_id"]
+    assert mongo_db["fs.files"].find_one({"_id": ObjectId(files_id)})["data"]
+
+    response = client.get(f"/user/image/{files_id}")
+    assert response.status_code == 200
+    assert response.data == variants[-1]["data"]
+    assert response.headers["Content-Type"] == variants[-1]["contentType"]
+
+
+def test_sizes_served_by_one_variant_share_a_cache_entry(
+    helper, image_helper, client, user, mongo_db
+):
+    helper.UploadImageHelper.store_variants(user, variants_of(image_bytes()))
+    files_id = mongo_db.Users.find_one()["files_id"]
+    smallest = min(Config.IMAGE_VARIANT_SIZES)
+
+    first = client.get(f"/user/image/{files_id}?size={smallest}")
+    second = client.get(f"/user/image/{files_id}?size={smallest - 1}")
+
+    assert first.status_code == second.status_code == 200
+    assert first.data == second.data
+    assert len(image_helper.image_cache) == 1
+
+
+def test_multiple_ranges_get_the_full_image(
+    helper, image_helper, client, user, mongo_db
+):
+    helper.UploadImageHelper.store_variants(user, variants_of(image_bytes()))
+    files_id = mongo_db.Users.find_one()["files_id"]
+    full = client.get(f"/user/image/{files_id}").data
+
+    response = client.get(
+        f"/user/image/{files_id}", headers={"Range": "bytes=0-9,20-29"}
+    )
+    assert response.status_code == 200
+    assert response.data == full
+
+    response = client.get(f"/user/image/{files_id}", headers={"Range": "bytes=0-9"})
+    assert response.status_code == 206
+    assert response.data == full[:10]
+
+
+def test_invalid_image_id_is_not_found(image_helper, client):
+    assert client.get("/user/image/not-an-object-id").status_code == 404
+
+
+def test_replaced_picture_is_not_served_if_its_delete_failed(
+    helper, image_helper, client, user, mongo_db, monkeypatch
+):
+    helper.UploadImageHelper.store_variants(user, variants_of(image_bytes()))
+    old_id = mongo_db.Users.find_one()["files_id"]
+    monkeypatch.setattr(
+        helper.UploadImageHelper, "delete_picture", staticmethod(lambda file_id: None)
+    )
+    helper.UploadImageHelper.store_variants(user, variants_of(image_bytes()))
+
+    assert mongo_db["fs.files"].find_one({"_id": ObjectId(old_id)})
+    assert client.get(f"/user/image/{old_id}").status_code == 404
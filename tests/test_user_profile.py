@@ -0,0 +1,27 @@
+from apps.helpers.route_helpers.user_route_helpers.user_profile_helper import (
+    UserprofileHelper,
+)
+
+
+def test_fields_the_user_lacks_give_an_empty_profile(app, mongo_db):
+    mongo_db.Users.insert_one({"user_id": "u1", "firstname": "Jane"})
+    with app.app_context():
+        response, status_code = UserprofileHelper.get_user_profile_helper(
+            "u1", "phone_number,country_code"
+        )
+
+    assert status_code == 200
+    assert response == {}
+
+
+def test_fields_narrow_the_profile(app, mongo_db):
+    mongo_db.Users.insert_one(
+        {"user_id": "u1", "firstname": "Jane", "lastname": "Doe"}
+    )
+    with app.app_context():
+        response, status_code = UserprofileHelper.get_user_profile_helper(
+            "u1", "firstname"
+        )
+
+    assert status_code == 200
+    assert response == {"firstname": "Jane"}